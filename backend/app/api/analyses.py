@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.models.db import supabase
+from app.services.analysis_cache import CachedAnalysis, analysis_cache, etag_matches
+from app.services.serialization import json_column
+
+router = APIRouter()
+
+# Browsers keep the copy but revalidate it every time; unchanged analyses cost a 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def _latest_row(table: str, article_id: str) -> Optional[Dict[str, Any]]:
+    res = supabase.table(table).select("*").eq("article_id", article_id).order("created_at", desc=True).limit(1).execute()
+    return res.data[0] if res.data else None
+
+
+def _fingerprint_for(table: str, article_id: str, created_at: Optional[str]) -> Optional[Dict[str, Any]]:
+    """The fingerprint written with an analysis: analyze inserts it just before the analysis row."""
+    if created_at is None:
+        return _latest_row(table, article_id)
+    res = (
+        supabase.table(table).select("*").eq("article_id", article_id).lte("created_at", created_at)
+        .order("created_at", desc=True).limit(1).execute()
+    )
+    return res.data[0] if res.data else None
+
+
+def _build_payload(row: Dict[str, Any]) -> Dict[str, Any]:
+    article_id = str(row["article_id"])
+    created_at = row.get("created_at")
+    return {
+        "analysis_id": row["id"],
+        "article_id": article_id,
+        "created_at": created_at,
+        "lexicon_version": row.get("lexicon_version"),
+        "spans": json_column(row.get("spans")),
+        "angle": json_column(row.get("angle")),
+        "spectrum": json_column(row.get("spectrum")),
+        "reflection": json_column(row.get("gemini_reflection")),
+        "angle_fingerprint": _fingerprint_for("angle_fingerprints", article_id, created_at),
+        "spectrum_fingerprint": _fingerprint_for("spectrum_fingerprints", article_id, created_at),
+    }
+
+
+def _respond(entry: CachedAnalysis, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _require_db():
+    if not supabase:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection not available")
+
+
+@router.get("/analyses/{analysis_id}")
+async def get_analysis(analysis_id: UUID, if_none_match: Optional[str] = Header(None)):
+    """A stored analysis by id, with ETag / If-None-Match revalidation."""
+    # Cache reads check the article generation in the shared SQLite cache, so they run in the threadpool too
+    entry = await run_in_threadpool(analysis_cache.get, str(analysis_id))
+    if entry is None:
+        _require_db()
+
+        def load():
+            res = supabase.table("analyses").select("*").eq("id", str(analysis_id)).execute()
+            if not res.data:
+                return None
+            payload = _build_payload(res.data[0])
+            return analysis_cache.put(payload["analysis_id"], payload["article_id"], payload)
+
+        entry = await run_in_threadpool(load)
+        if entry is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Analysis {analysis_id} not found")
+    return _respond(entry, if_none_match)
+
+
+@router.get("/articles/{article_id}/analysis")
+async def get_latest_analysis(article_id: UUID, if_none_match: Optional[str] = Header(None)):
+    """The most recent analysis of an article, with ETag / If-None-Match revalidation."""
+    entry = await run_in_threadpool(analysis_cache.get_latest, str(article_id))
+    if entry is None:
+        _require_db()
+
+        def load():
+            row = _latest_row("analyses", str(article_id))
+            if not row:
+                return None
+            payload = _build_payload(row)
+            return analysis_cache.put(payload["analysis_id"], payload["article_id"], payload, latest=True)
+
+        entry = await run_in_threadpool(load)
+        if entry is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No analysis stored for article {article_id}")
+    return _respond(entry, if_none_match)
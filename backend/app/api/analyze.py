@@ -1,37 +1,118 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field, ValidationError
 from typing import Optional
 from uuid import UUID
-import httpx
 import os
-import json
+
+from fastapi.concurrency import run_in_threadpool
 
 from app.models.db import supabase
+from app.services.admission import llm_admission
 from app.services.gemini_adapter import get_gemini_adapter
+from app.services.large_text import MAX_INLINE_TEXT_CHARS
+from app.services.near_duplicate import NearDuplicateMatch, minhash_signature, near_duplicate_index
+from app.api.spans import merged_span_dicts
+from app.api.angle import heuristic_analyze
+from app.services.lexicon_registry import get_lexicons
+from app.services.prompt_builder import build_reflection_prompt
+from app.services.deadline import REUSED, Deadline, StageTracker
+from app.services.serialization import FastJSONResponse, json_column
+from app.services.shared_cache import cache_key, shared_cache
+from app.services.span_codec import span_set_row
+from app.services.analysis_cache import analysis_cache
+from app.services.fingerprint_index import fingerprint_index
+from app.services.spectrum_classifier import spectrum_source
+from app.api.political_spectrum import SpectrumInput, political_spectrum
 
 router = APIRouter()
 
-# Base URL for internal API calls (local or deployment)
-INTERNAL_API_BASE = os.getenv("INTERNAL_API_BASE", "http://localhost:8000").rstrip("/")
-print(f"🔧 INTERNAL_API_BASE = {INTERNAL_API_BASE}")
+# Time budget when the caller sends no deadline (the old per-call client timeout)
+ANALYZE_DEFAULT_DEADLINE_MS = int(os.getenv("ANALYZE_DEFAULT_DEADLINE_MS", "60000"))
+# Held back from the LLM stages so the partial result can still be saved
+ANALYZE_PERSIST_RESERVE_MS = int(os.getenv("ANALYZE_PERSIST_RESERVE_MS", "500"))
+# Spectrum's share of the remaining LLM budget; reflection gets the rest
+ANALYZE_SPECTRUM_SHARE = float(os.getenv("ANALYZE_SPECTRUM_SHARE", "0.4"))
+# Stages are skipped rather than started with less time than this
+ANALYZE_MIN_STAGE_MS = int(os.getenv("ANALYZE_MIN_STAGE_MS", "250"))
 
 
 class AnalyzeById(BaseModel):
     article_id: UUID
 
 class AnalyzeRaw(BaseModel):
-    text: str
+    text: str = Field(..., max_length=MAX_INLINE_TEXT_CHARS)
     url: Optional[str] = None
     title: Optional[str] = None
     source: Optional[str] = None
     published_at: Optional[str] = None
+    reuse_near_duplicates: bool = True
+    deadline_ms: Optional[int] = None
+
+
+def _load_reusable_analysis(match: NearDuplicateMatch) -> Optional[dict]:
+    """Fetch the LLM-backed parts of a near-duplicate's stored analysis."""
+    analysis_id = match.payload.get("analysis_id")
+    res = supabase.table("analyses").select("spectrum,gemini_reflection").eq("id", str(analysis_id)).execute()
+    if not res.data:
+        # Analysis was deleted — stop pointing new texts at it
+        near_duplicate_index.discard(match.key)
+        return None
+    row = res.data[0]
+    spectrum = json_column(row.get("spectrum")) or {}
+    if "left_right_score" not in spectrum:
+        return None
+    return {"spectrum": spectrum, "reflection": json_column(row.get("gemini_reflection")) or {}}
+
+
+async def _exact_duplicate(content_key: str) -> Optional[NearDuplicateMatch]:
+    """Identical text already analysed by any worker (shared SQLite cache)."""
+    payload = await shared_cache.aget("analysis", content_key)
+    if not payload:
+        return None
+    return NearDuplicateMatch(key=payload["article_id"], similarity=1.0, payload=payload)
+
+
+def _local_heuristics(text: str):
+    """Same payloads as /api/spans and /api/angle, computed in-process."""
+    lex = get_lexicons()
+    spans_json = {
+        "spans": merged_span_dicts(text, lex),
+        "lexicon_version": lex.version,
+    }
+    angle_json = heuristic_analyze(text, lex).model_dump()
+    return spans_json, angle_json
+
+
+def _resolve_deadline(header_ms: Optional[str], field_ms) -> Deadline:
+    """X-Deadline-Ms header wins over the deadline_ms field; both are relative budgets."""
+    value = header_ms if header_ms is not None else field_ms
+    if value is None:
+        return Deadline(ANALYZE_DEFAULT_DEADLINE_MS)
+    try:
+        budget_ms = int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(400, "deadline must be an integer number of milliseconds")
+    if budget_ms <= 0:
+        raise HTTPException(400, "deadline must be positive")
+    return Deadline(budget_ms)
 
 
-@router.post("/analyze")
-async def analyze(payload: dict):
-    """Unified analyze endpoint"""
+@router.post("/analyze", dependencies=[Depends(llm_admission)])
+async def analyze(payload: dict, x_deadline_ms: Optional[str] = Header(None)):
+    """
+    Unified analyze endpoint.
+    Callers may bound latency with an X-Deadline-Ms header or a deadline_ms
+    field; stages that do not fit are cancelled or skipped and the response
+    reports each stage's status.
+    """
+    deadline = _resolve_deadline(x_deadline_ms, payload.get("deadline_ms"))
+    stages = StageTracker(deadline)
+    reserve = ANALYZE_PERSIST_RESERVE_MS / 1000.0
+    min_stage = ANALYZE_MIN_STAGE_MS / 1000.0
 
     # STEP 1 — Load or create article
+    signature = None
+    near_dup = None
     if "article_id" in payload:
         article_id = payload["article_id"]
         res = supabase.table("articles").select("*").eq("id", str(article_id)).execute()
@@ -39,7 +120,16 @@ async def analyze(payload: dict):
             raise HTTPException(404, "Article not found")
         article = res.data[0]
     else:
-        raw = AnalyzeRaw(**payload)
+        try:
+            raw = AnalyzeRaw(**payload)
+        except ValidationError as e:
+            raise HTTPException(422, e.errors(include_url=False, include_context=False))
+        # Exact repeats and wire copies with small edits reuse an earlier analysis instead of calling Gemini again
+        signature = minhash_signature(raw.text)
+        if not near_duplicate_index.loaded:
+            await run_in_threadpool(near_duplicate_index.ensure_loaded)
+        if raw.reuse_near_duplicates:
+            near_dup = await _exact_duplicate(cache_key(raw.text)) or near_duplicate_index.query(raw.text, signature)
         insert_res = supabase.table("articles").insert({
             "title": raw.title or "Untitled",
             "content": raw.text,
@@ -52,21 +142,17 @@ async def analyze(payload: dict):
         article = insert_res.data[0]
         article_id = article["id"]
 
-    # STEP 2 — Call /spans
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        spans_resp = await client.post(
-            f"{INTERNAL_API_BASE}/api/spans",
-            json={"text": article["content"]},
-        )
-    spans_json = spans_resp.json()
-
-    # STEP 3 — Call /angle
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        angle_resp = await client.post(
-            f"{INTERNAL_API_BASE}/api/angle",
-            json={"text": article["content"]},
-        )
-    angle_json = angle_resp.json()
+    reused = _load_reusable_analysis(near_dup) if near_dup else None
+    if near_dup and not reused and near_dup.similarity == 1.0:
+        await shared_cache.adelete("analysis", cache_key(article["content"]))
+    if reused:
+        print(f"♻️ [ANALYZE] Near-duplicate of article {near_dup.payload.get('article_id')} (J≈{near_dup.similarity:.2f})")
+        # STEP 2/3/4 — Cheap local heuristics on the new wording, spectrum reused
+        spans_json, angle_json = stages.run_sync("heuristics", lambda: _local_heuristics(article["content"]))
+        spectrum_json = reused["spectrum"]
+        stages.record("spectrum", REUSED)
+    else:
+        spans_json, angle_json, spectrum_json = await _run_pipeline(article["content"], stages)
 
     angle_fp_res = supabase.table("angle_fingerprints").insert({
         "article_id": article_id,
@@ -76,62 +162,113 @@ async def analyze(payload: dict):
     }).execute()
     angle_fp_id = angle_fp_res.data[0]["id"]
 
-    # STEP 4 — Call /political-spectrum
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        spectrum_resp = await client.post(
-            f"{INTERNAL_API_BASE}/api/political-spectrum",
-            json={"text": article["content"]},
-        )
-    spectrum_json = spectrum_resp.json()
-
-    spectrum_fp_res = supabase.table("spectrum_fingerprints").insert({
-        "article_id": article_id,
-        "left_right_score": spectrum_json["left_right_score"],
-        "populist_score": spectrum_json["populist_score"],
-        "cluster": spectrum_json["cluster"],
-    }).execute()
-    spectrum_fp_id = spectrum_fp_res.data[0]["id"]
+    spectrum_fp_id = None
+    if spectrum_json and "left_right_score" in spectrum_json:
+        spectrum_fp_res = supabase.table("spectrum_fingerprints").insert({
+            "article_id": article_id,
+            "left_right_score": spectrum_json["left_right_score"],
+            "populist_score": spectrum_json["populist_score"],
+            "cluster": spectrum_json["cluster"],
+            "source": spectrum_source(spectrum_json),
+        }).execute()
+        spectrum_fp_id = spectrum_fp_res.data[0]["id"]
 
     # STEP 5 — Gemini Reflection
-    adapter = get_gemini_adapter()
-    prompt = (
-        "Analyze political framing severity and detect missing biases.\n\n"
-        f"TEXT:\n{article['content']}\n\n"
-        f"SPANS:\n{spans_json}\n\n"
-        f"ANGLE:\n{angle_json}\n\n"
-        f"SPECTRUM:\n{spectrum_json}\n\n"
-    )
-    reflection = {"first": await adapter.generate(prompt)}
+    if reused:
+        reflection = {
+            "first": reused["reflection"].get("first"),
+            "reused_from_analysis_id": near_dup.payload.get("analysis_id"),
+        }
+        stages.record("reflection", REUSED)
+    else:
+        adapter = get_gemini_adapter()
+        prompt, prompt_stats = build_reflection_prompt(article["content"], spans_json, angle_json, spectrum_json)
+        original_chars = prompt_stats.get("original_chars", f"~{prompt_stats['original_chars_est']}")
+        print(
+            f"🧮 [ANALYZE] Reflection prompt ~{prompt_stats['original_tokens_est']} -> "
+            f"~{prompt_stats['compact_tokens_est']} tokens "
+            f"({original_chars} -> {prompt_stats['compact_chars']} chars, "
+            f"spans {prompt_stats['spans_kept']}/{prompt_stats['spans_total']}, "
+            f"text truncated: {prompt_stats['text_truncated']})"
+        )
+        first = await stages.run(
+            "reflection",
+            lambda: adapter.generate(prompt, task="reflection"),
+            timeout=deadline.slice(reserve=reserve),
+            min_seconds=min_stage,
+        )
+        if isinstance(first, dict) and "error" in first:
+            stages.fail("reflection", first["error"])
+        reflection = {"first": first, "prompt_stats": prompt_stats}
 
-    # STEP 6 — Save spans in DB
-    for span in spans_json.get("spans", []):
-        supabase.table("spans").insert({
-            "article_id": article_id,
-            "span_type": span.get("type"),
-            "text": span.get("text"),
-            "start_index": span.get("start"),
-            "end_index": span.get("end"),
-        }).execute()
+    # STEP 6 — Save spans in DB (one packed row per article and lexicon version)
+    lexicon_version = angle_json.get("lexicon_version") or spans_json.get("lexicon_version")
+    supabase.table("span_sets").upsert(
+        span_set_row(article_id, spans_json.get("spans", []), lexicon_version),
+        on_conflict="article_id,lexicon_version",
+    ).execute()
 
     # STEP 7 — Save full analysis
+    # Stored as native JSONB (migration 005), so the objects go in as-is
     analysis_res = supabase.table("analyses").insert({
-    "article_id": article_id,
-    "spans": json.dumps(spans_json),
-    "angle": json.dumps(angle_json),
-    "spectrum": json.dumps(spectrum_json),
-    "gemini_reflection": json.dumps(reflection),
-}).execute()
+        "article_id": article_id,
+        "lexicon_version": lexicon_version,
+        "spans": spans_json,
+        "angle": angle_json,
+        "spectrum": spectrum_json,
+        "gemini_reflection": reflection,
+    }).execute()
 
     analysis_id = analysis_res.data[0]["id"]
+    # Cached "latest analysis" reads for this article are now stale in every worker
+    await run_in_threadpool(analysis_cache.invalidate_article, article_id)
+    fingerprint_index.add(article_id, angle_json, spectrum_json, analysis_res.data[0].get("created_at"))
+
+    # Only complete analyses are worth reusing for near-duplicates
+    if not stages.partial:
+        reuse_payload = {"article_id": str(article_id), "analysis_id": str(analysis_id)}
+        near_duplicate_index.add(str(article_id), article["content"], reuse_payload, signature=signature)
+        await shared_cache.aset("analysis", cache_key(article["content"]), reuse_payload)
+        await run_in_threadpool(near_duplicate_index.maybe_save)
+    else:
+        statuses = {name: stage["status"] for name, stage in stages.stages.items()}
+        print(f"⏱️ [ANALYZE] Partial result for {article_id} after {deadline.elapsed_ms():.0f} ms: {statuses}")
 
-    # STEP 8 — Response
-    return {
+    # STEP 8 — Response (already plain data; serialized once with orjson)
+    return FastJSONResponse({
         "article_id": article_id,
         "analysis_id": analysis_id,
         "angle_fingerprint_id": angle_fp_id,
         "spectrum_fingerprint_id": spectrum_fp_id,
+        "lexicon_version": lexicon_version,
+        "near_duplicate_of": {
+            "article_id": near_dup.payload.get("article_id"),
+            "analysis_id": near_dup.payload.get("analysis_id"),
+            "similarity": near_dup.similarity,
+        } if reused else None,
         "spans": spans_json,
         "angle": angle_json,
         "spectrum": spectrum_json,
         "reflection": reflection,
-    }
+        "partial": stages.partial,
+        "stages": stages.stages,
+        "deadline_ms": deadline.budget_ms,
+    })
+
+
+async def _run_pipeline(content: str, stages: StageTracker):
+    # STEP 2/3 — Spans and angle heuristics run in-process and always complete
+    spans_json, angle_json = stages.run_sync("heuristics", lambda: _local_heuristics(content))
+
+    # STEP 4 — Political spectrum, cancelled if it overruns its slice
+    reserve = ANALYZE_PERSIST_RESERVE_MS / 1000.0
+    spectrum_json = await stages.run(
+        "spectrum",
+        lambda: political_spectrum(SpectrumInput(text=content)),
+        timeout=stages.deadline.slice(ANALYZE_SPECTRUM_SHARE, reserve=reserve),
+        min_seconds=ANALYZE_MIN_STAGE_MS / 1000.0,
+    )
+    if isinstance(spectrum_json, dict) and "left_right_score" not in spectrum_json:
+        stages.fail("spectrum", spectrum_json.get("error") or "no spectrum scores returned")
+
+    return spans_json, angle_json, spectrum_json
@@ -1,16 +1,36 @@
 # angle_api.py
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, FastAPI, Request
 from pydantic import BaseModel, Field
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Iterable, Optional, Tuple
+import asyncio
+import json
+import os
 import re
 from collections import defaultdict
 
+from app.services.admission import admitted
+from app.services.gemini_adapter import get_gemini_adapter
+from app.services.large_text import MAX_INLINE_TEXT_CHARS
+from app.services.lexicon_registry import CompiledLexicons, get_lexicons
+from app.api.political_spectrum import extract_json
+
 router = APIRouter()
+gemini = None  # Real or mock, chosen on the first escalation (see get_adapter)
+
+# Tiered "llm" mode: escalate only when the heuristic is unsure and the caller can wait
+ANGLE_LLM_CONFIDENCE_THRESHOLD = float(os.getenv("ANGLE_LLM_CONFIDENCE_THRESHOLD", "0.75"))
+ANGLE_LLM_MIN_BUDGET_MS = int(os.getenv("ANGLE_LLM_MIN_BUDGET_MS", "1500"))
+ANGLE_LLM_TIMEOUT_SECONDS = float(os.getenv("ANGLE_LLM_TIMEOUT_SECONDS", "20"))
+ANGLE_LLM_MAX_TEXT_CHARS = 4000
+ANGLE_LLM_MAX_EVIDENCE = 8
+ANGLE_LLM_MAX_EVIDENCE_CHARS = 300
 
 # ---------- Schemas ----------
 class AngleInput(BaseModel):
-    text: str
-    mode: str = Field("heuristic", description="heuristic | llm (llm not implemented - placeholder)")
+    text: str = Field(..., max_length=MAX_INLINE_TEXT_CHARS)
+    mode: str = Field("heuristic", description="heuristic | llm (heuristic first, Gemini only when unsure)")
+    confidence_threshold: Optional[float] = Field(None, ge=0.0, le=1.0, description="llm mode: skip Gemini at or above this heuristic confidence")
+    latency_budget_ms: Optional[int] = Field(None, ge=0, description="llm mode: max time to spend on Gemini; small budgets stay heuristic-only")
 
 class AngleOutput(BaseModel):
     angle_summary: str
@@ -22,71 +42,12 @@ class AngleOutput(BaseModel):
     angle_categories: List[str]
     confidence: float
     mode_used: str
+    lexicon_version: Optional[str] = None
 
 # ---------- Lexicons & Patterns ----------
-# Narrative angle lexicons grouped by angle -> set(words or phrases)
-ANGLE_LEXICONS = {
-    "crisis": {"crisis", "disaster", "catastrophic", "emergency", "collapse"},
-    "blame": {"fault", "blame", "responsible", "negligence", "accused", "failure"},
-    "moral-outrage": {"corrupt", "outrageous", "unethical", "immoral", "betrayal", "scandal"},
-    "hero-villain": {"hero", "villain", "savior", "enemy", "fight against", "standing up to"},
-    "underdog": {"little guy", "ordinary people", "underdog", "outmatched", "stacked against"},
-    "economic-anxiety": {"job losses", "unemployment", "we can't afford", "economic collapse", "recession"},
-    "health-risk": {"unsafe", "hazardous", "toxic", "life-threatening", "infectious"},
-    "identity": {"people like us", "outsiders", "they don't understand", "not one of us"},
-    "nostalgia": {"back when", "bring back", "golden age", "we used to"},
-    "futurism": {"future", "next generation", "innovative", "transformative", "revolutionize"},
-    "conspiracy": {"cover-up", "hidden agenda", "behind the scenes", "they don't want you to know"},
-    "anecdotal": {"i saw", "i heard", "my friend", "people say", "someone told me"},
-    "narrative-arc": {"at first", "initially", "but then", "however", "in the end", "finally", "as a result"},
-}
-
-# Persuasion techniques lexicons
-PERSUASION_LEXICONS = {
-    "bandwagon": {"everyone", "everybody", "people are", "everyone agrees", "join the crowd"},
-    "appeal-to-authority": {"experts say", "scientists agree", "according to doctors", "research shows"},
-    "emotional-exaggeration": {"catastrophic", "horrifying", "unbelievable", "outrageous", "shocking"},
-    "absolutist": {"always", "never", "everyone", "no one", "guaranteed", "100%"},
-    "urgency": {"act now", "time is running out", "before it's too late", "urgent"},
-    "loaded-question": {"why would they", "how come they", "isn't it obvious"},
-    "rhetorical-contrast": {"unlike them", "we choose", "they choose", "on the other hand"},
-    "fear-appeal": {"fear", "afraid", "terrified", "panic", "scared"},
-    "social-proof": {"reviews", "testimonials", "people say", "users report"},
-}
-
-# Map angle -> category (coarse grouping)
-ANGLE_CATEGORY_MAP = {
-    "crisis": "Fear / Threat",
-    "blame": "Anger / Accountability",
-    "moral-outrage": "Anger / Moral",
-    "hero-villain": "Narrative / Characters",
-    "underdog": "Identity / Power",
-    "economic-anxiety": "Economic",
-    "health-risk": "Health / Safety",
-    "identity": "Identity",
-    "nostalgia": "Nostalgia",
-    "futurism": "Progress / Innovation",
-    "conspiracy": "Conspiratorial",
-    "anecdotal": "Anecdotal",
-    "narrative-arc": "Narrative / Structure",
-}
-
-# Emotion mapping for quick assignment
-ANGLE_TO_EMOTION = {
-    "crisis": "fear",
-    "blame": "anger",
-    "moral-outrage": "anger",
-    "hero-villain": "trust/antagonism",
-    "underdog": "sympathy",
-    "economic-anxiety": "anxiety",
-    "health-risk": "fear",
-    "identity": "belonging",
-    "nostalgia": "nostalgia",
-    "futurism": "hope",
-    "conspiracy": "suspicion",
-    "anecdotal": "empathy",
-    "narrative-arc": "engagement",
-}
+# ANGLE_LEXICONS, PERSUASION_LEXICONS, ANGLE_CATEGORY_MAP and ANGLE_TO_EMOTION
+# live in app/data/lexicons.json and are served by the lexicon registry,
+# so they can be tuned and hot-reloaded without a deploy.
 
 # Helper regexes
 SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
@@ -106,16 +67,16 @@ def find_sentences_with_terms(text: str, terms: List[str]) -> List[str]:
                 break
     return found
 
-def match_lexicon(text: str, lexicon: Dict[str, set]) -> Tuple[List[str], Dict[str, int]]:
+def match_lexicon(text: str, lexicon: Dict[str, Iterable[str]]) -> Tuple[List[str], Dict[str, int]]:
     """
     Return list of matched keys and counts.
     """
     matches = []
     counts = defaultdict(int)
     lowered = text.lower()
-    # Sort lexicon values by descending length to prefer multi-word matches first
+    # Registry lexicons are pre-sorted by descending length (multi-word matches first)
     for key, phrases in lexicon.items():
-        for ph in sorted(phrases, key=len, reverse=True):
+        for ph in phrases:
             if ph in lowered:
                 counts[key] += lowered.count(ph)
     for k, v in counts.items():
@@ -136,70 +97,69 @@ def compute_intensity(counts: Dict[str, int], total_words: int) -> Dict[str, flo
     return scores
 
 # ---------- Main heuristic analyzer ----------
-def heuristic_analyze(text: str) -> AngleOutput:
-    if not text:
-        return AngleOutput(
-            angle_summary="No text provided.",
-            dominant_emotions=[],
-            framing_patterns=[],
-            persuasion_techniques=[],
-            evidence_spans=[],
-            intensity_scores={},
-            angle_categories=[],
-            confidence=0.0,
-            mode_used="heuristic",
-        )
+def lexicon_counts(text: str, lexicons: Optional[CompiledLexicons] = None) -> Tuple[Dict[str, int], Dict[str, int], int]:
+    """Angle and persuasion phrase counts plus word count; additive across sentences."""
+    lex = lexicons or get_lexicons()
+    lowered = text.strip().lower()
+    _, angle_counts = match_lexicon(lowered, lex.angle_lexicons)
+    _, pers_counts = match_lexicon(lowered, lex.persuasion_lexicons)
+    return dict(angle_counts), dict(pers_counts), len(re.findall(r"\w+", lowered))
 
-    norm_text = text.strip()
-    lowered = norm_text.lower()
-    total_words = len(re.findall(r"\w+", lowered))
-
-    # Match angles
-    angle_matches, angle_counts = match_lexicon(lowered, ANGLE_LEXICONS)
 
-    # Match persuasion techniques
-    pers_matches, pers_counts = match_lexicon(lowered, PERSUASION_LEXICONS)
+def build_angle_output(
+    angle_counts: Dict[str, int],
+    pers_counts: Dict[str, int],
+    total_words: int,
+    evidence_for: Callable[[str, str], List[str]],
+    fallback_evidence: Callable[[], List[str]],
+    lexicons: Optional[CompiledLexicons] = None,
+) -> AngleOutput:
+    """
+    AngleOutput from aggregated counts. `evidence_for(kind, key)` returns the
+    sentences matching an angle / persuasion key, so callers holding
+    per-sentence counts (live sessions) need not rescan the whole text.
+    """
+    lex = lexicons or get_lexicons()
+    # Same order as a whole-text scan: lexicon order, matched keys only
+    angle_matches = [k for k in lex.angle_lexicons if angle_counts.get(k)]
+    pers_matches = [k for k in lex.persuasion_lexicons if pers_counts.get(k)]
 
     # Evidence spans: sentence-level evidence for both sets of matches
     evidence_spans = []
     # For angles: collect sentences containing any of the lexicon phrases for matched angles
     for angle in angle_matches:
-        phrases = ANGLE_LEXICONS.get(angle, set())
-        evidence_spans.extend(find_sentences_with_terms(norm_text, list(phrases)))
+        evidence_spans.extend(evidence_for("angle", angle))
     # For persuasion techniques: add only sentences not already included
     for pers in pers_matches:
-        phrases = PERSUASION_LEXICONS.get(pers, set())
-        for s in find_sentences_with_terms(norm_text, list(phrases)):
+        for s in evidence_for("persuasion", pers):
             if s not in evidence_spans:
                 evidence_spans.append(s)
 
     # Also attach short keyword spans (first N tokens) as secondary evidence
     # but keep sentences primary
     if not evidence_spans:
-        # fallback: top matched words
-        top_words = sorted(re.findall(r"\w+", lowered), key=lambda x: lowered.count(x), reverse=True)[:5]
-        evidence_spans = [" ".join(top_words)]
+        evidence_spans = fallback_evidence()
 
     # Dominant emotions: map from angle matches
     emotion_set = []
     for a in angle_matches:
-        em = ANGLE_TO_EMOTION.get(a)
+        em = lex.angle_to_emotion.get(a)
         if em and em not in emotion_set:
             emotion_set.append(em)
 
     # Categories
     categories = []
     for a in angle_matches:
-        cat = ANGLE_CATEGORY_MAP.get(a)
+        cat = lex.angle_category_map.get(a)
         if cat and cat not in categories:
             categories.append(cat)
 
     # Intensity scores
     intensity_scores = {}
     # Angles intensity
-    intensity_scores.update({f"angle:{k}": v for k, v in compute_intensity(angle_counts, total_words).items()})
+    intensity_scores.update({f"angle:{k}": v for k, v in compute_intensity({k: angle_counts[k] for k in angle_matches}, total_words).items()})
     # Persuasion intensity
-    intensity_scores.update({f"persuasion:{k}": v for k, v in compute_intensity(pers_counts, total_words).items()})
+    intensity_scores.update({f"persuasion:{k}": v for k, v in compute_intensity({k: pers_counts[k] for k in pers_matches}, total_words).items()})
 
     # Confidence heuristic: combine distinct signals and text length
     signal_strength = (len(angle_matches) + len(pers_matches))
@@ -227,22 +187,164 @@ def heuristic_analyze(text: str) -> AngleOutput:
         angle_categories=categories,
         confidence=confidence,
         mode_used="heuristic",
+        lexicon_version=lex.version,
     )
 
+
+def top_words_evidence(text: str) -> List[str]:
+    # fallback: top matched words
+    lowered = text.strip().lower()
+    top_words = sorted(re.findall(r"\w+", lowered), key=lambda x: lowered.count(x), reverse=True)[:5]
+    return [" ".join(top_words)]
+
+
+def heuristic_analyze(text: str, lexicons: Optional[CompiledLexicons] = None) -> AngleOutput:
+    lex = lexicons or get_lexicons()
+
+    if not text:
+        return AngleOutput(
+            angle_summary="No text provided.",
+            dominant_emotions=[],
+            framing_patterns=[],
+            persuasion_techniques=[],
+            evidence_spans=[],
+            intensity_scores={},
+            angle_categories=[],
+            confidence=0.0,
+            mode_used="heuristic",
+            lexicon_version=lex.version,
+        )
+
+    norm_text = text.strip()
+    angle_counts, pers_counts, total_words = lexicon_counts(norm_text, lex)
+
+    def evidence_for(kind: str, key: str) -> List[str]:
+        lexicon = lex.angle_lexicons if kind == "angle" else lex.persuasion_lexicons
+        return find_sentences_with_terms(norm_text, list(lexicon.get(key, ())))
+
+    return build_angle_output(
+        angle_counts, pers_counts, total_words, evidence_for, lambda: top_words_evidence(norm_text), lex
+    )
+
+# ---------- Tiered LLM escalation ----------
+ANGLE_LLM_PROMPT = """
+You are a media-framing analyst. Review the heuristic findings below for
+the given text and correct them. Return ONLY strict JSON:
+{
+  "framing_patterns": [angles from the allowed list],
+  "persuasion_techniques": [techniques from the allowed list],
+  "dominant_emotions": [short emotion words],
+  "angle_summary": one or two sentences,
+  "confidence": float from 0.0 to 1.0
+}
+"""
+
+def build_angle_llm_prompt(text: str, heuristic: AngleOutput, lex: CompiledLexicons) -> str:
+    """Compact prompt: allowed labels, heuristic candidates, evidence sentences and a bounded excerpt."""
+    evidence = "\n".join(f"- {s[:ANGLE_LLM_MAX_EVIDENCE_CHARS]}" for s in heuristic.evidence_spans[:ANGLE_LLM_MAX_EVIDENCE])
+    excerpt = text[:ANGLE_LLM_MAX_TEXT_CHARS]
+    if len(text) > ANGLE_LLM_MAX_TEXT_CHARS:
+        excerpt += " [...]"
+    return (
+        ANGLE_LLM_PROMPT
+        + f"\nAllowed angles: {', '.join(lex.angle_lexicons)}"
+        + f"\nAllowed techniques: {', '.join(lex.persuasion_lexicons)}"
+        + f"\nHeuristic angles: {', '.join(heuristic.framing_patterns) or 'none'}"
+        + f"\nHeuristic techniques: {', '.join(heuristic.persuasion_techniques) or 'none'}"
+        + f"\nHeuristic confidence: {heuristic.confidence}"
+        + f"\nEvidence:\n{evidence or '- none'}"
+        + f"\n\nText:\n{excerpt}"
+    )
+
+def merge_llm_result(heuristic: AngleOutput, llm: Dict, lex: CompiledLexicons) -> AngleOutput:
+    """Union of heuristic and LLM labels, restricted to the lexicon vocabulary."""
+    def _merge(base: List[str], extra, allowed) -> List[str]:
+        merged = list(base)
+        for item in extra if isinstance(extra, list) else []:
+            if item in allowed and item not in merged:
+                merged.append(item)
+        return merged
+
+    patterns = _merge(heuristic.framing_patterns, llm.get("framing_patterns"), lex.angle_lexicons)
+    techniques = _merge(heuristic.persuasion_techniques, llm.get("persuasion_techniques"), lex.persuasion_lexicons)
+
+    emotions = list(heuristic.dominant_emotions)
+    for em in [lex.angle_to_emotion.get(a) for a in patterns] + list(llm.get("dominant_emotions") or []):
+        if isinstance(em, str) and em and em not in emotions:
+            emotions.append(em)
+
+    categories = []
+    for a in patterns:
+        cat = lex.angle_category_map.get(a)
+        if cat and cat not in categories:
+            categories.append(cat)
+
+    try:
+        llm_confidence = min(0.99, max(0.0, float(llm.get("confidence", 0.0))))
+    except (TypeError, ValueError):
+        llm_confidence = 0.0
+
+    summary = llm.get("angle_summary")
+    return heuristic.model_copy(update={
+        "angle_summary": summary if isinstance(summary, str) and summary else heuristic.angle_summary,
+        "dominant_emotions": emotions,
+        "framing_patterns": patterns,
+        "persuasion_techniques": techniques,
+        "angle_categories": categories,
+        "confidence": round(max(heuristic.confidence, llm_confidence), 3),
+        "mode_used": "llm",
+    })
+
+def get_adapter():
+    """Create the Gemini adapter on first escalation instead of per request."""
+    global gemini
+    if gemini is None:
+        gemini = get_gemini_adapter()
+    return gemini
+
+async def escalate_to_llm(text: str, heuristic: AngleOutput, lex: CompiledLexicons, timeout: Optional[float]) -> AngleOutput:
+    adapter = get_adapter()
+    prompt = build_angle_llm_prompt(text, heuristic, lex)
+    try:
+        result = await asyncio.wait_for(adapter.generate(prompt, task="angle"), timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"⏱️ [ANGLE] LLM escalation exceeded {timeout}s budget, returning heuristic result")
+        return heuristic.model_copy(update={"mode_used": "llm-timeout"})
+
+    raw = result.get("raw_response") if isinstance(result, dict) else None
+    try:
+        parsed = json.loads(extract_json(raw or ""))
+    except (ValueError, TypeError):
+        print(f"⚠️ [ANGLE] LLM escalation returned no usable JSON: {result}")
+        return heuristic.model_copy(update={"mode_used": "llm-fallback"})
+    if not isinstance(parsed, dict):
+        return heuristic.model_copy(update={"mode_used": "llm-fallback"})
+    return merge_llm_result(heuristic, parsed, lex)
+
 # ---------- FastAPI endpoint ----------
 @router.post("/angle", response_model=AngleOutput)
-async def analyze_angle(payload: AngleInput):
+async def analyze_angle(payload: AngleInput, request: Request):
     text = payload.text or ""
     mode = payload.mode or "heuristic"
 
-    # Only heuristic implemented here. Hook for LLM can be plugged in later.
-    if mode != "heuristic":
-        # Placeholder behaviour: return heuristic analysis but mark mode_used accordingly.
-        out = heuristic_analyze(text)
-        out.mode_used = f"llm-fallback"
-        return out
+    lex = get_lexicons()
+    heuristic = heuristic_analyze(text, lex)
+    if mode == "heuristic":
+        return heuristic
+
+    # Tiered mode: only ambiguous texts with enough latency budget pay for the LLM
+    threshold = payload.confidence_threshold if payload.confidence_threshold is not None else ANGLE_LLM_CONFIDENCE_THRESHOLD
+    if heuristic.confidence >= threshold or not text.strip():
+        return heuristic
+
+    budget_ms = payload.latency_budget_ms
+    if budget_ms is not None and budget_ms < ANGLE_LLM_MIN_BUDGET_MS:
+        return heuristic.model_copy(update={"mode_used": "heuristic-budget"})
 
-    return heuristic_analyze(text)
+    timeout = budget_ms / 1000.0 if budget_ms is not None else ANGLE_LLM_TIMEOUT_SECONDS
+    # Admission only for requests that actually reach Gemini; heuristic answers stay free
+    async with admitted(request):
+        return await escalate_to_llm(text, heuristic, lex, timeout)
 
 # ---------- App for standalone run ----------
 app = FastAPI()
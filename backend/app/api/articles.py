@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from typing import Any, AsyncIterator, Dict, List, Tuple
 from uuid import UUID
+import json
+import os
+import time
 from app.models.db import supabase
 from app.models.article import ArticleCreate, ArticleResponse
+from app.services.analysis_cache import analysis_cache
+from app.services.fingerprint_index import fingerprint_index
+from app.services.analysis_queue import analysis_queue
 
 router = APIRouter()
 
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "200"))
+BULK_MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", str(1 << 20)))
+
 
 @router.post("/articles", response_model=ArticleResponse, status_code=status.HTTP_201_CREATED)
 async def create_article(article: ArticleCreate):
@@ -100,6 +111,8 @@ async def delete_article(id: UUID):
         print("🔄 [DELETE] Deleting from Supabase...")
         delete_result = supabase.table("articles").delete().eq("id", str(id)).execute()
         print("🟢 [DELETE] Delete result:", delete_result)
+        await run_in_threadpool(analysis_cache.invalidate_article, str(id))
+        fingerprint_index.remove(str(id))
 
         print("✅ [DELETE] Article deleted successfully")
         return None
@@ -108,3 +121,106 @@ async def delete_article(id: UUID):
     except Exception as e:
         print("💥 [DELETE] Error:", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error deleting article: {e}")
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = BULK_MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, bytes]]:
+    """(line number, raw line) pairs from a streamed body; overlong lines come back as None."""
+    buffer = b""
+    line_no = 0
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            newline = buffer.find(b"\n")
+            if newline == -1:
+                break
+            line, buffer = buffer[:newline], buffer[newline + 1:]
+            if skipping:
+                skipping = False
+                continue
+            line_no += 1
+            yield line_no, line
+        if len(buffer) > max_line_bytes and not skipping:
+            # Do not buffer an unbounded line; report it and drop the rest of it
+            line_no += 1
+            yield line_no, None
+            buffer, skipping = b"", True
+        elif skipping:
+            buffer = b""
+    if buffer.strip() and not skipping:
+        yield line_no + 1, buffer
+
+
+def _insert_batch(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    result = supabase.table("articles").insert(rows).execute()
+    if not result.data or len(result.data) != len(rows):
+        raise RuntimeError("Batch insert returned an unexpected number of rows")
+    return result.data
+
+
+@router.post("/articles/bulk")
+async def bulk_create_articles(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=1000),
+    analyze: bool = Query(False, description="Queue each created article for /api/analyze"),
+):
+    """
+    Ingest a streamed NDJSON body of ArticleCreate objects.
+    Rows are inserted in batches of `batch_size`; the body is only read
+    further once the previous batch has committed, so a fast client is
+    slowed to the database's pace. Returns one status per non-empty line.
+    """
+    print(f"➡️ [BULK] Ingest started (batch_size={batch_size}, analyze={analyze})")
+
+    if not supabase:
+        print("❌ [BULK] Supabase client is None")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection not available")
+
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    counts = {"created": 0, "invalid": 0, "failed": 0, "queued": 0}
+
+    async def flush():
+        if not batch:
+            return
+        line_numbers = [n for n, _ in batch]
+        try:
+            created = await run_in_threadpool(_insert_batch, [row for _, row in batch])
+        except Exception as e:
+            print(f"💥 [BULK] Batch of {len(batch)} failed: {e}")
+            results.extend({"line": n, "status": "failed", "error": str(e)} for n in line_numbers)
+            counts["failed"] += len(batch)
+        else:
+            for n, row in zip(line_numbers, created):
+                entry = {"line": n, "status": "created", "id": row["id"]}
+                if analyze:
+                    entry["queued"] = analysis_queue.submit(row["id"])
+                    counts["queued"] += entry["queued"]
+                results.append(entry)
+            counts["created"] += len(created)
+        batch.clear()
+
+    async for line_no, line in iter_ndjson_lines(request.stream()):
+        if line is None:
+            results.append({"line": line_no, "status": "invalid", "error": f"Line exceeds {BULK_MAX_LINE_BYTES} bytes"})
+            counts["invalid"] += 1
+            continue
+        if not line.strip():
+            continue
+        try:
+            article = ArticleCreate.model_validate(json.loads(line))
+        except (ValueError, ValidationError) as e:
+            error = e.errors(include_url=False, include_context=False) if isinstance(e, ValidationError) else str(e)
+            results.append({"line": line_no, "status": "invalid", "error": error})
+            counts["invalid"] += 1
+            continue
+        batch.append((line_no, article.model_dump()))
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+
+    results.sort(key=lambda r: r["line"])
+    took = time.perf_counter() - started
+    print(f"✅ [BULK] {counts} in {took:.2f}s")
+    return {**counts, "took_ms": round(took * 1000, 1), "results": results}
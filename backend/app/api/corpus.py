@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+
+from app.models.db import supabase
+from app.services.corpus_stats import corpus_matrix
+
+router = APIRouter()
+
+
+def _parse_percentiles(raw: str):
+    try:
+        values = [float(p) for p in raw.split(",") if p.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="percentiles must be comma-separated numbers")
+    if any(p < 0 or p > 100 for p in values):
+        raise HTTPException(status_code=422, detail="percentiles must be between 0 and 100")
+    return values
+
+
+@router.get("/corpus/framing-stats")
+async def framing_stats(
+    group_by: Optional[str] = Query(None, pattern="^(source|week)$"),
+    kind: str = Query("all", pattern="^(all|angle|persuasion)$"),
+    percentiles: str = Query("50,90"),
+    top_k: int = Query(5, ge=1, le=50),
+    source: Optional[str] = None,
+    week_from: Optional[str] = Query(None, description="ISO week, e.g. 2025-W40"),
+    week_to: Optional[str] = Query(None, description="ISO week, e.g. 2025-W46"),
+    refresh: bool = True,
+):
+    """
+    Corpus-level angle / persuasion statistics over stored articles.
+    Only articles added since the previous call are counted.
+    """
+    pcts = _parse_percentiles(percentiles)
+
+    if refresh:
+        if not supabase:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection not available")
+        try:
+            added = await run_in_threadpool(corpus_matrix.refresh, supabase)
+        except Exception as e:
+            print("💥 [CORPUS] Refresh error:", e)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error loading articles: {e}")
+        print(f"🟢 [CORPUS] Counted {added} new articles ({corpus_matrix.size} cached)")
+
+    return await run_in_threadpool(
+        corpus_matrix.stats,
+        group_by=group_by,
+        kind=kind,
+        percentiles=pcts,
+        top_k=top_k,
+        source=source,
+        week_from=week_from,
+        week_to=week_to,
+    )
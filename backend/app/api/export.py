@@ -0,0 +1,183 @@
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import base64
+import binascii
+import csv
+import io
+import json
+import zlib
+
+from app.models.db import supabase
+from app.services.serialization import dumps, json_column
+
+router = APIRouter()
+
+EXPORT_PAGE_SIZE = 500
+# PostgREST's default max-rows: a larger limit is silently truncated to this
+EXPORT_MAX_PAGE_SIZE = 1000
+ARTICLE_COLUMNS = "id,title,author,content,created_at"
+ANALYSIS_COLUMNS = "id,article_id,created_at,lexicon_version,spans,angle,spectrum,gemini_reflection"
+CSV_FIELDS = [
+    "cursor", "article_id", "title", "author", "created_at", "content",
+    "analysis_id", "analysis_created_at", "lexicon_version",
+    "cluster", "left_right_score", "populist_score", "framing_patterns",
+    "spans", "angle", "spectrum", "reflection",
+]
+
+
+# ---------- Keyset cursor ----------
+def encode_cursor(created_at: str, article_id: str) -> str:
+    raw = json.dumps([created_at, article_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, article_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(created_at), str(article_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid export cursor")
+
+
+# ---------- Paging ----------
+def fetch_page(client, after: Optional[Tuple[str, str]], page_size: int) -> List[Dict[str, Any]]:
+    """Next page of articles strictly after the (created_at, id) keyset position."""
+    query = client.table("articles").select(ARTICLE_COLUMNS).order("created_at").order("id")
+    if after:
+        created_at, article_id = after
+        query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{article_id})')
+    return query.limit(page_size).execute().data or []
+
+
+def latest_analyses(client, article_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Newest analysis per article for one page, in a single query (one row per article)."""
+    if not article_ids:
+        return {}
+    rows = (
+        client.table("latest_article_analyses").select(ANALYSIS_COLUMNS)
+        .in_("article_id", article_ids)
+        .execute().data or []
+    )
+    return {str(row["article_id"]): row for row in rows}
+
+
+def export_records(client, after: Optional[Tuple[str, str]] = None, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Articles joined with their latest analysis; holds at most one page in
+    memory. Paging stops on an empty page rather than a short one, since the
+    server may cap a page below `page_size`.
+    """
+    page_size = min(page_size, EXPORT_MAX_PAGE_SIZE)
+    while True:
+        articles = fetch_page(client, after, page_size)
+        if not articles:
+            return
+        analyses = latest_analyses(client, [str(a["id"]) for a in articles])
+        for article in articles:
+            analysis = analyses.get(str(article["id"]))
+            yield {
+                "cursor": encode_cursor(str(article["created_at"]), str(article["id"])),
+                "article": article,
+                "analysis": {
+                    "id": analysis["id"],
+                    "created_at": analysis.get("created_at"),
+                    "lexicon_version": analysis.get("lexicon_version"),
+                    "spans": json_column(analysis.get("spans")),
+                    "angle": json_column(analysis.get("angle")),
+                    "spectrum": json_column(analysis.get("spectrum")),
+                    "reflection": json_column(analysis.get("gemini_reflection")),
+                } if analysis else None,
+            }
+        last = articles[-1]
+        after = (str(last["created_at"]), str(last["id"]))
+
+
+# ---------- Encoders ----------
+def _csv_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    article, analysis = record["article"], record["analysis"] or {}
+    spectrum = analysis.get("spectrum") or {}
+    angle = analysis.get("angle") or {}
+    nested = lambda value: dumps(value).decode() if value is not None else ""
+    return {
+        "cursor": record["cursor"],
+        "article_id": article["id"],
+        "title": article.get("title"),
+        "author": article.get("author"),
+        "created_at": article.get("created_at"),
+        "content": article.get("content"),
+        "analysis_id": analysis.get("id"),
+        "analysis_created_at": analysis.get("created_at"),
+        "lexicon_version": analysis.get("lexicon_version"),
+        "cluster": spectrum.get("cluster"),
+        "left_right_score": spectrum.get("left_right_score"),
+        "populist_score": spectrum.get("populist_score"),
+        "framing_patterns": ";".join(angle.get("framing_patterns") or []),
+        "spans": nested(analysis.get("spans")),
+        "angle": nested(analysis.get("angle")),
+        "spectrum": nested(analysis.get("spectrum")),
+        "reflection": nested(analysis.get("reflection")),
+    }
+
+
+def encode_stream(records: Iterator[Dict[str, Any]], fmt: str, batch: int = 100) -> Iterator[bytes]:
+    """NDJSON lines or CSV rows, flushed in small batches."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for i, record in enumerate(records, 1):
+            writer.writerow(_csv_row(record))
+            if i % batch == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+        return
+
+    chunk: List[bytes] = []
+    for record in records:
+        chunk.append(dumps(record) + b"\n")
+        if len(chunk) >= batch:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+
+def gzip_stream(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ---------- Endpoint ----------
+@router.get("/export")
+def export_articles(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    cursor: Optional[str] = Query(None, description="Resume after this record (the `cursor` of the last line received)"),
+    page_size: int = Query(EXPORT_PAGE_SIZE, ge=1, le=EXPORT_MAX_PAGE_SIZE),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Streams every article joined with its latest analysis, oldest first.
+    Memory stays at one page regardless of table size; send
+    Accept-Encoding: gzip for a compressed stream.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    if not supabase:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection not available")
+
+    print(f"➡️ [EXPORT] format={format} cursor={cursor!r} page_size={page_size}")
+    body = encode_stream(export_records(supabase, after, page_size), format)
+    headers = {"Content-Disposition": f'attachment; filename="unbias-export.{format}"'}
+    if "gzip" in (accept_encoding or "").lower():
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(body, media_type=media_type, headers=headers)
@@ -1,14 +1,44 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from pydantic import BaseModel
-from app.services.gemini_adapter import get_gemini_adapter
+from typing import Optional
+import hmac
+import os
+
+from app.services.admission import llm_admission
+from app.services.gemini_adapter import gemini_resilience, get_gemini_adapter, model_router
 
 router = APIRouter()
 
+# Raw prompt passthrough to Gemini: off unless explicitly enabled, and token-protected when a token is set
+GEMINI_TEST_ENABLED = os.getenv("GEMINI_TEST_ENABLED", "false").lower() in ("1", "true", "yes")
+GEMINI_TEST_TOKEN = os.getenv("GEMINI_TEST_TOKEN", "")
+
+
 class PromptInput(BaseModel):
     prompt: str
 
-@router.post("/gemini/test")
+
+def require_test_access(x_gemini_test_token: Optional[str] = Header(None)):
+    if not GEMINI_TEST_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if GEMINI_TEST_TOKEN and not (x_gemini_test_token and hmac.compare_digest(x_gemini_test_token, GEMINI_TEST_TOKEN)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Missing or invalid X-Gemini-Test-Token header")
+
+
+@router.post("/gemini/test", dependencies=[Depends(require_test_access), Depends(llm_admission)])
 async def gemini_test(input: PromptInput):
     adapter = get_gemini_adapter()
     response = await adapter.generate(input.prompt)
     return {"adapter": adapter.__class__.__name__, "response": response}
+
+
+@router.get("/gemini/health")
+async def gemini_health():
+    """Retry / hedge counters and circuit-breaker state of the Gemini backend."""
+    return gemini_resilience.snapshot()
+
+
+@router.get("/gemini/routing")
+async def gemini_routing():
+    """Per-task model routes with observed latency and degradation state."""
+    return model_router.snapshot()
@@ -1,8 +1,24 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.admission import admission
+from app.services.lifecycle import readiness
 
 router = APIRouter()
 
 @router.get("/health")
 async def health_check():
+    """Liveness: the process is up and serving; says nothing about dependencies."""
     return {"status": "ok"}
 
+
+@router.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once start-up warm-up has finished without errors, else 503."""
+    return JSONResponse(readiness.snapshot(), status_code=200 if readiness.ready else 503)
+
+
+@router.get("/admission")
+async def admission_metrics():
+    """Admission-control state for LLM routes: slots in use, queue depth, shed / rate-limited counts."""
+    return admission.snapshot()
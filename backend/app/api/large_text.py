@@ -0,0 +1,167 @@
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import re
+
+from app.api.angle import SENTENCE_SPLIT_RE, build_angle_output, heuristic_analyze
+from app.api.spans import extract_span_dicts
+from app.services.large_text import (
+    LARGE_TEXT_MAX_BYTES,
+    TextTooLarge,
+    Window,
+    iter_windows,
+    open_text,
+    spool_stream,
+)
+from app.services.lexicon_registry import CompiledLexicons, get_lexicons
+from app.services.serialization import dumps
+from app.services.span_merge import merge_spans, resolve_policy, shift_span
+
+router = APIRouter()
+
+WORD_RE = re.compile(r"\w+")
+MAX_EVIDENCE_PER_KEY = 20
+MAX_TRACKED_WORDS = 50000  # fallback word counts are pruned past this many distinct words
+
+
+def window_spans(window: Window, lex: CompiledLexicons, policy: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Spans owned by this window, with absolute offsets. Merging sees the overlap, so it matches a whole-text pass."""
+    spans = merge_spans(extract_span_dicts(window.text, lex), policy)
+    return sorted(
+        (shift_span(s, window.offset) for s in spans if window.owns(s["start"])),
+        key=lambda s: (s["start"], s["end"]),
+    )
+
+
+def _count_owned(text: str, phrase: str, lo: int, hi: int) -> int:
+    """Non-overlapping occurrences (like str.count) that start in [lo, hi)."""
+    count, i = 0, text.find(phrase, lo)
+    while i != -1 and i < hi:
+        count += 1
+        i = text.find(phrase, i + len(phrase))
+    return count
+
+
+class WindowedAngle:
+    """
+    Accumulates heuristic_analyze's counts window by window: phrase hits,
+    words and evidence sentences are credited to the window that owns their
+    start. Evidence is capped per key so memory stays bounded.
+    """
+
+    def __init__(self, lex: CompiledLexicons, max_evidence: int = MAX_EVIDENCE_PER_KEY):
+        self.lex = lex
+        self.max_evidence = max_evidence
+        self.angle_counts: Dict[str, int] = {}
+        self.pers_counts: Dict[str, int] = {}
+        self.words = 0
+        self.chars = 0
+        self.word_counts: Counter = Counter()
+        self.evidence: Dict[Tuple[str, str], List[str]] = {}
+
+    def add(self, window: Window):
+        lowered = window.text.lower()
+        lo, hi = window.own_slice.start, window.own_slice.stop
+        self.chars += hi - lo
+
+        matched: List[Tuple[str, str, Tuple[str, ...]]] = []
+        for kind, lexicon, counts in (
+            ("angle", self.lex.angle_lexicons, self.angle_counts),
+            ("persuasion", self.lex.persuasion_lexicons, self.pers_counts),
+        ):
+            for key, phrases in lexicon.items():
+                n = sum(_count_owned(lowered, ph, lo, hi) for ph in phrases)
+                if n:
+                    counts[key] = counts.get(key, 0) + n
+                    matched.append((kind, key, tuple(phrases)))
+
+        for word in WORD_RE.finditer(lowered, lo):
+            if word.start() >= hi:
+                break
+            self.words += 1
+            self.word_counts[word.group()] += 1
+        if len(self.word_counts) > MAX_TRACKED_WORDS:
+            self.word_counts = Counter(dict(self.word_counts.most_common(MAX_TRACKED_WORDS // 5)))
+
+        if matched:
+            self._collect_evidence(window, lowered, lo, hi, matched)
+
+    def _collect_evidence(self, window: Window, lowered: str, lo: int, hi: int, matched):
+        starts = [0] if window.offset == 0 else []
+        starts += [m.end() for m in SENTENCE_SPLIT_RE.finditer(window.text)]
+        bounds = [m.start() for m in SENTENCE_SPLIT_RE.finditer(window.text)] + [len(window.text)]
+        for start in starts:
+            if not lo <= start < hi:
+                continue
+            end = bounds[bisect_left(bounds, start)]
+            sentence = lowered[start:end]
+            for kind, key, phrases in matched:
+                found = self.evidence.setdefault((kind, key), [])
+                if len(found) < self.max_evidence and any(ph in sentence for ph in phrases):
+                    found.append(window.text[start:end].strip())
+
+    def result(self) -> Dict[str, Any]:
+        if not self.chars:
+            return heuristic_analyze("", self.lex).model_dump()
+        top_words = [w for w, _ in self.word_counts.most_common(5)]
+        return build_angle_output(
+            self.angle_counts,
+            self.pers_counts,
+            self.words,
+            lambda kind, key: self.evidence.get((kind, key), []),
+            # Whole-word counts; heuristic_analyze's substring counts would need the full text
+            lambda: [" ".join(top_words)],
+            self.lex,
+        ).model_dump()
+
+
+def stream_heuristics(spool, lex: CompiledLexicons, policy: Optional[str]) -> Iterator[bytes]:
+    """NDJSON: one line per span in offset order, then a summary line with the document angle."""
+    angle = WindowedAngle(lex)
+    windows = spans = 0
+    try:
+        for window in iter_windows(open_text(spool)):
+            windows += 1
+            found = window_spans(window, lex, policy)
+            spans += len(found)
+            angle.add(window)
+            if found:
+                yield b"".join(dumps(s) + b"\n" for s in found)
+        yield dumps({
+            "summary": {
+                "chars": angle.chars,
+                "windows": windows,
+                "spans": spans,
+                "lexicon_version": lex.version,
+                "angle": angle.result(),
+            }
+        }) + b"\n"
+    finally:
+        spool.close()
+
+
+@router.post("/large-text/heuristics")
+async def large_text_heuristics(request: Request, merge: Optional[str] = None, content_length: Optional[int] = Header(None)):
+    """
+    Spans and angle heuristics for documents of any size, sent as a raw UTF-8
+    body. The body is spooled to a temporary file past LARGE_TEXT_SPOOL_BYTES
+    and scanned in overlapping windows, so memory stays bounded.
+    """
+    try:
+        policy = resolve_policy(merge)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if content_length is not None and content_length > LARGE_TEXT_MAX_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"document exceeds {LARGE_TEXT_MAX_BYTES} bytes")
+
+    try:
+        spool = await spool_stream(request.stream())
+    except TextTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+    size = spool.seek(0, 2)
+    spool.seek(0)
+    print(f"📄 [LARGE-TEXT] Scanning {size} bytes in windows (merge={policy})")
+    return StreamingResponse(stream_heuristics(spool, get_lexicons(), policy), media_type="application/x-ndjson")
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.lexicon_registry import CompiledLexicons, get_lexicons, lexicon_registry
+
+router = APIRouter()
+
+
+def _describe(lex: CompiledLexicons) -> dict:
+    return {
+        "version": lex.version,
+        "source": lex.source,
+        "loaded_at": lex.loaded_at,
+        "heuristic_labels": len(lex.heuristics),
+        "angle_keys": len(lex.angle_lexicons),
+        "persuasion_keys": len(lex.persuasion_lexicons),
+    }
+
+
+@router.get("/lexicons")
+async def get_lexicon_info():
+    return _describe(get_lexicons())
+
+
+@router.post("/lexicons/reload")
+async def reload_lexicons():
+    """
+    Re-read the lexicon file and atomically swap it in.
+    In-flight requests finish on the snapshot they started with. Other
+    workers follow within LEXICON_SYNC_SECONDS through the shared cache
+    (with it disabled, only the worker serving this request reloads).
+    """
+    previous = get_lexicons().version
+    try:
+        # Compile off the event loop so concurrent requests keep flowing
+        lex = await run_in_threadpool(lexicon_registry.reload, None, True)
+    except ValueError as e:
+        print(f"❌ [LEXICON] Reload rejected, keeping version {previous}: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Lexicon reload failed: {e}")
+
+    print(f"✅ [LEXICON] Swapped version {previous} -> {lex.version}")
+    return {"previous_version": previous, **_describe(lex)}
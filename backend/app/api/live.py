@@ -0,0 +1,156 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, Dict, Optional
+import asyncio
+import json
+import os
+import time
+import uuid
+
+from app.services.live_document import LIVE_MAX_DOCUMENT_CHARS, DocumentTooLarge, LiveDocument
+from app.services.span_merge import resolve_policy
+
+router = APIRouter()
+
+# Analyse once typing pauses for LIVE_DEBOUNCE_MS, but at least every LIVE_MAX_DELAY_MS during long bursts
+LIVE_DEBOUNCE_MS = float(os.getenv("LIVE_DEBOUNCE_MS", "250"))
+LIVE_MAX_DELAY_MS = float(os.getenv("LIVE_MAX_DELAY_MS", "1000"))
+LIVE_MAX_MESSAGE_CHARS = int(os.getenv("LIVE_MAX_MESSAGE_CHARS", "65536"))
+LIVE_MAX_PENDING_MESSAGES = 256
+
+CLOSE_TOO_LARGE = 1009
+CLOSE_POLICY = 1008
+CLOSE_UNSUPPORTED = 1003
+
+
+def _apply(doc: LiveDocument, message: Dict[str, Any]) -> bool:
+    """Apply one client message to the document; True when the text changed."""
+    kind = message.get("type")
+    if kind in ("init", "set"):
+        doc.set_text(str(message.get("text") or ""))
+        return True
+    if kind == "delta":
+        for delta in message.get("deltas") or [message]:
+            doc.apply_delta(int(delta["start"]), int(delta["end"]), str(delta.get("text") or ""))
+        return True
+    raise ValueError(f"unknown message type {kind!r}")
+
+
+@router.websocket("/live")
+async def live_analysis(websocket: WebSocket, merge: Optional[str] = None):
+    """
+    Live bias highlights for editors.
+
+    Client -> server (JSON):
+      {"type": "init", "text": "..."}                      replace the document
+      {"type": "delta", "start": 10, "end": 12, "text": "x"} replace [start, end)
+      {"type": "delta", "deltas": [...]}                    several edits in order
+      {"type": "flush"} / {"type": "snapshot"}             analyse now / full state
+
+    Server -> client: "ready", then "diff" messages with added spans (absolute
+    offsets at `version`), removed span ids and changed angle fields, sent
+    once typing pauses; "snapshot" on request; "error" for rejected messages.
+    """
+    await websocket.accept()
+    try:
+        merge = resolve_policy(merge)
+    except ValueError as e:
+        await websocket.close(code=CLOSE_POLICY, reason=str(e))
+        return
+
+    session = uuid.uuid4().hex[:12]
+    doc = LiveDocument(merge=merge)
+    inbox: asyncio.Queue = asyncio.Queue(maxsize=LIVE_MAX_PENDING_MESSAGES)
+
+    async def reader():
+        # Always ends by posting one terminal event, so the main loop never waits forever
+        event = ("closed", None)
+        try:
+            while True:
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    break
+                raw = frame.get("text")
+                if raw is None:
+                    event = ("binary", None)
+                    break
+                if len(raw) > LIVE_MAX_MESSAGE_CHARS:
+                    event = ("too_large", None)
+                    break
+                await inbox.put(("message", raw))
+        except Exception as e:
+            print(f"💥 [LIVE] Session {session} reader failed: {e!r}")
+        await inbox.put(event)
+
+    async def send_diff():
+        started = time.monotonic()
+        # Re-analysing a large init takes long enough to stall other requests on the loop
+        diff, analysed = await run_in_threadpool(doc.analyse)
+        if diff["added"] or diff["removed"] or diff["angle"]:
+            await websocket.send_json({
+                "type": "diff",
+                "version": doc.version,
+                "spans": {"added": diff["added"], "removed": diff["removed"]},
+                "angle": diff["angle"],
+                "sentences_analysed": analysed,
+                "elapsed_ms": round((time.monotonic() - started) * 1000.0, 2),
+            })
+
+    print(f"🔌 [LIVE] Session {session} opened (merge={merge})")
+    await websocket.send_json({
+        "type": "ready",
+        "session": session,
+        "debounce_ms": LIVE_DEBOUNCE_MS,
+        "max_document_chars": LIVE_MAX_DOCUMENT_CHARS,
+        "max_message_chars": LIVE_MAX_MESSAGE_CHARS,
+    })
+
+    read_task = asyncio.create_task(reader())
+    dirty_since: Optional[float] = None
+    last_edit = 0.0
+    try:
+        while True:
+            timeout = None
+            if dirty_since is not None:
+                flush_at = min(last_edit + LIVE_DEBOUNCE_MS / 1000.0, dirty_since + LIVE_MAX_DELAY_MS / 1000.0)
+                timeout = max(0.0, flush_at - time.monotonic())
+            try:
+                event, raw = await asyncio.wait_for(inbox.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                await send_diff()
+                dirty_since = None
+                continue
+
+            if event == "closed":
+                break
+            if event == "too_large":
+                await websocket.close(code=CLOSE_TOO_LARGE, reason="message too large")
+                break
+            if event == "binary":
+                await websocket.close(code=CLOSE_UNSUPPORTED, reason="only JSON text frames are accepted")
+                break
+
+            try:
+                message = json.loads(raw)
+                if message.get("type") in ("flush", "snapshot"):
+                    if message["type"] == "snapshot":
+                        snapshot = await run_in_threadpool(doc.snapshot)
+                        await websocket.send_json({"type": "snapshot", "version": doc.version, **snapshot})
+                    else:
+                        await send_diff()
+                    dirty_since = None
+                    continue
+                if _apply(doc, message):
+                    last_edit = time.monotonic()
+                    dirty_since = dirty_since or last_edit
+            except DocumentTooLarge as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                await websocket.close(code=CLOSE_TOO_LARGE, reason="document too large")
+                break
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                await websocket.send_json({"type": "error", "detail": f"invalid message: {e}", "version": doc.version})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        read_task.cancel()
+        print(f"🔌 [LIVE] Session {session} closed at version {doc.version} ({doc.length} chars)")
@@ -1,16 +1,24 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
 from typing import Any, Dict
 import json
+import os
 
+from app.services.admission import llm_admission
 from app.services.gemini_adapter import get_gemini_adapter
+from app.services.large_text import MAX_INLINE_TEXT_CHARS
+from app.services.spectrum_classifier import get_spectrum_classifier
 
 router = APIRouter()
-gemini = get_gemini_adapter()  # Real or mock automatically
+gemini = None  # Real or mock, chosen on first use (see get_adapter)
+
+# Local classifier answers on its own at or above this confidence
+SPECTRUM_LOCAL_CONFIDENCE = float(os.getenv("SPECTRUM_LOCAL_CONFIDENCE", "0.8"))
 
 
 class SpectrumInput(BaseModel):
-    text: str
+    text: str = Field(..., max_length=MAX_INLINE_TEXT_CHARS)
+    allow_local: bool = True
 
 
 # --------------------------
@@ -74,20 +82,35 @@ Now classify the following text:
 """
 
 
+def get_adapter():
+    """Create the Gemini adapter on first use instead of at import time."""
+    global gemini
+    if gemini is None:
+        gemini = get_gemini_adapter()
+    return gemini
+
+
 # --------------------------
 # 🚀 ENDPOINT
 # --------------------------
 
-@router.post("/political-spectrum")
+@router.post("/political-spectrum", dependencies=[Depends(llm_admission)])
 async def political_spectrum(input: SpectrumInput):
     """
-    Uses Gemini to classify political spectrum.
+    Classifies political spectrum with the local model when it is
+    confident enough, otherwise with Gemini.
     Falls back to mock adapter if API key missing.
     """
 
+    classifier = get_spectrum_classifier() if input.allow_local else None
+    if classifier:
+        local = classifier.predict(input.text)
+        if local["confidence"] >= SPECTRUM_LOCAL_CONFIDENCE:
+            return {**local, "source": "local"}
+
     prompt = BASE_PROMPT + "\n" + input.text
 
-    gemini_response = await gemini.generate(prompt)
+    gemini_response = await get_adapter().generate(prompt, task="spectrum")
 
     # If adapter error
     if "error" in gemini_response:
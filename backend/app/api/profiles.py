@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from typing import Optional
+
+from app.services import profiling
+from app.services.profiling import profiler
+
+router = APIRouter()
+
+
+def _check_access(token: Optional[str]):
+    # Profiles expose code paths and timings: never served without a token, even when enabled
+    if not profiling.PROFILING_ENABLED or not profiler.token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Missing or invalid {profiling.PROFILING_HEADER} header")
+
+
+@router.get("/debug/profiles")
+async def list_profiles(
+    limit: int = Query(20, ge=1, le=200),
+    x_profile_token: Optional[str] = Header(None, alias=profiling.PROFILING_HEADER),
+):
+    """Recent request profiles, newest first: route, input size, duration and top functions."""
+    _check_access(x_profile_token)
+    return {"profiler": profiler.snapshot(), "profiles": profiler.recent(limit)}
+
+
+@router.get("/debug/profiles/{name}")
+async def download_profile(name: str, x_profile_token: Optional[str] = Header(None, alias=profiling.PROFILING_HEADER)):
+    """Raw profile: pstats dump (.prof, open with snakeviz / pstats) or pyinstrument HTML."""
+    _check_access(x_profile_token)
+    path = profiler.path_of(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No profile named {name}")
+    return FileResponse(path, filename=name + path[path.rfind("."):])
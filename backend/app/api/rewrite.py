@@ -1,11 +1,15 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from app.services.gemini_adapter import get_gemini_adapter
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from app.services.admission import llm_admission
+from app.services.gemini_adapter import get_gemini_adapter, model_router
+from app.services.large_text import MAX_INLINE_TEXT_CHARS
+from app.services.paragraph_memo import rewrite_paragraphs
+from app.services.shared_cache import cache_key
 
 router = APIRouter()
 
 class RewriteInput(BaseModel):
-    text: str
+    text: str = Field(..., max_length=MAX_INLINE_TEXT_CHARS)
 
 SYSTEM_PROMPT = """
 You are an impartial rewriting engine designed to remove ideological, political,
@@ -21,29 +25,39 @@ Your task:
 - Do NOT say "the original text said" — produce a clean rewritten text directly.
 """
 
-@router.post("/unbias")
+REWRITE_INSTRUCTION = "\n\nRewrite the following text neutrally:\n\n"
+# Cached paragraph rewrites are only reused under the same prompt; they are also keyed by the model that wrote them
+PROMPT_VERSION = cache_key(SYSTEM_PROMPT, REWRITE_INSTRUCTION)[:16]
+
+
+@router.post("/unbias", dependencies=[Depends(llm_admission)])
 async def unbias_text(input: RewriteInput):
     try:
         adapter = get_gemini_adapter()
+        models = model_router.route("rewrite").models
 
-        prompt = (
-            SYSTEM_PROMPT
-            + "\n\nRewrite the following text neutrally:\n\n"
-            + input.text
-        )
+        async def rewrite(paragraph: str):
+            result = await adapter.generate(SYSTEM_PROMPT + REWRITE_INSTRUCTION + paragraph, task="rewrite")
 
-        result = await adapter.generate(prompt)
+            # handle failure or malformed output: the paragraph keeps its original text
+            if isinstance(result, dict) and "raw_response" in result:
+                return result["raw_response"], result.get("model") or models[0]
+            print(f"⚠️ [UNBIAS] Paragraph rewrite failed: {result.get('error') if isinstance(result, dict) else result}")
+            return None, None
 
-        # handle failure or malformed output
-        unbiased = None
-        if isinstance(result, dict) and "raw_response" in result:
-            unbiased = result["raw_response"]
-        else:
-            unbiased = str(result)
+        memo = await rewrite_paragraphs(input.text, rewrite, PROMPT_VERSION, models)
+        if memo.paragraphs > 1 or memo.failed_paragraphs:
+            print(
+                f"✍️ [UNBIAS] {memo.paragraphs} paragraphs, {memo.cached_paragraphs} from cache, "
+                f"{memo.rewritten_paragraphs} rewritten, {memo.failed_paragraphs} failed"
+            )
 
         return {
             "original_text": input.text,
-            "unbiased_text": unbiased,
+            "unbiased_text": memo.text,
+            "paragraphs": memo.paragraphs,
+            "cached_paragraphs": memo.cached_paragraphs,
+            "failed_paragraphs": memo.failed_paragraphs,
         }
 
     except Exception as e:
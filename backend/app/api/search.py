@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List, Optional
+import time
+
+from app.models.db import supabase
+
+router = APIRouter()
+
+
+@router.get("/search")
+async def search_articles(
+    q: Optional[str] = Query(None, description="Words or \"quoted phrases\"; supports OR and -exclusion"),
+    label: Optional[List[str]] = Query(None, description="Only articles with a span of one of these labels"),
+    pattern: Optional[List[str]] = Query(None, description="Only articles with one of these angle patterns"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+):
+    """
+    Ranked full-text search over articles, backed by the GIN-indexed
+    search_vector column and the search_articles() SQL function.
+    """
+    print(f"➡️ [SEARCH] q={q!r} labels={label} patterns={pattern} page={page}")
+
+    if not (q and q.strip()) and not label and not pattern:
+        raise HTTPException(status_code=400, detail="Provide a query, a span label or an angle pattern")
+
+    if not supabase:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection not available")
+
+    started = time.perf_counter()
+    try:
+        result = supabase.rpc("search_articles", {
+            "search_query": q,
+            "span_labels": label,
+            "angle_patterns": pattern,
+            "page_size": page_size,
+            "page_offset": (page - 1) * page_size,
+        }).execute()
+    except Exception as e:
+        print("💥 [SEARCH] Error:", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error searching articles: {e}")
+
+    rows = result.data or []
+    total = rows[0]["total_count"] if rows else 0
+    return {
+        "query": q,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": [{k: v for k, v in row.items() if k != "total_count"} for row in rows],
+    }
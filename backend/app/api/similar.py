@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from uuid import UUID
+import time
+
+from app.models.db import supabase
+from app.services.fingerprint_index import fingerprint_index
+
+router = APIRouter()
+
+
+@router.get("/articles/{article_id}/similar")
+async def similar_articles(
+    article_id: UUID,
+    k: int = Query(10, ge=1, le=100),
+    min_score: float = Query(0.0, ge=-1.0, le=1.0),
+):
+    """
+    Articles framed like this one: top-k cosine neighbours over angle /
+    persuasion intensities and left-right / populist scores of each
+    article's latest analysis.
+    """
+    if not supabase:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection not available")
+
+    if fingerprint_index.stale():
+        try:
+            loaded = await run_in_threadpool(fingerprint_index.refresh, supabase)
+        except Exception as e:
+            print("💥 [SIMILAR] Refresh error:", e)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error loading fingerprints: {e}")
+        print(f"🟢 [SIMILAR] Loaded {loaded} analyses ({fingerprint_index.size} fingerprints indexed)")
+
+    started = time.perf_counter()
+    # Ask for a few extra in case some neighbours were deleted in another worker
+    # In the threadpool: a refresh in another request holds the index lock while it loads rows
+    neighbours = await run_in_threadpool(fingerprint_index.neighbours, str(article_id), k=k + 5, min_score=min_score)
+    search_ms = (time.perf_counter() - started) * 1000.0
+    if neighbours is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No framing fingerprint for article {article_id}")
+
+    articles = {}
+    if neighbours:
+        res = (
+            supabase.table("articles").select("id,title,author,created_at")
+            .in_("id", [n["article_id"] for n in neighbours]).execute()
+        )
+        articles = {str(a["id"]): a for a in res.data or []}
+        # Deleted through another worker: drop them here too so they stop coming back
+        for n in neighbours:
+            if n["article_id"] not in articles:
+                fingerprint_index.remove(n["article_id"])
+    results = [
+        {**n, "title": articles[n["article_id"]].get("title"), "author": articles[n["article_id"]].get("author"),
+         "created_at": articles[n["article_id"]].get("created_at")}
+        for n in neighbours if n["article_id"] in articles
+    ][:k]
+
+    return {
+        "article_id": str(article_id),
+        "neighbours": results,
+        "indexed": fingerprint_index.size,
+        "search_ms": round(search_ms, 3),
+    }
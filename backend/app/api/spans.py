@@ -1,13 +1,21 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List, Optional
-import re
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.models.db import supabase
+from app.services.large_text import MAX_INLINE_TEXT_CHARS
+from app.services.lexicon_registry import CompiledLexicons, get_lexicons
+from app.services.serialization import FastJSONResponse
+from app.services.span_codec import decode_spans
+from app.services.span_merge import merge_spans
 
 router = APIRouter()
 
 
 class SpanRequest(BaseModel):
-    text: str
+    text: str = Field(..., max_length=MAX_INLINE_TEXT_CHARS)
+    merge: Optional[str] = Field(None, description="none | longest | confidence | group (default: SPAN_MERGE_POLICY)")
 
 
 class Span(BaseModel):
@@ -16,154 +24,74 @@ class Span(BaseModel):
     start: int
     end: int
     confidence: float
+    labels: Optional[List[str]] = None  # group policy: every label in this interval, this span's first (only when more than one)
+    members: Optional[List[Dict[str, Any]]] = None  # group policy: each grouped hit's label, start, end and confidence
 
 
 class SpanResponse(BaseModel):
     spans: List[Span]
+    lexicon_version: Optional[str] = None
 
 
-HEURISTICS = [
-    # label, patterns, confidence
-
-    # --- Existing (kept) ---
-    ("Overgeneralization", 
-        [r"\balways\b", r"\bnever\b", r"\bmost\b", r"\bmuch of\b", r"\beveryone\b", r"\bno one\b"],
-        0.70
-    ),
-
-    ("Intent Attribution", 
-        [r"\bdeliberately\b", r"\bintentionally\b", r"\bon purpose\b", r"\btrying to\b"],
-        0.65
-    ),
-
-    ("Loaded Language", 
-        [r"\balarming\b", r"\bdisastrous\b", r"\bcatastrophic\b", r"\bshocking\b"],
-        0.60
-    ),
-
-    ("Paternalistic", 
-        [r"\bmakes it difficult\b", r"\bcannot\b", r"\bunable to\b", r"\bincapable of\b"],
-        0.55
-    ),
-
-    # --- New Categories ---
-
-    # Emotional exaggeration
-    ("Emotional Reasoning",
-        [r"\bI feel like\b", r"\bit feels like\b", r"\bseems like\b"],
-        0.55
-    ),
-
-    # Claims of knowing someone’s internal emotional state
-    ("Mind Reading",
-        [r"\byou think\b", r"\byou believe\b", r"\byou clearly want\b"],
-        0.58
-    ),
-
-    # Doom language
-    ("Catastrophizing",
-        [r"\bthis will ruin\b", r"\bthis is the end\b", r"\bworst case\b", r"\bterrible outcome\b"],
-        0.62
-    ),
-
-    # Blaming, simplistic cause-effect
-    ("Causal Oversimplification",
-        [r"\bthe reason is\b", r"\bbecause of them\b", r"\bit’s their fault\b"],
-        0.65
-    ),
-
-    # "Should" rules / moralization
-    ("Moralizing / 'Should' Statements",
-        [r"\byou should\b", r"\byou shouldn't\b", r"\byou ought to\b", r"\bthey must\b"],
-        0.60
-    ),
-
-    # Absolutist / binary framing
-    ("Black-and-White Thinking",
-        [r"\beither\b", r"\bor else\b", r"\bonly option\b", r"\bthere is no alternative\b"],
-        0.63
-    ),
-
-    # Insinuation without evidence
-    ("Speculative Accusation",
-        [r"\bprobably lying\b", r"\bclearly hiding\b", r"\bmust be cheating\b"],
-        0.67
-    ),
-
-    ("Appeal to Fear",
-        [r"\byou will lose\b", r"\byou will regret\b", r"\byou won't survive\b"],
-        0.64
-    ),
-
-    # Minimizing, dismissing legitimate concerns
-    ("Minimization",
-        [r"\bnot a big deal\b", r"\byou're overreacting\b", r"\bit’s nothing\b"],
-        0.52
-    ),
-
-    # Exaggerated certainty or expertise
-    ("Unwarranted Certainty",
-        [r"\bI know for a fact\b", r"\bthere is no doubt\b", r"\bguaranteed\b"],
-        0.66
-    ),
-
-    # Implies universal shared beliefs
-    ("Bandwagon / Common Knowledge",
-        [r"\beveryone knows\b", r"\ball of us agree\b", r"\bcommon knowledge\b"],
-        0.58
-    ),
-
-    # Claims of inherent group traits
-    ("Stereotyping",
-        [r"\bpeople like you\b", r"\bthey're all\b", r"\bthose people\b"],
-        0.68
-    ),
-
-    # exaggerated causality patterns
-    ("Slippery Slope",
-        [r"\bwill lead to\b", r"\bthis is how it starts\b", r"\bnext thing you know\b"],
-        0.64
-    ),
-
-    # framing attack as benevolence
-    ("Passive-Aggressive / Faux-Concern",
-        [r"\bjust trying to help\b", r"\bfor your own good\b"],
-        0.57
-    ),
-
-    # gives impression of lack of agency
-    ("Victim Language / External Locus",
-        [r"\bI have no choice\b", r"\bthere’s nothing I can do\b"],
-        0.56
-    ),
-
-    # infers traits from single actions
-    ("Labelling",
-        [r"\bI'm such a failure\b", r"\bthey're idiots\b"],
-        0.59
-    ),
-]
-
-
-
-def extract_spans(text: str) -> List[Span]:
-    spans: List[Span] = []
-
-    for label, patterns, conf in HEURISTICS:
+# HEURISTICS (label, patterns, confidence) are loaded from app/data/lexicons.json
+# by the lexicon registry and pre-compiled once per lexicon version.
+
+
+def extract_span_dicts(text: str, lexicons: Optional[CompiledLexicons] = None) -> List[Dict[str, Any]]:
+    """Spans as plain dicts; the fields already satisfy `Span`, so they skip re-validation."""
+    spans: List[Dict[str, Any]] = []
+    lex = lexicons or get_lexicons()
+
+    for label, patterns, conf in lex.heuristics:
         for pattern in patterns:
-            for match in re.finditer(pattern, text, flags=re.IGNORECASE):
+            for match in pattern.finditer(text):
                 start, end = match.span()
-                spans.append(Span(
-                    label=label,
-                    span_text=text[start:end],
-                    start=start,
-                    end=end,
-                    confidence=conf
-                ))
+                spans.append({
+                    "label": label,
+                    "span_text": text[start:end],
+                    "start": start,
+                    "end": end,
+                    "confidence": conf,
+                })
     return spans
 
 
+def merged_span_dicts(text: str, lexicons: Optional[CompiledLexicons] = None, policy: Optional[str] = None) -> List[Dict[str, Any]]:
+    try:
+        return merge_spans(extract_span_dicts(text, lexicons), policy)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def extract_spans(text: str, lexicons: Optional[CompiledLexicons] = None) -> List[Span]:
+    return [Span.model_construct(**span) for span in extract_span_dicts(text, lexicons)]
+
+
 @router.post("/spans", response_model=SpanResponse)
 async def detect_spans(payload: SpanRequest):
-    spans = extract_spans(payload.text)
-    return SpanResponse(spans=spans)
+    lex = get_lexicons()
+    spans = merged_span_dicts(payload.text, lex, payload.merge)
+    return FastJSONResponse({"spans": spans, "lexicon_version": lex.version})
+
+
+@router.get("/articles/{article_id}/spans", response_model=SpanResponse)
+async def get_article_spans(article_id: UUID, lexicon_version: Optional[str] = None, merge: Optional[str] = None):
+    """Stored spans of an article, decoded from its packed span set (latest version by default)."""
+    if not supabase:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection not available")
+
+    query = supabase.table("span_sets").select("lexicon_version,labels,payload").eq("article_id", str(article_id))
+    if lexicon_version:
+        query = query.eq("lexicon_version", lexicon_version)
+    res = query.order("created_at", desc=True).limit(1).execute()
+    if not res.data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No spans stored for article {article_id}")
+    row = res.data[0]
+
+    article = supabase.table("articles").select("content").eq("id", str(article_id)).execute()
+    text = article.data[0]["content"] if article.data else None
+    try:
+        spans = merge_spans(decode_spans(row["labels"], row["payload"], text), merge)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse({"spans": spans, "lexicon_version": row["lexicon_version"]})
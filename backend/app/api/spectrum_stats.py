@@ -0,0 +1,66 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from datetime import date
+from typing import Any, Dict, Optional
+
+from app.models.db import supabase
+
+router = APIRouter()
+
+ALL_AUTHORS = "*"
+
+
+def summarize_aggregate(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a spectrum_aggregates row (running sums) into averages and a distribution."""
+    count = int(row.get("article_count") or 0)
+    clusters = {k: int(v) for k, v in (row.get("cluster_counts") or {}).items() if int(v) > 0}
+    return {
+        "author": row.get("author_key"),
+        "bucket": row.get("bucket"),
+        "bucket_start": row.get("bucket_start"),
+        "article_count": count,
+        "avg_left_right_score": round(row.get("left_right_sum", 0) / count, 4) if count else None,
+        "avg_populist_score": round(row.get("populist_sum", 0) / count, 4) if count else None,
+        "cluster_counts": clusters,
+        "cluster_distribution": {k: round(v / count, 4) for k, v in clusters.items()} if count else {},
+    }
+
+
+@router.get("/spectrum/aggregates")
+async def spectrum_aggregates(
+    author: str = Query(ALL_AUTHORS, description="Article author, '*' for all authors"),
+    bucket: str = Query("week", pattern="^(day|week|month)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(52, ge=1, le=366),
+):
+    """
+    Average left/right and populist scores plus cluster distribution per
+    time bucket. Reads pre-aggregated rows, so cost depends on the number
+    of buckets requested, not on the number of analysed articles.
+    """
+    print(f"➡️ [SPECTRUM-AGG] author={author} bucket={bucket} start={start} end={end}")
+
+    if not supabase:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection not available")
+
+    try:
+        query = (
+            supabase.table("spectrum_aggregates")
+            .select("*")
+            .eq("author_key", author)
+            .eq("bucket", bucket)
+        )
+        if start:
+            query = query.gte("bucket_start", start.isoformat())
+        if end:
+            query = query.lte("bucket_start", end.isoformat())
+        result = query.order("bucket_start", desc=True).limit(limit).execute()
+    except Exception as e:
+        print("💥 [SPECTRUM-AGG] Error:", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error fetching aggregates: {e}")
+
+    return {
+        "author": author,
+        "bucket": bucket,
+        "buckets": [summarize_aggregate(row) for row in result.data or []],
+    }
@@ -4,6 +4,8 @@ import httpx
 import os
 from typing import Optional
 
+from app.services.large_text import MAX_INLINE_TEXT_CHARS
+
 router = APIRouter(
     prefix="/extract-text",
     tags=["Text Extraction"]
@@ -60,4 +62,11 @@ async def extract_text(request: ExtractRequest):
     if not extracted_text:
         raise HTTPException(status_code=404, detail="No text found in article.")
 
+    if len(extracted_text) > MAX_INLINE_TEXT_CHARS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Extracted text is {len(extracted_text)} characters; the analysis endpoints accept up to "
+                   f"{MAX_INLINE_TEXT_CHARS}. Send it to /api/large-text/heuristics instead.",
+        )
+
     return {"text": extracted_text}
@@ -11,13 +11,26 @@ from app.api import (
     analyze,
     political_spectrum,
     text_extractor,
-    rewrite
+    rewrite,
+    lexicons,
+    corpus,
+    spectrum_stats,
+    search,
+    analyses,
+    export,
+    live,
+    large_text,
+    similar,
+    profiles
 )
+from app.services.lifecycle import in_flight, lifespan
+from app.services.profiling import PROFILING_ENABLED, profiler
 
 # Load env variables
 load_dotenv()
 
-app = FastAPI(title="UnBias API", version="1.0.0")
+# Clients and indexes are created in the lifespan / on first use, not on import
+app = FastAPI(title="UnBias API", version="1.0.0", lifespan=lifespan)
 
 # =========================
 # CORS CONFIG — REQUIRED FOR FRONTEND
@@ -29,6 +42,13 @@ origins = [
     "*"  # keep for development — remove in production if needed
 ]
 
+# Counts in-flight requests (reported by /api/ready)
+app.add_middleware(in_flight.middleware)
+
+# Opt-in request profiling; nothing is installed (no per-request cost) unless enabled
+if PROFILING_ENABLED:
+    app.add_middleware(profiler.middleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -49,6 +69,16 @@ app.include_router(political_spectrum.router, prefix="/api", tags=["political_sp
 app.include_router(text_extractor.router, prefix="/api", tags=["text_extractor"])
 app.include_router(analyze.router, prefix="/api", tags=["analyze"])
 app.include_router(rewrite.router, prefix="/api", tags=["rewrite"])
+app.include_router(lexicons.router, prefix="/api", tags=["lexicons"])
+app.include_router(corpus.router, prefix="/api", tags=["corpus"])
+app.include_router(spectrum_stats.router, prefix="/api", tags=["spectrum_stats"])
+app.include_router(search.router, prefix="/api", tags=["search"])
+app.include_router(analyses.router, prefix="/api", tags=["analyses"])
+app.include_router(export.router, prefix="/api", tags=["export"])
+app.include_router(live.router, prefix="/api", tags=["live"])
+app.include_router(large_text.router, prefix="/api", tags=["large_text"])
+app.include_router(similar.router, prefix="/api", tags=["similar"])
+app.include_router(profiles.router, prefix="/api", tags=["profiles"])
 
 
 @app.get("/")
@@ -1,12 +1,15 @@
 import os
-from typing import Optional
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING, Any, Optional
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 # Load environment variables from .env
 load_dotenv()
 
-def get_supabase_client() -> Optional[Client]:
+def get_supabase_client() -> Optional["Client"]:
     """
     Get Supabase client instance.
     Returns None if environment variables are missing (with a warning).
@@ -14,23 +17,63 @@ def get_supabase_client() -> Optional[Client]:
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_key = os.getenv("SUPABASE_KEY")
 
-    print("DEBUG — SUPABASE_URL:", supabase_url)
-    print("DEBUG — SUPABASE_KEY exists:", bool(supabase_key))
-
     if not supabase_url or not supabase_key:
         print("WARNING: SUPABASE_URL or SUPABASE_KEY environment variables are missing.")
         print("Supabase client will not be initialized.")
         return None
-    
+
     try:
-        print("DEBUG — Creating Supabase client...")
+        # Imported here: the supabase package is slow to import and only needed once configured
+        from supabase import create_client
         client = create_client(supabase_url, supabase_key)
-        print("DEBUG — Supabase client initialized successfully")
+        print("🔧 Supabase client initialized")
         return client
     except Exception as e:
         print(f"WARNING: Failed to create Supabase client: {e}")
         return None
 
 
-# Initialize client on module import (optional, can be lazy-loaded)
-supabase: Optional[Client] = get_supabase_client()
+class LazySupabase:
+    """
+    Stands in for the Supabase client and creates it on first use, so
+    importing the app does no network-facing work. `if not supabase:` still
+    means "not configured"; attribute access goes to the real client.
+    """
+
+    def __init__(self):
+        self._client: Optional["Client"] = None
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional["Client"]:
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    self._client = get_supabase_client()
+                    self._initialized = True
+        return self._client
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def reset(self):
+        with self._lock:
+            self._client = None
+            self._initialized = False
+
+    def __bool__(self) -> bool:
+        return self.get() is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            # Private names and introspection (copy, mock.patch, inspect) must not create the client
+            raise AttributeError(name)
+        client = self.get()
+        if client is None:
+            raise RuntimeError("Supabase client is not configured (set SUPABASE_URL and SUPABASE_KEY)")
+        return getattr(client, name)
+
+
+# Created on first use (or by the app lifespan warm-up), not on import
+supabase = LazySupabase()
@@ -0,0 +1,236 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.shared_cache import shared_cache
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Per-client token bucket: sustained requests per second and burst size
+ADMISSION_RATE_PER_SECOND = float(os.getenv("ADMISSION_RATE_PER_SECOND", "1.0"))
+ADMISSION_BURST = float(os.getenv("ADMISSION_BURST", "20"))
+# LLM-backed requests running at once in this worker, and how long / how many may wait for a slot
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "8"))
+ADMISSION_MAX_WAIT_MS = float(os.getenv("ADMISSION_MAX_WAIT_MS", "2000"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+# local: buckets per worker | shared: buckets in the shared SQLite cache, so limits hold across workers
+ADMISSION_BACKEND = os.getenv("ADMISSION_BACKEND", "local")
+# Only behind a trusted proxy: key clients by the first X-Forwarded-For hop
+ADMISSION_TRUST_FORWARDED = os.getenv("ADMISSION_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+MAX_TRACKED_CLIENTS = 10000
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def take_token(state: Optional[Tuple[float, float]], now: float, rate: float, burst: float, cost: float = 1.0):
+    """Refill then spend `cost`; returns (new state, seconds until enough tokens, 0 when admitted)."""
+    tokens, updated = state if state is not None else (burst, now)
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= cost:
+        return (tokens - cost, now), 0.0
+    wait = (cost - tokens) / rate if rate > 0 else float("inf")
+    return (tokens, now), wait
+
+
+class LocalBuckets:
+    """Token buckets in this worker, least recently seen clients evicted first."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, client: str, cost: float = 1.0) -> float:
+        state, wait = take_token(self._buckets.get(client), time.time(), self.rate, self.burst, cost)
+        self._buckets[client] = state
+        self._buckets.move_to_end(client)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class SharedBuckets:
+    """Token buckets in the shared SQLite cache; one transaction per request."""
+
+    namespace = "rate_limit"
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        # A bucket idle this long is full again, so the row can expire
+        self.ttl = max(60.0, 2 * burst / rate) if rate > 0 else None
+
+    def take(self, client: str, cost: float = 1.0) -> float:
+        def spend(current):
+            state, wait = take_token(tuple(current) if current else None, time.time(), self.rate, self.burst, cost)
+            return list(state), wait
+        return shared_cache.update(self.namespace, client, spend, ttl=self.ttl)
+
+    def __len__(self) -> int:
+        return 0  # not tracked per worker
+
+    def clear(self):
+        pass
+
+
+class AdmissionController:
+    """
+    Admission control for LLM-backed routes: a per-client token bucket, then
+    a concurrency limit with a bounded FIFO wait. Requests that would wait
+    longer than `max_wait` (or find the queue full) are shed with a
+    Retry-After estimate instead of piling more Gemini calls onto a slow backend.
+    The concurrency limit is per worker; buckets are per worker or shared.
+    """
+
+    def __init__(
+        self,
+        rate: float = ADMISSION_RATE_PER_SECOND,
+        burst: float = ADMISSION_BURST,
+        max_concurrency: int = ADMISSION_MAX_CONCURRENCY,
+        max_wait: float = ADMISSION_MAX_WAIT_MS / 1000.0,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        backend: str = ADMISSION_BACKEND,
+        enabled: bool = ADMISSION_ENABLED,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.enabled = enabled
+        self.backend = "shared" if backend == "shared" and shared_cache.enabled else "local"
+        self.buckets = SharedBuckets(rate, burst) if self.backend == "shared" else LocalBuckets(rate, burst)
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.service_seconds = 1.0  # moving average of time spent holding a slot
+        self.stats = {"admitted": 0, "queued": 0, "rate_limited": 0, "shed_queue_full": 0, "shed_timeout": 0}
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained through the slots."""
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(self.service_seconds * backlog / max(1, self.max_concurrency)))
+
+    async def acquire(self, client: str, cost: float = 1.0) -> float:
+        if self.backend == "shared":
+            # BEGIN IMMEDIATE can wait on other workers' writes: keep it off the event loop
+            wait = await run_in_threadpool(self.buckets.take, client, cost)
+        else:
+            wait = self.buckets.take(client, cost)
+        if wait > 0:
+            self.stats["rate_limited"] += 1
+            raise Rejected("rate_limited", max(1, math.ceil(min(wait, 3600))))
+
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self.stats["shed_queue_full"] += 1
+                raise Rejected("queue_full", self.retry_after())
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self.stats["queued"] += 1
+            try:
+                await asyncio.wait_for(waiter, timeout=self.max_wait)
+            except BaseException as e:
+                if waiter.done() and not waiter.cancelled():
+                    self._release_slot()  # handed a slot while giving up: pass it on
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats["shed_timeout"] += 1
+                    raise Rejected("queue_timeout", self.retry_after()) from None
+                raise
+        self.stats["admitted"] += 1
+        return time.monotonic()
+
+    def release(self, started: float):
+        self.service_seconds = 0.8 * self.service_seconds + 0.2 * (time.monotonic() - started)
+        self._release_slot()
+
+    def _release_slot(self):
+        # The slot moves straight to the oldest live waiter, so `active` is unchanged
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def reset(self):
+        self.active = 0
+        self._waiters.clear()
+        self.buckets.clear()
+        self.service_seconds = 1.0
+        for name in self.stats:
+            self.stats[name] = 0
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_ms": round(self.max_wait * 1000.0),
+            "rate_per_second": self.buckets.rate,
+            "burst": self.buckets.burst,
+            "tracked_clients": len(self.buckets),
+            "service_ms": round(self.service_seconds * 1000.0, 1),
+            **self.stats,
+        }
+
+
+admission = AdmissionController()
+
+
+def client_key(request: Request) -> str:
+    if ADMISSION_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+@asynccontextmanager
+async def admitted(request: Request):
+    """Hold an admission slot around an LLM call; raises 429 when the request is shed."""
+    if not admission.enabled:
+        yield
+        return
+    client = client_key(request)
+    try:
+        started = await admission.acquire(client)
+    except Rejected as e:
+        print(f"⚠️ [ADMISSION] {e.reason} for {client} on {request.url.path}; retry after {e.retry_after}s")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"error": e.reason, "retry_after": e.retry_after},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    try:
+        yield
+    finally:
+        admission.release(started)
+
+
+async def llm_admission(request: Request):
+    """Route dependency: holds an admission slot for the duration of the request."""
+    async with admitted(request):
+        yield
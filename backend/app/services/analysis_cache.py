@@ -0,0 +1,119 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.serialization import dumps
+from app.services.shared_cache import shared_cache
+
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "512"))
+# How long a worker trusts its "latest analysis of article X" pointer without checking
+ANALYSIS_CACHE_LATEST_TTL = float(os.getenv("ANALYSIS_CACHE_LATEST_TTL", "30"))
+
+
+@dataclass(frozen=True)
+class CachedAnalysis:
+    analysis_id: str
+    article_id: str
+    etag: str
+    body: bytes
+    generation: int  # article generation the entry was built under
+
+
+def make_etag(body: bytes) -> str:
+    """Strong validator: analyses are immutable, so the serialized body is the version."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+class AnalysisCache:
+    """
+    LRU of serialized analyses keyed by analysis id, plus a short-lived
+    article -> latest analysis pointer.
+
+    Entries are per worker. Re-analysing or deleting an article bumps the
+    article's generation in the shared cache, so every worker drops its
+    stale entries on the next read, not only the worker that handled the write.
+    """
+
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES, latest_ttl: float = ANALYSIS_CACHE_LATEST_TTL):
+        self.max_entries = max_entries
+        self.latest_ttl = latest_ttl
+        self._entries: "OrderedDict[str, CachedAnalysis]" = OrderedDict()
+        self._latest: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def generation(article_id: str) -> int:
+        return shared_cache.get("article_generation", str(article_id)) or 0
+
+    def _fresh(self, entry: CachedAnalysis) -> bool:
+        return entry.generation == self.generation(entry.article_id)
+
+    def get(self, analysis_id: str) -> Optional[CachedAnalysis]:
+        with self._lock:
+            entry = self._entries.get(str(analysis_id))
+            if entry is not None:
+                self._entries.move_to_end(entry.analysis_id)
+        if entry is not None and self._fresh(entry):
+            self.stats["hits"] += 1
+            return entry
+        if entry is not None:
+            self._drop_article(entry.article_id)
+        self.stats["misses"] += 1
+        return None
+
+    def get_latest(self, article_id: str) -> Optional[CachedAnalysis]:
+        pointer = self._latest.get(str(article_id))
+        if pointer is None or time.monotonic() - pointer[1] > self.latest_ttl:
+            self.stats["misses"] += 1
+            return None
+        return self.get(pointer[0])
+
+    def put(self, analysis_id: str, article_id: str, payload: Dict[str, Any], latest: bool = False) -> CachedAnalysis:
+        body = dumps(payload)
+        entry = CachedAnalysis(str(analysis_id), str(article_id), make_etag(body), body, self.generation(article_id))
+        with self._lock:
+            self._entries[entry.analysis_id] = entry
+            self._entries.move_to_end(entry.analysis_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if latest:
+                self._latest[entry.article_id] = (entry.analysis_id, time.monotonic())
+        return entry
+
+    def invalidate_article(self, article_id: str):
+        """Called when an article is re-analysed or deleted; blocking, so async callers use the threadpool."""
+        article_id = str(article_id)
+        # Atomic bump: concurrent invalidations from two workers must not collapse into one generation
+        shared_cache.update("article_generation", article_id, lambda current: ((current or 0) + 1, None))
+        self._drop_article(article_id)
+        self.stats["invalidations"] += 1
+
+    def _drop_article(self, article_id: str):
+        with self._lock:
+            self._latest.pop(article_id, None)
+            for key in [k for k, e in self._entries.items() if e.article_id == article_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+
+
+analysis_cache = AnalysisCache()
@@ -0,0 +1,86 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, List, Optional
+
+ANALYSIS_QUEUE_MAX = int(os.getenv("ANALYSIS_QUEUE_MAX", "1000"))
+ANALYSIS_QUEUE_WORKERS = int(os.getenv("ANALYSIS_QUEUE_WORKERS", "2"))
+
+
+async def analyze_article(article_id: str):
+    # Imported lazily: app.api.analyze imports the API layer, which imports this module
+    from app.api.analyze import analyze
+    await analyze({"article_id": article_id}, x_deadline_ms=None)
+
+
+class AnalysisQueue:
+    """
+    Bounded in-process queue of article ids waiting for /api/analyze.
+    Worker tasks start on the first submit, in the running event loop.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str], Awaitable[None]] = analyze_article,
+        maxsize: int = ANALYSIS_QUEUE_MAX,
+        workers: int = ANALYSIS_QUEUE_WORKERS,
+    ):
+        self.handler = handler
+        self.maxsize = maxsize
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"queued": 0, "done": 0, "failed": 0, "rejected": 0}
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._queue is None or any(t.get_loop() is not loop for t in self._tasks):
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, article_id: str) -> bool:
+        """Queue an article; False when the queue is full (the caller can retry later)."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(str(article_id))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            article_id = await self._queue.get()
+            try:
+                await self.handler(article_id)
+                self.stats["done"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"⚠️ [ANALYSIS-QUEUE] Analysis of {article_id} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def join(self, timeout: Optional[float] = None) -> bool:
+        if self._queue is None:
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.pending:
+            print(f"⚠️ [ANALYSIS-QUEUE] Dropping {self.pending} queued analyses on shutdown")
+        self._tasks = []
+        self._queue = None
+
+
+analysis_queue = AnalysisQueue()
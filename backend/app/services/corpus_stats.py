@@ -0,0 +1,221 @@
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.lexicon_registry import CompiledLexicons, get_lexicons
+
+WORD_RE = re.compile(r"\w+")
+CORPUS_PAGE_SIZE = 500
+
+
+def week_bucket(created_at: Optional[str]) -> str:
+    """ISO week label (e.g. 2025-W46) for a Supabase timestamp string."""
+    if not created_at:
+        return "unknown"
+    try:
+        year, week, _ = datetime.fromisoformat(str(created_at).replace("Z", "+00:00")).isocalendar()
+    except ValueError:
+        return "unknown"
+    return f"{year}-W{week:02d}"
+
+
+def intensity_matrix(counts: np.ndarray, words: np.ndarray) -> np.ndarray:
+    """Vectorized compute_intensity(): occurrences / sqrt(words), clipped to [0, 1]."""
+    denom = np.maximum(1.0, np.sqrt(words.astype(np.float64)))[:, None]
+    return np.round(np.minimum(1.0, counts / denom), 3)
+
+
+class CorpusMatrix:
+    """
+    Documents x lexicon-key count matrix over stored articles.
+
+    Rows are appended as new articles show up, so repeat queries only
+    count the articles added since the last refresh. The whole matrix is
+    rebuilt when the lexicon version changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, lex: Optional[CompiledLexicons]):
+        self.lexicon_version = lex.version if lex else None
+        self.keys: List[str] = []
+        if lex:
+            self.keys = [f"angle:{k}" for k in lex.angle_lexicons] + [f"persuasion:{k}" for k in lex.persuasion_lexicons]
+        self.ids: List[str] = []
+        self._seen = set()
+        self.sources: List[str] = []
+        self.weeks: List[str] = []
+        self._counts = np.zeros((0, len(self.keys)), dtype=np.int32)
+        self._words = np.zeros(0, dtype=np.int32)
+        self.cursor: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts[: self.size]
+
+    @property
+    def words(self) -> np.ndarray:
+        return self._words[: self.size]
+
+    def _grow(self, extra: int):
+        needed = self.size + extra
+        capacity = self._counts.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        counts = np.zeros((new_capacity, len(self.keys)), dtype=np.int32)
+        counts[: self.size] = self.counts
+        words = np.zeros(new_capacity, dtype=np.int32)
+        words[: self.size] = self.words
+        self._counts, self._words = counts, words
+
+    def _count_row(self, text: str, lex: CompiledLexicons) -> Tuple[np.ndarray, int]:
+        lowered = text.lower()
+        row = []
+        for lexicon in (lex.angle_lexicons, lex.persuasion_lexicons):
+            for phrases in lexicon.values():
+                row.append(sum(lowered.count(ph) for ph in phrases))
+        return np.asarray(row, dtype=np.int32), len(WORD_RE.findall(lowered))
+
+    def add_documents(self, rows: Iterable[Dict[str, Any]], lex: Optional[CompiledLexicons] = None) -> int:
+        """Count and append articles not seen before. Returns how many were added."""
+        lex = lex or get_lexicons()
+        if lex.version != self.lexicon_version:
+            self._reset(lex)
+
+        fresh = [r for r in rows if r.get("id") is not None and str(r["id"]) not in self._seen]
+        self._grow(len(fresh))
+        for r in fresh:
+            i = self.size
+            self._counts[i], self._words[i] = self._count_row(r.get("content") or "", lex)
+            self.ids.append(str(r["id"]))
+            self._seen.add(str(r["id"]))
+            self.sources.append(r.get("author") or "unknown")
+            self.weeks.append(week_bucket(r.get("created_at")))
+            created = r.get("created_at")
+            if created and (self.cursor is None or str(created) > self.cursor):
+                self.cursor = str(created)
+        return len(fresh)
+
+    def refresh(self, client, page_size: int = CORPUS_PAGE_SIZE) -> int:
+        """Pull articles created since the last refresh from Supabase."""
+        with self._lock:
+            lex = get_lexicons()
+            if lex.version != self.lexicon_version:
+                self._reset(lex)
+
+            # add_documents advances self.cursor; paging must keep the starting one
+            added, offset, cursor = 0, 0, self.cursor
+            while True:
+                query = client.table("articles").select("id,content,author,created_at").order("created_at").order("id")
+                if cursor:
+                    # gte + seen-id skip so articles sharing the cursor timestamp are not lost
+                    query = query.gte("created_at", cursor)
+                rows = query.range(offset, offset + page_size - 1).execute().data or []
+                added += self.add_documents(rows, lex)
+                if len(rows) < page_size:
+                    return added
+                offset += page_size
+
+    def stats(
+        self,
+        group_by: Optional[str] = None,
+        kind: str = "all",
+        percentiles: Sequence[float] = (50, 90),
+        top_k: int = 5,
+        source: Optional[str] = None,
+        week_from: Optional[str] = None,
+        week_to: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            keys = np.asarray(self.keys, dtype=str)
+            counts = self.counts.copy()
+            words = self.words.copy()
+            sources = np.asarray(self.sources, dtype=str)
+            weeks = np.asarray(self.weeks, dtype=str)
+            version = self.lexicon_version
+
+        mask = np.ones(len(words), dtype=bool)
+        if source is not None:
+            mask &= sources == source
+        if week_from is not None:
+            mask &= weeks >= week_from
+        if week_to is not None:
+            mask &= weeks <= week_to
+
+        key_mask = np.ones(len(keys), dtype=bool)
+        if kind in ("angle", "persuasion"):
+            key_mask = np.char.startswith(keys, f"{kind}:")
+        keys = keys[key_mask]
+        counts = counts[mask][:, key_mask]
+        words = words[mask]
+        intensity = intensity_matrix(counts, words)
+        present = counts > 0
+
+        if group_by == "source":
+            labels = sources[mask]
+        elif group_by == "week":
+            labels = weeks[mask]
+        else:
+            labels = np.full(len(words), "all")
+
+        groups = []
+        if len(words):
+            names, inverse = np.unique(labels, return_inverse=True)
+            n_groups = len(names)
+            doc_counts = np.bincount(inverse, minlength=n_groups)
+            sums = np.zeros((n_groups, len(keys)))
+            hits = np.zeros((n_groups, len(keys)))
+            np.add.at(sums, inverse, intensity)
+            np.add.at(hits, inverse, present)
+            means = sums / doc_counts[:, None]
+            prevalence = hits / doc_counts[:, None]
+
+            for g, name in enumerate(names):
+                rows = intensity[inverse == g]
+                pct = np.percentile(rows, percentiles, axis=0) if len(percentiles) else np.zeros((0, len(keys)))
+                order = np.argsort(-means[g], kind="stable")[:top_k]
+                groups.append({
+                    "group": str(name),
+                    "documents": int(doc_counts[g]),
+                    "dominant": [
+                        {
+                            "key": str(keys[j]),
+                            "mean_intensity": round(float(means[g, j]), 4),
+                            "prevalence": round(float(prevalence[g, j]), 4),
+                            "percentiles": {f"p{p:g}": round(float(pct[i, j]), 4) for i, p in enumerate(percentiles)},
+                        }
+                        for j in order if means[g, j] > 0
+                    ],
+                })
+
+        # Co-occurrence of keys within the same document
+        binary = present.astype(np.float32)
+        co = binary.T @ binary
+        iu, ju = np.triu_indices(len(keys), k=1)
+        pair_counts = co[iu, ju]
+        order = np.argsort(-pair_counts, kind="stable")[:top_k]
+        co_occurrence = [
+            {"a": str(keys[iu[p]]), "b": str(keys[ju[p]]), "documents": int(pair_counts[p])}
+            for p in order if pair_counts[p] > 0
+        ]
+
+        return {
+            "lexicon_version": version,
+            "documents": int(len(words)),
+            "group_by": group_by,
+            "groups": groups,
+            "co_occurrence": co_occurrence,
+        }
+
+
+corpus_matrix = CorpusMatrix()
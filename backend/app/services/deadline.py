@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Stage outcomes reported back to callers
+COMPLETED = "completed"
+TIMED_OUT = "timed_out"
+SKIPPED = "skipped"
+FAILED = "failed"
+REUSED = "reused"
+
+
+class Deadline:
+    """
+    A request-wide time budget. `remaining()` is None when unbounded.
+    """
+
+    def __init__(self, budget_ms: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.budget_ms = budget_ms
+        self.started = clock()
+        self.expires_at = self.started + budget_ms / 1000.0 if budget_ms is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, never negative; None when there is no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self.clock())
+
+    def elapsed_ms(self) -> float:
+        return (self.clock() - self.started) * 1000.0
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def slice(self, share: float = 1.0, reserve: float = 0.0, cap: Optional[float] = None) -> Optional[float]:
+        """
+        Timeout for the next stage: `share` of what is left after holding back
+        `reserve` seconds for later work, optionally capped at `cap` seconds.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        budget = max(0.0, remaining - reserve) * share
+        return min(budget, cap) if cap is not None else budget
+
+
+class StageTracker:
+    """Runs pipeline stages against a Deadline and records how each ended."""
+
+    def __init__(self, deadline: Deadline):
+        self.deadline = deadline
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, status: str, elapsed_ms: float = 0.0, **extra):
+        self.stages[name] = {"status": status, "elapsed_ms": round(elapsed_ms, 1), **extra}
+
+    async def run(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+        min_seconds: float = 0.0,
+    ) -> Any:
+        """
+        Await `fn()` for at most `timeout` seconds. Returns None when the stage
+        was skipped (less than `min_seconds` left), timed out or raised.
+        """
+        if timeout is not None and timeout < max(min_seconds, 1e-3):
+            self.record(name, SKIPPED, reason="deadline")
+            return None
+
+        started = time.monotonic()
+        try:
+            if timeout is None:
+                result = await fn()
+            else:
+                result = await asyncio.wait_for(fn(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.record(name, TIMED_OUT, (time.monotonic() - started) * 1000.0, timeout_ms=round(timeout * 1000.0, 1))
+            return None
+        except Exception as e:
+            self.record(name, FAILED, (time.monotonic() - started) * 1000.0, error=str(e))
+            return None
+        self.record(name, COMPLETED, (time.monotonic() - started) * 1000.0)
+        return result
+
+    def run_sync(self, name: str, fn: Callable[[], Any]) -> Any:
+        """Cheap in-process stages; always run so callers get the heuristics."""
+        started = time.monotonic()
+        result = fn()
+        self.record(name, COMPLETED, (time.monotonic() - started) * 1000.0)
+        return result
+
+    def fail(self, name: str, error: str):
+        entry = self.stages.get(name, {"elapsed_ms": 0.0})
+        self.stages[name] = {**entry, "status": FAILED, "error": error}
+
+    @property
+    def partial(self) -> bool:
+        return any(s["status"] not in (COMPLETED, REUSED) for s in self.stages.values())
@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.lexicon_registry import CompiledLexicons, get_lexicons
+from app.services.serialization import json_column
+
+FINGERPRINT_PAGE_SIZE = 1000
+# Weight of the two spectrum dimensions relative to one lexicon intensity
+FINGERPRINT_SPECTRUM_WEIGHT = float(os.getenv("FINGERPRINT_SPECTRUM_WEIGHT", "1.0"))
+# Other workers' inserts are pulled in when the index is older than this
+FINGERPRINT_REFRESH_SECONDS = float(os.getenv("FINGERPRINT_REFRESH_SECONDS", "30"))
+SPECTRUM_KEYS = ("left_right_score", "populist_score")
+
+
+class FingerprintIndex:
+    """
+    Framing fingerprints as L2-normalised float32 rows: angle / persuasion
+    intensities in lexicon order, then left-right and populist scores.
+
+    One row per article (its latest analysis). Rows are added or replaced as
+    analyses are stored and swapped out on delete, so the matrix never needs
+    a rebuild except when the lexicon version changes. Cosine top-k is one
+    matrix-vector product plus argpartition.
+    """
+
+    def __init__(self, spectrum_weight: float = FINGERPRINT_SPECTRUM_WEIGHT):
+        self.spectrum_weight = spectrum_weight
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, lex: Optional[CompiledLexicons]):
+        self.lexicon_version = lex.version if lex else None
+        self.keys: List[str] = []
+        if lex:
+            self.keys = [f"angle:{k}" for k in lex.angle_lexicons] + [f"persuasion:{k}" for k in lex.persuasion_lexicons]
+        self._key_index = {k: i for i, k in enumerate(self.keys)}
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._stamps: Dict[str, str] = {}  # created_at of the analysis behind each row
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        self.cursor: Optional[str] = None
+        self.refreshed_at: Optional[float] = None
+
+    @property
+    def dim(self) -> int:
+        return len(self.keys) + len(SPECTRUM_KEYS)
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[: self.size]
+
+    def vector(self, angle: Optional[Dict[str, Any]], spectrum: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Unit-length fingerprint, or None when the analysis has no signal at all."""
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for key, value in ((angle or {}).get("intensity_scores") or {}).items():
+            i = self._key_index.get(key)
+            if i is not None and isinstance(value, (int, float)):
+                vec[i] = value
+        for j, key in enumerate(SPECTRUM_KEYS):
+            value = (spectrum or {}).get(key)
+            if isinstance(value, (int, float)):
+                vec[len(self.keys) + j] = value * self.spectrum_weight
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else None
+
+    def _grow(self, extra: int):
+        needed = self.size + extra
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        matrix = np.zeros((max(needed, capacity * 2, 64), self.dim), dtype=np.float32)
+        matrix[: self.size] = self.matrix
+        self._matrix = matrix
+
+    def _upsert(self, article_id: str, vec: Optional[np.ndarray], stamp: str):
+        if stamp and self._stamps.get(article_id, "") > stamp:
+            return  # an older analysis arrived after a newer one
+        if vec is None:
+            self._remove(article_id)
+            return
+        row = self._rows.get(article_id)
+        if row is None:
+            self._grow(1)
+            row = self.size
+            self.ids.append(article_id)
+            self._rows[article_id] = row
+        self._matrix[row] = vec
+        self._stamps[article_id] = stamp
+
+    def _remove(self, article_id: str):
+        row = self._rows.pop(article_id, None)
+        self._stamps.pop(article_id, None)
+        if row is None:
+            return
+        # Swap the last row into the hole: O(dim), rows stay dense
+        last = self.size - 1
+        if row != last:
+            moved = self.ids[last]
+            self._matrix[row] = self._matrix[last]
+            self.ids[row] = moved
+            self._rows[moved] = row
+        self.ids.pop()
+
+    def add(self, article_id: Any, angle: Optional[Dict[str, Any]], spectrum: Optional[Dict[str, Any]], created_at: Optional[str] = None, lex: Optional[CompiledLexicons] = None):
+        """Insert or replace an article's fingerprint (called when an analysis is stored)."""
+        lex = lex or get_lexicons()
+        with self._lock:
+            if lex.version != self.lexicon_version:
+                self._reset(lex)
+            self._upsert(str(article_id), self.vector(angle, spectrum), str(created_at or ""))
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]], lex: Optional[CompiledLexicons] = None) -> int:
+        """Bulk insert of analyses rows (article_id, created_at, angle, spectrum)."""
+        lex = lex or get_lexicons()
+        rows = list(rows)
+        with self._lock:
+            if lex.version != self.lexicon_version:
+                self._reset(lex)
+            self._grow(len(rows))
+            for r in rows:
+                created = str(r.get("created_at") or "")
+                self._upsert(str(r["article_id"]), self.vector(json_column(r.get("angle")), json_column(r.get("spectrum"))), created)
+                if created and (self.cursor is None or created > self.cursor):
+                    self.cursor = created
+        return len(rows)
+
+    def remove(self, article_id: Any):
+        with self._lock:
+            self._remove(str(article_id))
+
+    def refresh(self, client, page_size: int = FINGERPRINT_PAGE_SIZE) -> int:
+        """Pull analyses stored since the last refresh (all of them on first use)."""
+        lex = get_lexicons()
+        if lex.version != self.lexicon_version:
+            with self._lock:
+                self._reset(lex)
+        loaded, offset, cursor = 0, 0, self.cursor
+        while True:
+            query = client.table("analyses").select("article_id,created_at,angle,spectrum").order("created_at").order("id")
+            if cursor:
+                query = query.gte("created_at", cursor)
+            rows = query.range(offset, offset + page_size - 1).execute().data or []
+            loaded += self.add_rows(rows, lex)
+            if len(rows) < page_size:
+                break
+            offset += page_size
+        self.refreshed_at = time.monotonic()
+        return loaded
+
+    def stale(self, max_age: float = FINGERPRINT_REFRESH_SECONDS) -> bool:
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at > max_age
+
+    def neighbours(self, article_id: Any, k: int = 10, min_score: float = -1.0) -> Optional[List[Dict[str, Any]]]:
+        """Top-k cosine neighbours of a stored article; None when it has no fingerprint."""
+        with self._lock:
+            row = self._rows.get(str(article_id))
+            if row is None:
+                return None
+            return self._top_k(self._matrix[row], k, min_score, exclude=row)
+
+    def query(self, vec: np.ndarray, k: int = 10, min_score: float = -1.0) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._top_k(vec, k, min_score)
+
+    def _top_k(self, vec: np.ndarray, k: int, min_score: float, exclude: Optional[int] = None) -> List[Dict[str, Any]]:
+        scores = self.matrix @ vec
+        if exclude is not None:
+            scores[exclude] = -np.inf
+        k = min(k, len(scores) - (exclude is not None))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {"article_id": self.ids[i], "similarity": round(float(scores[i]), 4)}
+            for i in top if scores[i] >= min_score
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"articles": self.size, "dim": self.dim, "lexicon_version": self.lexicon_version, "cursor": self.cursor}
+
+
+fingerprint_index = FingerprintIndex()
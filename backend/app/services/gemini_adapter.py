@@ -1,11 +1,23 @@
 import os
-from typing import Any, Dict
-import google.generativeai as genai
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 
+from app.services.model_router import GEMINI_MODEL, ModelRouter
+from app.services.resilience import CircuitOpenError, ResilientCaller
+from app.services.shared_cache import cache_key, shared_cache
+
 # Load .env file on import so GEMINI_API_KEY is always available
 load_dotenv()
 
+# Successful responses are shared by all workers through the SQLite cache
+GEMINI_CACHE_TTL_SECONDS = float(os.getenv("GEMINI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Shared across adapter instances so retry stats, latency samples and the
+# circuit breaker reflect the health of the Gemini backend as a whole.
+gemini_resilience = ResilientCaller.from_env("GEMINI")
+# Task -> model routing (GEMINI_ROUTES); other models get their own retry / breaker state
+model_router = ModelRouter.from_env(default_caller=gemini_resilience)
+
 
 class GeminiAdapter:
     """
@@ -15,20 +27,58 @@ class GeminiAdapter:
     def __init__(self, api_key: str):
         self.api_key = api_key
 
+        # Imported on first use: google.generativeai takes most of a second to import
+        import google.generativeai as genai
+
+        self._genai = genai
         genai.configure(api_key=api_key)
-        # Use Gemini 1.5 Pro model; change model name if needed
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+        # Default model is configurable via GEMINI_MODEL, per-task models via GEMINI_ROUTES
+        self.model = genai.GenerativeModel(GEMINI_MODEL)
+        self._models = {GEMINI_MODEL: self.model}
+
+    def _model(self, name: str):
+        if name not in self._models:
+            self._models[name] = self._genai.GenerativeModel(name)
+        return self._models[name]
 
-    async def generate(self, prompt: str) -> Dict[str, Any]:
+    async def _generate_once(self, prompt: str, model: str = GEMINI_MODEL) -> Dict[str, Any]:
+        """Single Gemini call; raises on failure so the resilience layer can retry."""
+        response = await self._model(model).generate_content_async(prompt)
+        text = response.text if hasattr(response, "text") else str(response)
+        return {
+            "mock": False,
+            "raw_response": text
+        }
+
+    async def generate(self, prompt: str, task: Optional[str] = None) -> Dict[str, Any]:
         """
         Calls the actual Gemini API and returns structured output.
+        The model is chosen by the routing policy for `task` (spectrum,
+        angle, rewrite, reflection) and prompt size, skipping models that
+        are currently too slow and falling back when a call fails.
+        Transient failures are retried (and optionally hedged); while a
+        model's circuit breaker is open it fails fast without calling Gemini.
+        Identical prompts are answered from the cross-worker cache.
         """
+        for model in model_router.candidates(task, len(prompt)):
+            cached = await shared_cache.aget("llm", cache_key(model, prompt))
+            if cached is not None:
+                return {**cached, "cached": True}
+        result, _ = await model_router.call(task, prompt, lambda model: self._generate_with(model, prompt))
+        return result
+
+    async def _generate_with(self, model: str, prompt: str) -> Dict[str, Any]:
         try:
-            response = self.model.generate_content(prompt)
-            text = response.text if hasattr(response, "text") else str(response)
+            result = await model_router.caller(model).call(self._generate_once, prompt, model)
+            if isinstance(result, dict) and "error" not in result:
+                result = {**result, "model": model}
+            await shared_cache.aset("llm", cache_key(model, prompt), result, ttl=GEMINI_CACHE_TTL_SECONDS)
+            return result
+        except CircuitOpenError as e:
             return {
                 "mock": False,
-                "raw_response": text
+                "error": str(e),
+                "circuit_open": True
             }
         except Exception as e:
             return {
@@ -43,7 +93,7 @@ class MockGeminiAdapter:
     Makes tests stable and avoids API cost.
     """
 
-    async def generate(self, prompt: str) -> Dict[str, Any]:
+    async def generate(self, prompt: str, task: Optional[str] = None) -> Dict[str, Any]:
         return {
             "mock": True,
             "prompt_received": prompt,
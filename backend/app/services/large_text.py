@@ -0,0 +1,94 @@
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, TextIO
+
+# JSON endpoints (/api/spans, /api/angle, /api/analyze, ...) refuse texts longer than this
+MAX_INLINE_TEXT_CHARS = int(os.getenv("MAX_INLINE_TEXT_CHARS", "1000000"))
+# Streamed large-document uploads: hard cap, and how much stays in memory before spooling to disk
+LARGE_TEXT_MAX_BYTES = int(os.getenv("LARGE_TEXT_MAX_BYTES", str(200 * 1024 * 1024)))
+LARGE_TEXT_SPOOL_BYTES = int(os.getenv("LARGE_TEXT_SPOOL_BYTES", str(4 * 1024 * 1024)))
+# Each window owns WINDOW chars and sees OVERLAP chars of context on both sides, so a
+# match up to OVERLAP chars long (with its \b look-around) is found by exactly one window
+LARGE_TEXT_WINDOW_CHARS = int(os.getenv("LARGE_TEXT_WINDOW_CHARS", "262144"))
+LARGE_TEXT_OVERLAP_CHARS = int(os.getenv("LARGE_TEXT_OVERLAP_CHARS", "1024"))
+
+
+class TextTooLarge(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Window:
+    """`text` starts at absolute offset `offset`; matches starting in [own_start, own_end) belong to it."""
+    text: str
+    offset: int
+    own_start: int
+    own_end: int
+
+    def owns(self, relative_start: int) -> bool:
+        return self.own_start <= self.offset + relative_start < self.own_end
+
+    @property
+    def own_slice(self) -> slice:
+        return slice(self.own_start - self.offset, self.own_end - self.offset)
+
+
+async def spool_stream(
+    chunks: AsyncIterator[bytes],
+    max_bytes: int = LARGE_TEXT_MAX_BYTES,
+    spool_bytes: int = LARGE_TEXT_SPOOL_BYTES,
+) -> "tempfile.SpooledTemporaryFile":
+    """Copy a request body into memory, rolling over to a temporary file past `spool_bytes`."""
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes, mode="w+b")
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise TextTooLarge(f"document exceeds {max_bytes} bytes")
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def open_text(spool) -> TextIO:
+    """UTF-8 text reader over a spooled body (invalid bytes become U+FFFD)."""
+    spool.seek(0)
+    # newline="" keeps \r\n as two characters, so offsets match the uploaded text
+    return io.TextIOWrapper(spool, encoding="utf-8", errors="replace", newline="")
+
+
+def iter_windows(
+    reader: TextIO,
+    window_chars: int = LARGE_TEXT_WINDOW_CHARS,
+    overlap_chars: int = LARGE_TEXT_OVERLAP_CHARS,
+) -> Iterator[Window]:
+    """
+    Overlapping windows over a text stream. Own regions partition the text;
+    at most window + 2 * overlap characters are held at any time.
+    """
+    if isinstance(reader, str):
+        reader = io.StringIO(reader)
+    buffer, base, own_start, eof = "", 0, 0, False
+    while True:
+        wanted = own_start + window_chars + overlap_chars
+        while not eof and base + len(buffer) < wanted:
+            chunk = reader.read(wanted - base - len(buffer))
+            if chunk:
+                buffer += chunk
+            else:
+                eof = True
+        end = base + len(buffer)
+        own_end = min(own_start + window_chars, end)
+        yield Window(buffer, base, own_start, own_end)
+        if eof and own_end >= end:
+            return
+        own_start = own_end
+        cut = own_start - overlap_chars - base
+        if cut > 0:
+            buffer, base = buffer[cut:], base + cut
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Pattern, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.shared_cache import shared_cache
+
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parent.parent / "data" / "lexicons.json"
+
+LEXICON_PATH = os.getenv("LEXICON_PATH", str(DEFAULT_LEXICON_PATH))
+# Seconds between mtime checks of the lexicon file; 0 disables the file watch.
+LEXICON_WATCH_SECONDS = float(os.getenv("LEXICON_WATCH_SECONDS", "0"))
+# Seconds between checks for reloads made by other workers (through the shared cache)
+LEXICON_SYNC_SECONDS = float(os.getenv("LEXICON_SYNC_SECONDS", "5"))
+
+
+@dataclass(frozen=True)
+class CompiledLexicons:
+    """
+    Immutable, pre-compiled snapshot of every lexicon the heuristics use.
+    Requests grab one snapshot and use it end to end, so a reload never
+    mixes two lexicon versions inside a single analysis.
+    """
+    version: str
+    heuristics: Tuple[Tuple[str, Tuple[Pattern, ...], float], ...]
+    angle_lexicons: Dict[str, Tuple[str, ...]]
+    persuasion_lexicons: Dict[str, Tuple[str, ...]]
+    angle_category_map: Dict[str, str]
+    angle_to_emotion: Dict[str, str]
+    source: str
+    loaded_at: float
+
+
+def _compile_phrase_lexicon(name: str, raw: Any) -> Dict[str, Tuple[str, ...]]:
+    if not isinstance(raw, dict):
+        raise ValueError(f"'{name}' must be an object of key -> phrases")
+    compiled = {}
+    for key, phrases in raw.items():
+        if not isinstance(phrases, list) or not all(isinstance(p, str) and p for p in phrases):
+            raise ValueError(f"'{name}.{key}' must be a list of non-empty strings")
+        # Lower-case once here and keep longest phrases first
+        unique = {p.lower() for p in phrases}
+        compiled[key] = tuple(sorted(unique, key=lambda p: (-len(p), p)))
+    return compiled
+
+
+def _compile_mapping(name: str, raw: Any) -> Dict[str, str]:
+    if not isinstance(raw, dict) or not all(isinstance(v, str) for v in raw.values()):
+        raise ValueError(f"'{name}' must be an object of key -> string")
+    return dict(raw)
+
+
+def compile_lexicons(data: Dict[str, Any], source: str = "<memory>") -> CompiledLexicons:
+    """
+    Validate a raw lexicon document and compile it into matchers.
+    Raises ValueError when the document is malformed.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Lexicon document must be a JSON object")
+
+    version = data.get("version")
+    if not isinstance(version, str) or not version:
+        raise ValueError("Lexicon document is missing a 'version' string")
+
+    heuristics = []
+    for entry in data.get("heuristics", []):
+        try:
+            label = entry["label"]
+            patterns = entry["patterns"]
+            confidence = float(entry["confidence"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid heuristic entry {entry!r}: {e}")
+        try:
+            compiled = tuple(re.compile(p, re.IGNORECASE) for p in patterns)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern for '{label}': {e}")
+        heuristics.append((label, compiled, confidence))
+
+    return CompiledLexicons(
+        version=version,
+        heuristics=tuple(heuristics),
+        angle_lexicons=_compile_phrase_lexicon("angle_lexicons", data.get("angle_lexicons", {})),
+        persuasion_lexicons=_compile_phrase_lexicon("persuasion_lexicons", data.get("persuasion_lexicons", {})),
+        angle_category_map=_compile_mapping("angle_category_map", data.get("angle_category_map", {})),
+        angle_to_emotion=_compile_mapping("angle_to_emotion", data.get("angle_to_emotion", {})),
+        source=source,
+        loaded_at=time.time(),
+    )
+
+
+def load_lexicon_file(path: str) -> CompiledLexicons:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read lexicon file {path}: {e}")
+    return compile_lexicons(data, source=str(path))
+
+
+class LexiconRegistry:
+    """
+    Holds the active CompiledLexicons snapshot.
+
+    Readers never take a lock: swapping is a single reference assignment,
+    so in-flight requests keep the snapshot they started with. Reloads are
+    serialized and only replace the snapshot after a successful compile.
+
+    A broadcast reload bumps a generation in the shared cache; `poll()`,
+    run by the background watcher in every worker, follows it and the
+    lexicon file's mtime, so requests never compile.
+    """
+
+    def __init__(self, path: str, watch_seconds: float = 0.0):
+        self.path = path
+        self.watch_seconds = watch_seconds
+        self._current: Optional[CompiledLexicons] = None
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._generation: Optional[int] = None  # shared reload generation this worker follows
+
+    @property
+    def current(self) -> CompiledLexicons:
+        snapshot = self._current
+        if snapshot is None:
+            return self.reload()
+        return snapshot
+
+    def reload(self, path: Optional[str] = None, broadcast: bool = False) -> CompiledLexicons:
+        """Compile and swap in `path` (default: the current file); `broadcast` makes every worker follow."""
+        with self._lock:
+            target = path or self.path
+            mtime = self._file_mtime(target)
+            compiled = load_lexicon_file(target)
+            self.path = target
+            self._mtime = mtime
+            self._current = compiled
+            if broadcast:
+                self._generation = shared_cache.update(SYNC_NAMESPACE, SYNC_KEY, lambda current: self._bump(current, target))
+            return compiled
+
+    @staticmethod
+    def _bump(current: Optional[Dict[str, Any]], path: str):
+        generation = (current or {}).get("generation", 0) + 1
+        return {"generation": generation, "path": path}, generation
+
+    def poll(self):
+        """Follow reloads broadcast by other workers, then the file watch. Runs off the request path."""
+        shared = shared_cache.get(SYNC_NAMESPACE, SYNC_KEY)
+        if shared and shared.get("generation") != self._generation:
+            previous = self._current.version if self._current else None
+            try:
+                self.reload(shared.get("path"))
+                print(f"🔁 [LEXICON] Followed shared reload {previous} -> {self._current.version}")
+            except ValueError as e:
+                print(f"⚠️ [LEXICON] Keeping version {previous}, shared reload failed here: {e}")
+            self._generation = shared.get("generation")
+            return
+        if self.watch_seconds > 0 and self._current is not None:
+            self._maybe_reload_from_watch()
+
+    def swap(self, compiled: CompiledLexicons) -> CompiledLexicons:
+        """Install an already compiled snapshot (used by tests and tooling)."""
+        with self._lock:
+            previous = self._current
+            self._current = compiled
+            return previous
+
+    def _maybe_reload_from_watch(self):
+        now = time.monotonic()
+        if now - self._last_check < self.watch_seconds:
+            return
+        self._last_check = now
+        mtime = self._file_mtime(self.path)
+        if mtime == self._mtime:
+            return
+        try:
+            self.reload()
+            print(f"🔁 [LEXICON] Reloaded {self.path} -> version {self._current.version}")
+        except ValueError as e:
+            # Remember the broken file so we do not retry it on every check
+            self._mtime = mtime
+            print(f"⚠️ [LEXICON] Keeping version {self._current.version}, reload failed: {e}")
+
+    @staticmethod
+    def _file_mtime(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+
+SYNC_NAMESPACE = "lexicon"
+SYNC_KEY = "generation"
+
+lexicon_registry = LexiconRegistry(LEXICON_PATH, LEXICON_WATCH_SECONDS)
+
+
+async def watch_lexicons(registry: Optional[LexiconRegistry] = None, interval: Optional[float] = None):
+    """Background task started by the app lifespan: polls for shared reloads and file edits."""
+    registry = registry or lexicon_registry
+    if interval is None:
+        interval = min(LEXICON_SYNC_SECONDS, registry.watch_seconds) if registry.watch_seconds > 0 else LEXICON_SYNC_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(registry.poll)
+        except Exception as e:
+            print(f"⚠️ [LEXICON] Watch check failed: {e}")
+
+
+def get_lexicons() -> CompiledLexicons:
+    """Return the active lexicon snapshot."""
+    return lexicon_registry.current
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+# Warm up resources in the background after the worker starts serving liveness
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+# How long shutdown waits for queued bulk-ingest analyses before flushing state
+DRAIN_TIMEOUT_SECONDS = float(os.getenv("DRAIN_TIMEOUT_SECONDS", "25"))
+
+PENDING = "pending"
+READY = "ready"
+UNCONFIGURED = "unconfigured"  # optional resource not set up; the app still serves
+ERROR = "error"
+
+
+class Readiness:
+    """
+    Per-component start-up state. Liveness only says the process answers;
+    readiness says warm-up finished and no component failed.
+    """
+
+    def __init__(self):
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.warmed = False
+
+    def mark(self, name: str, status: str, elapsed_ms: float = 0.0, **extra):
+        self.components[name] = {"status": status, "elapsed_ms": round(elapsed_ms, 1), **extra}
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed and all(c["status"] != ERROR for c in self.components.values())
+
+    def reset(self):
+        self.components = {}
+        self.warmed = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warmed": self.warmed,
+            "in_flight": in_flight.active,
+            "components": self.components,
+        }
+
+
+class InFlightTracker:
+    """
+    ASGI middleware counting HTTP requests in progress (reported by /api/ready).
+    Draining itself is the server's job: on SIGTERM uvicorn stops accepting
+    and waits for open connections before the lifespan shutdown runs.
+    """
+
+    def __init__(self):
+        self.active = 0
+
+    def middleware(self, app):
+        async def tracked(scope, receive, send):
+            if scope["type"] != "http":
+                return await app(scope, receive, send)
+            self.active += 1
+            try:
+                await app(scope, receive, send)
+            finally:
+                self.active -= 1
+        return tracked
+
+
+readiness = Readiness()
+in_flight = InFlightTracker()
+
+
+def _init_supabase() -> str:
+    from app.models.db import supabase
+    return READY if supabase else UNCONFIGURED
+
+
+def _init_gemini() -> str:
+    from app.api.political_spectrum import get_adapter
+    from app.services.gemini_adapter import MockGeminiAdapter
+    return UNCONFIGURED if isinstance(get_adapter(), MockGeminiAdapter) else READY
+
+
+def _init_near_duplicates() -> str:
+    from app.services.near_duplicate import load_default_index
+    load_default_index()
+    return READY
+
+
+def _init_shared_cache() -> str:
+    from app.services.shared_cache import shared_cache
+    if not shared_cache.enabled:
+        return UNCONFIGURED
+    shared_cache.purge()  # opens the database, creates the schema, drops expired rows
+    return READY
+
+
+def _init_spectrum_classifier() -> str:
+    from app.services.spectrum_classifier import get_spectrum_classifier
+    return READY if get_spectrum_classifier() else UNCONFIGURED
+
+
+def _init_fingerprint_index() -> str:
+    from app.models.db import supabase
+    from app.services.fingerprint_index import fingerprint_index
+    if not supabase:
+        return UNCONFIGURED
+    fingerprint_index.refresh(supabase)
+    return READY
+
+
+WARMUP_STEPS: Dict[str, Callable[[], str]] = {
+    "supabase": _init_supabase,
+    "gemini": _init_gemini,
+    "near_duplicates": _init_near_duplicates,
+    "shared_cache": _init_shared_cache,
+    "spectrum_classifier": _init_spectrum_classifier,
+    "fingerprint_index": _init_fingerprint_index,
+}
+
+
+async def warm_up(state: Optional[Readiness] = None, steps: Optional[Dict[str, Callable[[], str]]] = None):
+    """Create clients and load local indexes off the event loop, one component at a time."""
+    state = state or readiness
+    steps = steps if steps is not None else WARMUP_STEPS
+    for name in steps:
+        state.mark(name, PENDING)
+    for name, step in steps.items():
+        started = time.monotonic()
+        try:
+            status = await run_in_threadpool(step)
+            state.mark(name, status, (time.monotonic() - started) * 1000.0)
+        except Exception as e:
+            print(f"⚠️ [STARTUP] {name} failed to initialize: {e}")
+            state.mark(name, ERROR, (time.monotonic() - started) * 1000.0, error=str(e))
+    state.warmed = True
+    statuses = {n: c["status"] for n, c in state.components.items()}
+    print(f"✅ [STARTUP] Warm-up finished: {statuses}")
+
+
+def shutdown():
+    from app.services.near_duplicate import near_duplicate_index
+    try:
+        near_duplicate_index.flush()
+    except Exception as e:
+        print(f"⚠️ [SHUTDOWN] Could not save near-duplicate index: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    from app.services.lexicon_registry import lexicon_registry, watch_lexicons
+    from app.services.shared_cache import shared_cache
+    task = asyncio.create_task(warm_up()) if WARMUP_ON_STARTUP else None
+    if task is None:
+        readiness.warmed = True
+    # Lexicon reloads from other workers and file edits are picked up here, never on a request
+    watcher = asyncio.create_task(watch_lexicons()) if lexicon_registry.watch_seconds > 0 or shared_cache.enabled else None
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        # By now the server has stopped accepting and finished open requests;
+        # give queued bulk-ingest analyses the drain budget, then flush state
+        from app.services.analysis_queue import analysis_queue
+        await analysis_queue.join(DRAIN_TIMEOUT_SECONDS)
+        await analysis_queue.stop()
+        if task is not None and not task.done():
+            task.cancel()
+        await run_in_threadpool(shutdown)
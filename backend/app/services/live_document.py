@@ -0,0 +1,173 @@
+import itertools
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.api.angle import SENTENCE_SPLIT_RE, build_angle_output, lexicon_counts, top_words_evidence
+from app.api.spans import extract_span_dicts
+from app.services.lexicon_registry import CompiledLexicons, get_lexicons
+from app.services.span_merge import merge_spans, shift_span
+
+# Hard cap on one live document; edits past it are refused
+LIVE_MAX_DOCUMENT_CHARS = int(os.getenv("LIVE_MAX_DOCUMENT_CHARS", "200000"))
+
+
+class DocumentTooLarge(ValueError):
+    pass
+
+
+def split_chunks(text: str) -> List[str]:
+    """Sentences with their trailing whitespace, so the chunks concatenate back to `text`."""
+    chunks, start = [], 0
+    for match in SENTENCE_SPLIT_RE.finditer(text):
+        chunks.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text) or not chunks:
+        chunks.append(text[start:])
+    return chunks
+
+
+@dataclass
+class Chunk:
+    """One sentence and its cached heuristics (None until analysed)."""
+    text: str
+    spans: Optional[List[Dict[str, Any]]] = None  # offsets relative to the chunk, each with an `id`
+    angle_counts: Dict[str, int] = field(default_factory=dict)
+    pers_counts: Dict[str, int] = field(default_factory=dict)
+    words: int = 0
+
+    @property
+    def analysed(self) -> bool:
+        return self.spans is not None
+
+
+class LiveDocument:
+    """
+    Editor session state: the document as sentence chunks, each with its own
+    spans and lexicon counts. A delta only re-splits the chunks it touches
+    (plus one neighbour on each side, since punctuation edits can join or
+    split sentences); `analyse` re-runs the heuristics on chunks whose text
+    changed and reports span / angle differences against the last call.
+    """
+
+    def __init__(self, text: str = "", max_chars: int = LIVE_MAX_DOCUMENT_CHARS, merge: Optional[str] = None, lexicons: Optional[CompiledLexicons] = None):
+        self.max_chars = max_chars
+        self.merge = merge
+        self.lexicons = lexicons
+        self.version = 0
+        self.length = 0
+        self.chunks: List[Chunk] = []
+        self._ids = itertools.count(1)
+        self._sent_spans: Dict[str, Dict[str, Any]] = {}
+        self._sent_angle: Dict[str, Any] = {}
+        self.set_text(text)
+        self.version = 0  # bumped by every edit after construction
+
+    @property
+    def text(self) -> str:
+        return "".join(c.text for c in self.chunks)
+
+    def set_text(self, text: str):
+        if len(text) > self.max_chars:
+            raise DocumentTooLarge(f"document exceeds {self.max_chars} characters")
+        self.chunks = [Chunk(t) for t in split_chunks(text)]
+        self.length = len(text)
+        self.version += 1
+
+    def apply_delta(self, start: int, end: int, text: str):
+        """Replace [start, end) of the current document with `text`."""
+        if not 0 <= start <= end <= self.length:
+            raise ValueError(f"delta [{start}, {end}) outside document of length {self.length}")
+        if self.length - (end - start) + len(text) > self.max_chars:
+            raise DocumentTooLarge(f"document would exceed {self.max_chars} characters")
+
+        # Chunks overlapping the edit, widened by one neighbour on each side
+        offsets, position = [], 0
+        for chunk in self.chunks:
+            offsets.append(position)
+            position += len(chunk.text)
+        first = next(i for i, o in enumerate(offsets) if o + len(self.chunks[i].text) >= start)
+        last = next((i for i in range(first, len(self.chunks)) if offsets[i] + len(self.chunks[i].text) >= end), len(self.chunks) - 1)
+        first, last = max(0, first - 1), min(len(self.chunks) - 1, last + 1)
+
+        base = offsets[first]
+        old = self.chunks[first:last + 1]
+        window = "".join(c.text for c in old)
+        window = window[:start - base] + text + window[end - base:]
+
+        # Sentences that came out unchanged keep their analysis and span ids
+        reusable: Dict[str, List[Chunk]] = {}
+        for chunk in old:
+            reusable.setdefault(chunk.text, []).append(chunk)
+        replacement = [
+            reusable[t].pop(0) if reusable.get(t) else Chunk(t)
+            for t in (split_chunks(window) if window else [])
+        ]
+        if not replacement and len(self.chunks) == len(old):
+            replacement = [Chunk("")]
+        self.chunks[first:last + 1] = replacement
+        self.length += len(text) - (end - start)
+        self.version += 1
+
+    def _analyse_chunk(self, chunk: Chunk):
+        lex = self.lexicons or get_lexicons()
+        spans = merge_spans(extract_span_dicts(chunk.text, lex), self.merge)
+        chunk.spans = [{"id": f"s{next(self._ids)}", **s} for s in spans]
+        chunk.angle_counts, chunk.pers_counts, chunk.words = lexicon_counts(chunk.text, lex)
+
+    def spans(self) -> List[Dict[str, Any]]:
+        """Every span with absolute offsets (chunks must be analysed)."""
+        result, base = [], 0
+        for chunk in self.chunks:
+            for span in chunk.spans or ():
+                result.append(shift_span(span, base))
+            base += len(chunk.text)
+        return result
+
+    def angle(self) -> Dict[str, Any]:
+        lex = self.lexicons or get_lexicons()
+        angle_counts: Dict[str, int] = {}
+        pers_counts: Dict[str, int] = {}
+        words = 0
+        for chunk in self.chunks:
+            for key, count in chunk.angle_counts.items():
+                angle_counts[key] = angle_counts.get(key, 0) + count
+            for key, count in chunk.pers_counts.items():
+                pers_counts[key] = pers_counts.get(key, 0) + count
+            words += chunk.words
+
+        def evidence_for(kind: str, key: str) -> List[str]:
+            attr = "angle_counts" if kind == "angle" else "pers_counts"
+            return [c.text.strip() for c in self.chunks if getattr(c, attr).get(key)]
+
+        if not self.text.strip():
+            return {}
+        return build_angle_output(
+            angle_counts, pers_counts, words, evidence_for, lambda: top_words_evidence(self.text), lex
+        ).model_dump()
+
+    def analyse(self) -> Tuple[Dict[str, Any], int]:
+        """
+        Re-run heuristics on changed chunks. Returns the diff since the last
+        call ({"added", "removed", "angle"}) and the number of chunks analysed.
+        Spans outside the edited sentences keep their ids; the client maps
+        their offsets through its own edits.
+        """
+        dirty = [c for c in self.chunks if not c.analysed]
+        for chunk in dirty:
+            self._analyse_chunk(chunk)
+
+        current = {s["id"]: s for s in self.spans()}
+        added = [s for sid, s in current.items() if sid not in self._sent_spans]
+        removed = [sid for sid in self._sent_spans if sid not in current]
+        angle = self.angle()
+        angle_changes = {k: v for k, v in angle.items() if self._sent_angle.get(k) != v}
+        if self._sent_angle and not angle:
+            angle_changes = {k: None for k in self._sent_angle}
+
+        self._sent_spans, self._sent_angle = current, angle
+        return {"added": added, "removed": removed, "angle": angle_changes}, len(dirty)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.analyse()
+        return {"spans": list(self._sent_spans.values()), "angle": self._sent_angle}
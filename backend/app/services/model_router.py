@@ -0,0 +1,218 @@
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from app.services.resilience import LatencyTracker, ResilientCaller
+
+# Routing is configured from the environment at import time
+load_dotenv()
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# Faster model for short structured classifications
+GEMINI_LIGHT_MODEL = os.getenv("GEMINI_LIGHT_MODEL", "gemini-2.5-flash-lite")
+# JSON routing policy merged over DEFAULT_ROUTES per task, e.g.
+# {"spectrum": {"slo_ms": 2000, "models": [{"model": "gemini-2.5-flash-lite", "max_chars": 20000}, "gemini-2.5-flash"]}}
+GEMINI_ROUTES = os.getenv("GEMINI_ROUTES", "")
+# A model whose p95 breaks a task's SLO is ranked last for this long
+ROUTER_DEMOTE_SECONDS = float(os.getenv("ROUTER_DEMOTE_SECONDS", "60"))
+ROUTER_MIN_SAMPLES = int(os.getenv("ROUTER_MIN_SAMPLES", "5"))
+
+DEFAULT_ROUTES: Dict[str, Dict[str, Any]] = {
+    "default": {"models": [GEMINI_MODEL]},
+    "spectrum": {"models": [{"model": GEMINI_LIGHT_MODEL, "max_chars": 16000}, GEMINI_MODEL], "slo_ms": 3000},
+    "angle": {"models": [{"model": GEMINI_LIGHT_MODEL, "max_chars": 16000}, GEMINI_MODEL], "slo_ms": 4000},
+    "rewrite": {"models": [GEMINI_MODEL, GEMINI_LIGHT_MODEL], "slo_ms": 20000},
+    "reflection": {"models": [GEMINI_MODEL, GEMINI_LIGHT_MODEL], "slo_ms": 20000},
+}
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    model: str
+    max_chars: Optional[int] = None  # only used for prompts up to this size
+
+    def accepts(self, prompt_chars: int) -> bool:
+        return self.max_chars is None or prompt_chars <= self.max_chars
+
+
+@dataclass(frozen=True)
+class Route:
+    task: str
+    tiers: Tuple[ModelTier, ...]
+    slo_ms: Optional[float] = None
+
+    @property
+    def models(self) -> List[str]:
+        return [t.model for t in self.tiers]
+
+
+def parse_routes(config: Dict[str, Any]) -> Dict[str, Route]:
+    """Routes from {"task": {"models": [name | {"model", "max_chars"}], "slo_ms"}}; raises ValueError on bad config."""
+    routes = {}
+    for task, spec in config.items():
+        tiers = []
+        for entry in spec.get("models") or []:
+            if isinstance(entry, str):
+                tiers.append(ModelTier(entry))
+            elif isinstance(entry, dict) and entry.get("model"):
+                max_chars = entry.get("max_chars")
+                tiers.append(ModelTier(entry["model"], int(max_chars) if max_chars is not None else None))
+            else:
+                raise ValueError(f"Bad model entry for task {task!r}: {entry!r}")
+        if not tiers:
+            raise ValueError(f"Route for task {task!r} has no models")
+        slo = spec.get("slo_ms")
+        routes[task] = Route(task, tuple(tiers), float(slo) if slo is not None else None)
+    return routes
+
+
+@dataclass
+class ModelHealth:
+    latency: LatencyTracker = field(default_factory=lambda: LatencyTracker(window=50))
+    demoted_until: Optional[float] = None
+    calls: int = 0
+    failures: int = 0
+    demotions: int = 0
+
+
+class ModelRouter:
+    """
+    Picks the model for each LLM call from a per-task route: tiers in
+    preference order, each optionally limited to prompts up to `max_chars`.
+
+    Observed latency is tracked per model and task (a rewrite is always
+    slower than a classification on the same model). When a model's p95
+    breaks the task's SLO it is ranked behind the other candidates for that
+    task until `demote_seconds` pass, then its samples are discarded so it is
+    judged afresh; an open circuit breaker demotes it for every task. A
+    failed call falls through to the next candidate in the same request.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, Route],
+        default_model: str = GEMINI_MODEL,
+        caller_factory: Callable[[str], ResilientCaller] = lambda model: ResilientCaller.from_env("GEMINI"),
+        demote_seconds: float = ROUTER_DEMOTE_SECONDS,
+        min_samples: int = ROUTER_MIN_SAMPLES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.routes = routes
+        self.default_model = default_model
+        self.caller_factory = caller_factory
+        self.demote_seconds = demote_seconds
+        self.min_samples = min_samples
+        self.clock = clock
+        self._callers: Dict[str, ResilientCaller] = {}
+        self._health: Dict[Tuple[str, str], ModelHealth] = {}
+
+    @classmethod
+    def from_env(cls, default_caller: Optional[ResilientCaller] = None, **kwargs) -> "ModelRouter":
+        config = {task: dict(spec) for task, spec in DEFAULT_ROUTES.items()}
+        if GEMINI_ROUTES:
+            try:
+                for task, spec in json.loads(GEMINI_ROUTES).items():
+                    config[task] = {**config.get(task, {}), **spec}
+                routes = parse_routes(config)
+            except (ValueError, TypeError, AttributeError) as e:
+                print(f"⚠️ [ROUTER] Ignoring invalid GEMINI_ROUTES: {e}")
+                routes = parse_routes(DEFAULT_ROUTES)
+        else:
+            routes = parse_routes(config)
+        router = cls(routes, **kwargs)
+        if default_caller is not None:
+            # The default model keeps the adapter-wide caller reported by /gemini/health
+            router._callers[router.default_model] = default_caller
+        return router
+
+    def route(self, task: Optional[str]) -> Route:
+        return self.routes.get(task or "default") or self.routes.get("default") or Route("default", (ModelTier(self.default_model),))
+
+    def caller(self, model: str) -> ResilientCaller:
+        if model not in self._callers:
+            self._callers[model] = self.caller_factory(model)
+        return self._callers[model]
+
+    def health(self, task: str, model: str) -> ModelHealth:
+        if (task, model) not in self._health:
+            self._health[(task, model)] = ModelHealth()
+        return self._health[(task, model)]
+
+    def degraded(self, task: str, model: str) -> bool:
+        health = self.health(task, model)
+        if health.demoted_until is not None:
+            if self.clock() < health.demoted_until:
+                return True
+            health.demoted_until = None
+            health.latency.samples.clear()
+        caller = self._callers.get(model)
+        return caller is not None and caller.breaker.state == "open"
+
+    def candidates(self, task: Optional[str], prompt_chars: int) -> List[str]:
+        """Models to try in order: eligible tiers for this size, healthy ones first."""
+        route = self.route(task)
+        eligible = [t.model for t in route.tiers if t.accepts(prompt_chars)] or [route.tiers[-1].model]
+        eligible = list(dict.fromkeys(eligible))
+        return sorted(eligible, key=lambda model: self.degraded(route.task, model))  # stable sort keeps preference order
+
+    def record(self, route: Route, model: str, seconds: Optional[float]):
+        """`seconds` is None for a failed call."""
+        health = self.health(route.task, model)
+        health.calls += 1
+        if seconds is None:
+            health.failures += 1
+            return
+        health.latency.record(seconds)
+        if route.slo_ms is None or len(health.latency.samples) < self.min_samples:
+            return
+        p95 = health.latency.quantile(0.95)
+        if p95 * 1000.0 > route.slo_ms and health.demoted_until is None:
+            health.demoted_until = self.clock() + self.demote_seconds
+            health.demotions += 1
+            print(f"🐢 [ROUTER] {model} p95 {p95 * 1000.0:.0f}ms breaks the {route.task} SLO ({route.slo_ms:.0f}ms), demoted for {self.demote_seconds:.0f}s")
+
+    async def call(self, task: Optional[str], prompt: str, attempt: Callable[[str], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], str]:
+        """
+        Run `attempt(model)` on each candidate until one returns a result
+        without an "error" key. Returns (result, model); the last error when
+        every candidate failed.
+        """
+        route = self.route(task)
+        models = self.candidates(task, len(prompt))
+        result: Dict[str, Any] = {}
+        for model in models:
+            started = self.clock()
+            result = await attempt(model)
+            ok = not (isinstance(result, dict) and "error" in result)
+            self.record(route, model, self.clock() - started if ok else None)
+            if ok:
+                return result, model
+            if model != models[-1]:
+                print(f"↪️ [ROUTER] {task or 'default'} call on {model} failed, falling back: {result.get('error')}")
+        return result, models[-1]
+
+    def _health_snapshot(self, task: str, model: str) -> Dict[str, Any]:
+        health = self.health(task, model)
+        p95 = health.latency.quantile(0.95)
+        return {
+            "calls": health.calls,
+            "failures": health.failures,
+            "demotions": health.demotions,
+            "degraded": self.degraded(task, model),
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            task: {
+                "slo_ms": route.slo_ms,
+                "models": [
+                    {"model": t.model, "max_chars": t.max_chars, **self._health_snapshot(task, t.model)}
+                    for t in route.tiers
+                ],
+            }
+            for task, route in self.routes.items()
+        }
@@ -0,0 +1,242 @@
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+NEAR_DUP_INDEX_PATH = os.getenv("NEAR_DUP_INDEX_PATH", ".cache/near_duplicates.npz")
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.85"))
+NEAR_DUP_MAX_ENTRIES = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "50000"))
+NEAR_DUP_SAVE_INTERVAL = float(os.getenv("NEAR_DUP_SAVE_INTERVAL", "60"))
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: candidate pairs start appearing around J ~ 0.7
+SHINGLE_SIZE = 5
+
+_SHIFT = np.uint64(32)
+_WORD_RE = re.compile(r"\w+")
+
+# Multiply-shift hash family (odd 64-bit multipliers, keep the high 32 bits).
+# Fixed seed: signatures must stay comparable across restarts and workers.
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.randint(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """crc32 of every word n-gram in the lower-cased text."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in set(shingles)), dtype=np.uint64)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    hashes = shingle_hashes(text)
+    permuted = (hashes[:, None] * _PERM_A + _PERM_B) >> _SHIFT
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+@dataclass
+class NearDuplicateMatch:
+    key: str
+    similarity: float
+    payload: Dict[str, Any]
+
+
+class NearDuplicateIndex:
+    """
+    In-memory MinHash / LSH index with LRU eviction.
+
+    Candidates are found through band buckets and confirmed by the
+    signature agreement rate, which estimates Jaccard similarity of the
+    shingle sets.
+
+    With a `path`, the persisted signatures are loaded on first use (or by
+    the startup warm-up), and an index whose load never succeeded refuses to
+    save so it cannot overwrite the file with a partial view.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, max_entries: int = NEAR_DUP_MAX_ENTRIES, path: Optional[str] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._buckets: List[Dict[bytes, set]] = [dict() for _ in range(BANDS)]
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._discarded: set = set()  # removed since the last save; not merged back from disk
+        self._load_lock = threading.Lock()
+        self._load_attempted = False
+        self.loaded = path is None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray) -> List[bytes]:
+        return [band.tobytes() for band in signature.reshape(BANDS, -1)]
+
+    def query(self, text: str, signature: Optional[np.ndarray] = None) -> Optional[NearDuplicateMatch]:
+        signature = minhash_signature(text) if signature is None else signature
+        self.ensure_loaded()
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates |= self._buckets[band].get(key, set())
+
+            best = None
+            for key in candidates:
+                other, payload = self._entries[key]
+                similarity = float(np.count_nonzero(other == signature)) / NUM_PERM
+                if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                    best = NearDuplicateMatch(key=key, similarity=similarity, payload=payload)
+            if best:
+                self._entries.move_to_end(best.key)
+            return best
+
+    def add(self, key: str, text: str, payload: Dict[str, Any], signature: Optional[np.ndarray] = None):
+        signature = minhash_signature(text) if signature is None else signature
+        self.ensure_loaded()
+        self._add(key, signature, payload)
+
+    def _add(self, key: str, signature: np.ndarray, payload: Dict[str, Any]):
+        with self._lock:
+            self._remove(key)
+            self._discarded.discard(key)
+            self._entries[key] = (signature, payload)
+            for band, band_key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            self._dirty = True
+
+    def discard(self, key: str):
+        self.ensure_loaded()
+        with self._lock:
+            self._remove(key)
+            self._discarded.add(key)
+            self._dirty = True
+
+    def _insert_oldest(self, key: str, signature: np.ndarray, payload: Dict[str, Any]):
+        self._entries[key] = (signature, payload)
+        self._entries.move_to_end(key, last=False)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, set()).add(key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band, band_key in enumerate(self._band_keys(entry[0])):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    # ---------- Persistence ----------
+    def save(self, path: Optional[str] = None):
+        """
+        Write the index to `path`. Every worker keeps its own index and saves
+        to the same file, so under an exclusive lock the entries already on
+        disk (other workers' additions) are merged in first, except keys this
+        worker discarded; each worker writes through its own temp file.
+        """
+        path = path or self.path
+        if not path:
+            return
+        if not self.loaded:
+            print(f"⚠️ [NEAR-DUP] Not saving {path}: the persisted index was never loaded")
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                on_disk = self._read(path)
+                with self._lock:
+                    for key, signature, payload in on_disk:
+                        if key not in self._entries and key not in self._discarded:
+                            self._insert_oldest(key, signature, payload)
+                    while len(self._entries) > self.max_entries:
+                        self._remove(next(iter(self._entries)))
+                    keys = list(self._entries)
+                    signatures = np.stack([self._entries[k][0] for k in keys]) if keys else np.zeros((0, NUM_PERM), dtype=np.uint32)
+                    payloads = [json.dumps(self._entries[k][1]) for k in keys]
+                    self._discarded.clear()
+                    self._dirty = False
+                    self._last_save = time.monotonic()
+
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    np.savez(f, keys=np.asarray(keys, dtype=str), signatures=signatures, payloads=np.asarray(payloads, dtype=str))
+                os.replace(tmp, path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read(path: str) -> List[tuple]:
+        if not os.path.exists(path):
+            return []
+        with np.load(path) as data:
+            keys, signatures, payloads = data["keys"], data["signatures"], data["payloads"]
+        return [
+            (str(key), signature.astype(np.uint32), json.loads(str(payload)))
+            for key, signature, payload in zip(keys, signatures, payloads)
+        ]
+
+    def maybe_save(self):
+        if self._dirty and time.monotonic() - self._last_save >= NEAR_DUP_SAVE_INTERVAL:
+            self.save()
+
+    def flush(self):
+        """Save any unsaved additions, e.g. on shutdown."""
+        if self._dirty:
+            self.save()
+
+    def load(self, path: Optional[str] = None) -> int:
+        path = path or self.path
+        if not path:
+            return 0
+        entries = self._read(path)
+        for key, signature, payload in entries:
+            self._add(key, signature, payload)
+        self._dirty = False
+        self.loaded = True
+        return len(entries)
+
+    def ensure_loaded(self) -> int:
+        """Load the persisted index once; a failed load is not retried. Returns the entries loaded now."""
+        if self._load_attempted or self.loaded:
+            return 0
+        with self._load_lock:
+            if self._load_attempted or self.loaded:
+                return 0
+            self._load_attempted = True
+            try:
+                loaded = self.load()
+            except Exception as e:
+                print(f"⚠️ [NEAR-DUP] Could not load {self.path}: {e}")
+                return 0
+            if loaded:
+                print(f"🔧 [NEAR-DUP] Loaded {loaded} signatures from {self.path}")
+            return loaded
+
+
+def load_default_index(index: Optional[NearDuplicateIndex] = None) -> int:
+    """Load persisted signatures into the shared index ahead of the first request; called from the startup warm-up."""
+    return (index or near_duplicate_index).ensure_loaded()
+
+
+# Loaded by the warm-up, or lazily on first use when warm-up is off
+near_duplicate_index = NearDuplicateIndex(path=NEAR_DUP_INDEX_PATH or None)
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.shared_cache import cache_key, shared_cache
+
+# Rewrites of unchanged paragraphs are shared by every worker for this long
+REWRITE_CACHE_TTL_SECONDS = float(os.getenv("REWRITE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Changed paragraphs are rewritten concurrently, at most this many at a time
+REWRITE_MAX_PARALLEL = int(os.getenv("REWRITE_MAX_PARALLEL", "4"))
+
+PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t\r\f\v]*\n\s*")
+_SPACE_RE = re.compile(r"\s+")
+
+# rewrite(paragraph) -> (rewritten text or None when it failed, model that produced it or None to skip caching)
+Rewriter = Callable[[str], Awaitable[Tuple[Optional[str], Optional[str]]]]
+
+
+def split_paragraphs(text: str) -> List[Tuple[str, str, str]]:
+    """
+    (leading whitespace, paragraph, trailing whitespace + break) triples on
+    blank-line breaks. Joining every triple gives back `text`, so rewrites
+    can be stitched in without disturbing the original layout.
+    """
+    parts: List[Tuple[str, str, str]] = []
+    pos = 0
+    for end, nxt in [(m.start(), m.end()) for m in PARAGRAPH_BREAK_RE.finditer(text)] + [(len(text), len(text))]:
+        chunk = text[pos:end]
+        core = chunk.strip()
+        lead = chunk[:len(chunk) - len(chunk.lstrip())] if core else chunk
+        parts.append((lead, core, chunk[len(lead) + len(core):] + text[end:nxt]))
+        pos = nxt
+    return parts
+
+
+def normalize_paragraph(paragraph: str) -> str:
+    """Whitespace and Unicode form changes should not cost a new rewrite."""
+    return _SPACE_RE.sub(" ", unicodedata.normalize("NFC", paragraph)).strip()
+
+
+def _lookup(keys: Set[str], prompt_version: str, models: Sequence[str]) -> Dict[str, str]:
+    """Cached rewrite per normalized paragraph, preferring earlier models; one threadpool hop per request."""
+    hits: Dict[str, str] = {}
+    for key in keys:
+        for model in models:
+            hit = shared_cache.get("rewrite", cache_key(prompt_version, model, key))
+            if hit is not None:
+                hits[key] = hit
+                break
+    return hits
+
+
+@dataclass
+class MemoizedRewrite:
+    text: str
+    paragraphs: int
+    cached_paragraphs: int
+    rewritten_paragraphs: int
+    failed_paragraphs: int = 0
+
+
+async def rewrite_paragraphs(
+    text: str,
+    rewrite: Rewriter,
+    prompt_version: str,
+    models: Sequence[str] = (),
+    max_parallel: int = REWRITE_MAX_PARALLEL,
+    ttl: Optional[float] = REWRITE_CACHE_TTL_SECONDS,
+) -> MemoizedRewrite:
+    """
+    Rewrite `text` paragraph by paragraph, reusing cached rewrites keyed by
+    `prompt_version`, the model that produced them and the normalized
+    paragraph; `models` are looked up in preference order. Only new or
+    edited paragraphs are sent to `rewrite`, and a paragraph whose rewrite
+    failed keeps its original text. The output keeps the original order and
+    paragraph breaks.
+    """
+    parts = split_paragraphs(text)
+    keys = [normalize_paragraph(p) if p else None for _, p, _ in parts]
+
+    done: Dict[str, str] = {}
+    pending: Dict[str, str] = {}  # normalized -> paragraph, each distinct paragraph once
+    failed = set()
+    cached = 0
+    hits = await run_in_threadpool(_lookup, {k for k in keys if k is not None}, prompt_version, models) if shared_cache.enabled else {}
+    for (_, paragraph, _), key in zip(parts, keys):
+        if key is None or key in pending:
+            continue
+        if key not in done:
+            if key not in hits:
+                pending[key] = paragraph
+                continue
+            done[key] = hits[key]
+        cached += 1
+
+    limit = asyncio.Semaphore(max(1, max_parallel))
+
+    async def run(key: str, paragraph: str):
+        async with limit:
+            rewritten, model = await rewrite(paragraph)
+        if rewritten is None:
+            failed.add(key)
+            done[key] = paragraph
+            return
+        if model is not None:
+            await shared_cache.aset("rewrite", cache_key(prompt_version, model, key), rewritten, ttl=ttl)
+        done[key] = rewritten
+
+    await asyncio.gather(*(run(key, paragraph) for key, paragraph in pending.items()))
+
+    stitched = "".join(
+        lead + (done[key].strip() if key is not None else paragraph) + trail
+        for (lead, paragraph, trail), key in zip(parts, keys)
+    )
+    return MemoizedRewrite(
+        text=stitched,
+        paragraphs=sum(key is not None for key in keys),
+        cached_paragraphs=cached,
+        rewritten_paragraphs=len(pending) - len(failed),
+        failed_paragraphs=sum(key in failed for key in keys),
+    )
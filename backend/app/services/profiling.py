@@ -0,0 +1,249 @@
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+# Off by default: the middleware is not even installed unless this is set
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_DIR = os.getenv("PROFILING_DIR", ".cache/profiles")
+# Fraction of matching requests profiled without asking
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+# Requests sending this header with PROFILING_TOKEN are always profiled; the token also
+# guards /api/debug/profiles, which stay closed while it is unset
+PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Profile-Token")
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_ROUTES = tuple(r.strip() for r in os.getenv("PROFILING_ROUTES", "/api/angle,/api/spans").split(",") if r.strip())
+# cprofile (deterministic, stdlib) or pyinstrument (sampling, if installed)
+PROFILING_MODE = os.getenv("PROFILING_MODE", "cprofile")
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "50"))
+TOP_FUNCTIONS = 15
+
+_SLUG_RE = re.compile(r"[^a-zA-Z0-9]+")
+_NAME_RE = re.compile(r"[a-zA-Z0-9-]+")
+
+
+class _CProfileRun:
+    suffix = ".prof"
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path: str) -> List[Dict[str, Any]]:
+        self.profile.dump_stats(path)
+        stats = pstats.Stats(self.profile, stream=io.StringIO()).sort_stats("cumulative")
+        top = []
+        for (filename, line, func), (_, calls, own, cumulative, _) in sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True
+        )[:TOP_FUNCTIONS]:
+            top.append({
+                "function": f"{os.path.basename(filename)}:{line}({func})",
+                "calls": calls,
+                "own_ms": round(own * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            })
+        return top
+
+
+class _PyinstrumentRun:
+    suffix = ".html"
+
+    def __init__(self):
+        from pyinstrument import Profiler  # optional dependency, only needed in this mode
+        self.profiler = Profiler(interval=0.001, async_mode="enabled")
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+
+    def save(self, path: str) -> List[Dict[str, Any]]:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.profiler.output_html())
+        return []
+
+
+class RequestProfiler:
+    """
+    ASGI middleware that profiles opted-in requests on selected routes: a
+    random `sample_rate` share, plus any request carrying the privileged
+    header. Each profile is saved under `directory` with a JSON sidecar
+    (route, input size, status, duration, top functions by cumulative time).
+
+    One profile runs at a time; cProfile cannot nest, and on the event loop
+    it would also see other concurrent requests' work.
+    """
+
+    def __init__(
+        self,
+        directory: str = PROFILING_DIR,
+        sample_rate: float = PROFILING_SAMPLE_RATE,
+        routes: Tuple[str, ...] = PROFILING_ROUTES,
+        header: str = PROFILING_HEADER,
+        token: str = PROFILING_TOKEN,
+        mode: str = PROFILING_MODE,
+        max_files: int = PROFILING_MAX_FILES,
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.routes = routes
+        self.header = header.lower().encode("latin-1")
+        self.token = token
+        self.mode = mode
+        self.max_files = max_files
+        self._busy = threading.Lock()
+        self.stats = {"profiled": 0, "skipped_busy": 0, "errors": 0}
+
+    def authorized(self, value: Optional[str]) -> bool:
+        return bool(self.token) and value is not None and hmac.compare_digest(value, self.token)
+
+    def _reason(self, scope) -> Optional[str]:
+        path = scope.get("path", "")
+        if not any(path == r or path.startswith(r + "/") for r in self.routes):
+            return None
+        for name, value in scope.get("headers") or []:
+            if name == self.header and self.authorized(value.decode("latin-1")):
+                return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def _new_run(self):
+        if self.mode == "pyinstrument":
+            try:
+                return _PyinstrumentRun()
+            except ImportError:
+                print("⚠️ [PROFILING] pyinstrument is not installed, using cProfile")
+                self.mode = "cprofile"
+        return _CProfileRun()
+
+    def middleware(self, app):
+        async def profiled(scope, receive, send):
+            reason = self._reason(scope) if scope["type"] == "http" else None
+            if reason is None:
+                return await app(scope, receive, send)
+            if not self._busy.acquire(blocking=False):
+                self.stats["skipped_busy"] += 1
+                return await app(scope, receive, send)
+
+            received = 0
+            status_code = None
+
+            async def counting_receive():
+                nonlocal received
+                message = await receive()
+                received += len(message.get("body", b""))
+                return message
+
+            async def capturing_send(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                await send(message)
+
+            run = self._new_run()
+            started = time.perf_counter()
+            try:
+                run.start()
+                try:
+                    await app(scope, counting_receive, capturing_send)
+                finally:
+                    run.stop()
+                    duration_ms = (time.perf_counter() - started) * 1000.0
+                    # Dump, pstats sort, sidecar and pruning are blocking file work
+                    await run_in_threadpool(self._save, run, scope, reason, received, status_code, duration_ms)
+            finally:
+                self._busy.release()
+        return profiled
+
+    def _save(self, run, scope, reason: str, input_bytes: int, status_code: Optional[int], duration_ms: float):
+        path = scope.get("path", "")
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{_SLUG_RE.sub('-', path).strip('-')}-{uuid.uuid4().hex[:8]}"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            top = run.save(os.path.join(self.directory, name + run.suffix))
+            meta = {
+                "name": name,
+                "file": name + run.suffix,
+                "route": path,
+                "method": scope.get("method"),
+                "status": status_code,
+                "reason": reason,
+                "mode": self.mode,
+                "input_bytes": input_bytes,
+                "duration_ms": round(duration_ms, 3),
+                "created_at": time.time(),
+                "top_functions": top,
+            }
+            with open(os.path.join(self.directory, name + ".json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+            self.stats["profiled"] += 1
+            print(f"🔬 [PROFILING] {path} ({input_bytes} bytes, {duration_ms:.1f}ms, {reason}) -> {name}")
+            self.prune()
+        except OSError as e:
+            self.stats["errors"] += 1
+            print(f"⚠️ [PROFILING] Could not save profile for {path}: {e}")
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Metadata of saved profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        profiles.sort(key=lambda p: p.get("created_at", 0), reverse=True)
+        return profiles[:limit]
+
+    def path_of(self, name: str) -> Optional[str]:
+        """Profile file for a listed name; None for unknown or unsafe names."""
+        if not _NAME_RE.fullmatch(name):
+            return None
+        for suffix in (".prof", ".html"):
+            path = os.path.join(self.directory, name + suffix)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def prune(self):
+        """Keep the newest `max_files` profiles."""
+        for meta in self.recent(limit=10 ** 6)[self.max_files:]:
+            for filename in (meta.get("file"), meta.get("name", "") + ".json"):
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except (OSError, TypeError):
+                    pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": PROFILING_ENABLED,
+            "directory": self.directory,
+            "sample_rate": self.sample_rate,
+            "routes": list(self.routes),
+            "mode": self.mode,
+            **self.stats,
+        }
+
+
+profiler = RequestProfiler()
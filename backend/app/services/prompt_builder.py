@@ -0,0 +1,173 @@
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Rough budget for the reflection prompt; ~4 characters per token for English
+REFLECTION_TOKEN_BUDGET = int(os.getenv("REFLECTION_TOKEN_BUDGET", "3000"))
+CHARS_PER_TOKEN = 4
+MIN_TEXT_CHARS = 800
+MAX_SPANS_SHARE = 0.25  # spans may use at most this share of the budget
+TOP_INTENSITIES = 6
+# Rebuild the legacy prompt layout for an exact original size (its full repr per request); otherwise estimated
+REFLECTION_PROMPT_STATS = os.getenv("REFLECTION_PROMPT_STATS", "false").lower() in ("1", "true", "yes")
+
+REFLECTION_INSTRUCTIONS = (
+    "Analyze political framing severity and detect missing biases.\n"
+    "SPANS lists detected bias spans as [label_id, start, end] character offsets into TEXT; "
+    "label_id indexes LABELS. ANGLE and SPECTRUM are heuristic and classifier outputs.\n\n"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_spans(spans_json: Dict[str, Any], limit: Optional[int] = None) -> Tuple[Dict[str, Any], int]:
+    """Label dictionary + [label_id, start, end] tuples, highest confidence first when capped."""
+    spans = [s for s in spans_json.get("spans", []) if isinstance(s, dict)]
+    if limit is not None and len(spans) > limit:
+        spans = sorted(spans, key=lambda s: s.get("confidence", 0), reverse=True)[:limit]
+    spans = sorted(spans, key=lambda s: (s.get("start", 0), s.get("end", 0)))
+
+    labels: List[str] = []
+    ids: Dict[str, int] = {}
+    rows = []
+    for s in spans:
+        label = s.get("label") or s.get("type") or "?"
+        if label not in ids:
+            ids[label] = len(labels)
+            labels.append(label)
+        rows.append([ids[label], s.get("start"), s.get("end")])
+    return {"labels": labels, "spans": rows}, len(rows)
+
+
+def compact_angle(angle_json: Dict[str, Any], top: int = TOP_INTENSITIES) -> Dict[str, Any]:
+    """Drop evidence sentences (already in TEXT) and derived fields; keep the strongest intensities."""
+    intensities = sorted(
+        ((k, v) for k, v in (angle_json.get("intensity_scores") or {}).items() if v),
+        key=lambda kv: kv[1],
+        reverse=True,
+    )[:top]
+    return {
+        "patterns": angle_json.get("framing_patterns", []),
+        "techniques": angle_json.get("persuasion_techniques", []),
+        "emotions": angle_json.get("dominant_emotions", []),
+        "intensity": dict(intensities),
+        "confidence": angle_json.get("confidence"),
+    }
+
+
+def compact_spectrum(spectrum_json: Dict[str, Any]) -> Dict[str, Any]:
+    keys = ("left_right_score", "populist_score", "cluster", "confidence", "source")
+    return {k: spectrum_json[k] for k in keys if k in spectrum_json}
+
+
+def middle_cut(length: int, max_chars: int) -> Optional[Tuple[int, int, str]]:
+    """(head end, tail start, omission marker) for a text too long for `max_chars`, else None."""
+    if length <= max_chars:
+        return None
+    keep = max(0, max_chars - 48)  # room for the omission marker
+    head = int(keep * 0.7)
+    tail_start = length - (keep - head)
+    return head, tail_start, f"\n[... chars {head}-{tail_start} omitted ...]\n"
+
+
+def truncate_middle(text: str, max_chars: int) -> str:
+    """Keep the head and tail of the text; offsets of the kept head stay valid."""
+    cut = middle_cut(len(text), max_chars)
+    if cut is None:
+        return text
+    head, tail_start, marker = cut
+    return f"{text[:head]}{marker}{text[tail_start:]}"
+
+
+def rebase_spans(spans_json: Dict[str, Any], cut: Tuple[int, int, str]) -> Dict[str, Any]:
+    """Spans re-pointed into the truncated text: head spans kept, tail spans shifted, omitted ones dropped."""
+    head, tail_start, marker = cut
+    shift = head + len(marker) - tail_start
+    spans = []
+    for s in spans_json.get("spans", []):
+        if not isinstance(s, dict):
+            continue
+        start, end = s.get("start", 0), s.get("end", 0)
+        if end <= head:
+            spans.append(s)
+        elif start >= tail_start:
+            spans.append({**s, "start": start + shift, "end": end + shift})
+    return {**spans_json, "spans": spans}
+
+
+def legacy_reflection_prompt(text: str, spans_json: Any, angle_json: Any, spectrum_json: Any) -> str:
+    """The original prompt layout, kept to report how much compaction saves."""
+    return (
+        "Analyze political framing severity and detect missing biases.\n\n"
+        f"TEXT:\n{text}\n\n"
+        f"SPANS:\n{spans_json}\n\n"
+        f"ANGLE:\n{angle_json}\n\n"
+        f"SPECTRUM:\n{spectrum_json}\n\n"
+    )
+
+
+_LEGACY_LAYOUT_CHARS = len(legacy_reflection_prompt("", "", "", ""))
+
+
+def build_reflection_prompt(
+    text: str,
+    spans_json: Dict[str, Any],
+    angle_json: Dict[str, Any],
+    spectrum_json: Dict[str, Any],
+    token_budget: int = REFLECTION_TOKEN_BUDGET,
+    legacy_stats: bool = REFLECTION_PROMPT_STATS,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the /api/analyze reflection prompt within a token budget.
+    Returns the prompt and size statistics. The uncompacted size is
+    estimated from the text and serialized payloads; the legacy layout is
+    only rebuilt for an exact `original_chars` when REFLECTION_PROMPT_STATS is set.
+    """
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    angle_part = f"ANGLE:\n{_dumps(compact_angle(angle_json or {}))}\n\n"
+    spectrum_part = f"SPECTRUM:\n{_dumps(compact_spectrum(spectrum_json or {}))}\n\n"
+
+    spans_obj, kept = compact_spans(spans_json or {})
+    total_spans = kept
+    spans_part = f"LABELS:{_dumps(spans_obj['labels'])}\nSPANS:{_dumps(spans_obj['spans'])}\n\n"
+    # Low-signal spans go first when they crowd out the article
+    while len(spans_part) > budget_chars * MAX_SPANS_SHARE and kept > 0:
+        spans_obj, kept = compact_spans(spans_json or {}, limit=kept // 2)
+        spans_part = f"LABELS:{_dumps(spans_obj['labels'])}\nSPANS:{_dumps(spans_obj['spans'])}\n\n"
+
+    fixed = len(REFLECTION_INSTRUCTIONS) + len(angle_part) + len(spectrum_part) + len(spans_part) + len("TEXT:\n\n\n")
+    text_chars = max(MIN_TEXT_CHARS, budget_chars - fixed)
+    body = truncate_middle(text, text_chars)
+    cut = middle_cut(len(text), text_chars)
+    if cut is not None:
+        # SPANS offsets must point into the TEXT the model sees; this only shrinks the spans part
+        spans_obj, kept = compact_spans(rebase_spans(spans_json or {}, cut), limit=kept)
+        spans_part = f"LABELS:{_dumps(spans_obj['labels'])}\nSPANS:{_dumps(spans_obj['spans'])}\n\n"
+
+    prompt = f"{REFLECTION_INSTRUCTIONS}TEXT:\n{body}\n\n{spans_part}{angle_part}{spectrum_part}"
+    original_chars_est = (
+        _LEGACY_LAYOUT_CHARS + len(text)
+        + len(_dumps(spans_json)) + len(_dumps(angle_json)) + len(_dumps(spectrum_json))
+    )
+    stats = {
+        "original_chars_est": original_chars_est,
+        "original_tokens_est": math.ceil(original_chars_est / CHARS_PER_TOKEN),
+        "compact_chars": len(prompt),
+        "compact_tokens_est": estimate_tokens(prompt),
+        "token_budget": token_budget,
+        "spans_kept": kept,
+        "spans_total": total_spans,
+        "text_truncated": cut is not None,
+    }
+    if legacy_stats:
+        original = legacy_reflection_prompt(text, spans_json, angle_json, spectrum_json)
+        stats["original_chars"] = len(original)
+        stats["original_tokens_est"] = estimate_tokens(original)
+    return prompt, stats
@@ -0,0 +1,253 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+# Substrings that mark an LLM/backend failure as worth retrying
+TRANSIENT_MARKERS = (
+    "429", "500", "502", "503", "504",
+    "resource exhausted", "resource_exhausted", "unavailable", "deadline",
+    "timeout", "timed out", "internal", "overloaded", "connection", "reset by peer",
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the backend while the breaker is open."""
+
+
+class AdapterError(Exception):
+    """An adapter returned an {"error": ...} payload instead of raising."""
+
+
+def is_transient(error: BaseException) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in TRANSIENT_MARKERS)
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive transient failures;
+    open -> half-open after `reset_seconds`, letting one probe through;
+    the probe's outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probe_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._probe_in_flight = False
+
+    def record_abandoned(self):
+        """
+        The call was cancelled before it finished. A cancelled half-open probe
+        counts as a failed probe; otherwise the breaker would wait forever for
+        a probe result that never comes.
+        """
+        if self._probe_in_flight:
+            self.record_failure()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class ResilientCaller:
+    """
+    Wraps an async backend call with capped exponential retry (with jitter),
+    optional hedging after a p95-based delay, and a circuit breaker.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        attempt_timeout: Optional[float] = 30.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.5,
+        hedge_min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.sleep = sleep
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "failures": 0, "short_circuited": 0}
+
+    @classmethod
+    def from_env(cls, prefix: str = "GEMINI") -> "ResilientCaller":
+        env = lambda name, default: os.getenv(f"{prefix}_{name}", default)
+        return cls(
+            max_attempts=int(env("RETRY_ATTEMPTS", "3")),
+            base_delay=float(env("RETRY_BASE_DELAY", "0.25")),
+            max_delay=float(env("RETRY_MAX_DELAY", "4.0")),
+            attempt_timeout=float(env("ATTEMPT_TIMEOUT", "30")) or None,
+            hedge=env("HEDGE", "false").lower() in ("1", "true", "yes"),
+            hedge_min_delay=float(env("HEDGE_MIN_DELAY", "0.5")),
+            breaker=CircuitBreaker(
+                failure_threshold=int(env("BREAKER_FAILURES", "5")),
+                reset_seconds=float(env("BREAKER_RESET_SECONDS", "30")),
+            ),
+        )
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self.latency.samples) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.quantile(self.hedge_quantile))
+
+    async def _timed(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs):
+        started = time.monotonic()
+        if self.attempt_timeout:
+            result = await asyncio.wait_for(fn(*args, **kwargs), timeout=self.attempt_timeout)
+        else:
+            result = await fn(*args, **kwargs)
+        self.latency.record(time.monotonic() - started)
+        return result
+
+    async def _attempt(self, fn, *args, **kwargs):
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._timed(fn, *args, **kwargs)
+
+        primary = asyncio.ensure_future(self._timed(fn, *args, **kwargs))
+        pending = {primary}
+        error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            # Slow tail: fire a second request and take whichever succeeds first
+            self.stats["hedges"] += 1
+            pending.add(asyncio.ensure_future(self._timed(fn, *args, **kwargs)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs):
+        self.stats["calls"] += 1
+        for attempt in range(self.max_attempts):
+            if not self.breaker.allow():
+                self.stats["short_circuited"] += 1
+                raise CircuitOpenError("Circuit breaker is open; backend marked unhealthy")
+            try:
+                result = await self._attempt(fn, *args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Cancelled (client gone, outer timeout): nothing was learned about the backend
+                    self.breaker.record_abandoned()
+                    raise
+                transient = is_transient(e)
+                if transient:
+                    self.breaker.record_failure()
+                else:
+                    # The backend answered; the request itself was bad
+                    self.breaker.record_success()
+                if not transient or attempt == self.max_attempts - 1:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+                await self.sleep(backoff * random.uniform(0.5, 1.0))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.latency.quantile(0.95)
+        return {
+            **self.stats,
+            "breaker": self.breaker.snapshot(),
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1) if self.hedge_delay() is not None else None,
+        }
+
+
+class ResilientAdapter:
+    """
+    Applies a ResilientCaller to any adapter exposing `async generate(prompt)`
+    that reports failures as {"error": ...} dicts (e.g. fault-injecting fakes).
+    """
+
+    def __init__(self, inner, caller: Optional[ResilientCaller] = None):
+        self.inner = inner
+        self.caller = caller or ResilientCaller()
+
+    async def _generate_once(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        result = await self.inner.generate(prompt, **kwargs)
+        if isinstance(result, dict) and "error" in result:
+            raise AdapterError(result["error"])
+        return result
+
+    async def generate(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        try:
+            return await self.caller.call(self._generate_once, prompt, **kwargs)
+        except CircuitOpenError as e:
+            return {"mock": False, "error": str(e), "circuit_open": True}
+        except Exception as e:
+            return {"mock": False, "error": str(e)}
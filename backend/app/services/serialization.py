@@ -0,0 +1,42 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encoding; pydantic models, UUIDs, datetimes and numpy values are handled natively."""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def loads(data) -> Any:
+    return orjson.loads(data)
+
+
+def json_column(value: Any) -> Any:
+    """A JSONB column as data; rows written before the JSONB migration hold JSON-encoded strings."""
+    return loads(value) if isinstance(value, str) else value
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Response for handlers that already built plain, validated data.
+    Returning it directly skips FastAPI's response_model validation and
+    jsonable_encoder pass, so the payload is serialized exactly once.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.serialization import dumps, loads
+
+# One SQLite file shared by every worker process on the host
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", ".cache/shared_cache.sqlite3")
+SHARED_CACHE_ENABLED = os.getenv("SHARED_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "100000"))
+PURGE_EVERY = 500  # writes between expiry / size sweeps
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_updated_at ON cache(updated_at);
+"""
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable key for arbitrary text parts (prompts, article bodies, ...)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SharedCache:
+    """
+    Cross-worker key/value cache in SQLite WAL mode: readers never block the
+    single writer, so every gunicorn worker can share LLM results and analysis
+    dedup entries, and they survive restarts. Connections are opened lazily
+    per process and thread, so the object is safe to create before fork.
+    Failures degrade to cache misses.
+    """
+
+    def __init__(self, path: Optional[str] = SHARED_CACHE_PATH, max_entries: int = SHARED_CACHE_MAX_ENTRIES, enabled: bool = SHARED_CACHE_ENABLED):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = enabled and bool(path)
+        self._local = threading.local()
+        self._writes = 0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        owner = (os.getpid(), self.path)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.owner == owner:
+            return conn
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.executescript(SCHEMA)
+        self._local.conn, self._local.owner = conn, owner
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._error("get", e)
+            return None
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, dumps(value), now + ttl if ttl else None, now),
+            )
+            self.stats["writes"] += 1
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                self.purge(conn)
+        except sqlite3.Error as e:
+            self._error("set", e)
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Any]], Tuple[Any, Any]], ttl: Optional[float] = None) -> Any:
+        """
+        Atomic read-modify-write across workers: `fn(current)` returns
+        (new value, result) inside one IMMEDIATE transaction. Falls back to
+        `fn(None)` without storing anything when the cache is unavailable.
+        """
+        if not self.enabled:
+            return fn(None)[1]
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                current = loads(row[0]) if row is not None and (row[1] is None or row[1] >= now) else None
+                value, result = fn(current)
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, dumps(value), now + ttl if ttl else None, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self.stats["writes"] += 1
+            return result
+        except sqlite3.Error as e:
+            self._error("update", e)
+            return fn(None)[1]
+
+    def delete(self, namespace: str, key: str):
+        if not self.enabled:
+            return
+        try:
+            self._connect().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+        except sqlite3.Error as e:
+            self._error("delete", e)
+
+    # ---------- From async code ----------
+    # A write can wait up to busy_timeout on another worker's transaction, so
+    # handlers go through these instead of blocking the event loop.
+    async def aget(self, namespace: str, key: str) -> Optional[Any]:
+        return await run_in_threadpool(self.get, namespace, key) if self.enabled else None
+
+    async def aset(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        if self.enabled:
+            await run_in_threadpool(self.set, namespace, key, value, ttl)
+
+    async def aupdate(self, namespace: str, key: str, fn: Callable[[Optional[Any]], Tuple[Any, Any]], ttl: Optional[float] = None) -> Any:
+        if not self.enabled:
+            return fn(None)[1]
+        return await run_in_threadpool(self.update, namespace, key, fn, ttl)
+
+    async def adelete(self, namespace: str, key: str):
+        if self.enabled:
+            await run_in_threadpool(self.delete, namespace, key)
+
+    def purge(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """Drop expired entries, then the oldest ones beyond max_entries."""
+        conn = conn or self._connect()
+        removed = conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            removed += conn.execute(
+                "DELETE FROM cache WHERE (namespace, key) IN "
+                "(SELECT namespace, key FROM cache ORDER BY updated_at LIMIT ?)", (excess,)
+            ).rowcount
+        return removed
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _error(self, op: str, error: Exception):
+        self.stats["errors"] += 1
+        print(f"⚠️ [SHARED-CACHE] {op} failed on {self.path}: {error}")
+
+    def snapshot(self) -> dict:
+        return {"path": self.path, "enabled": self.enabled, **self.stats}
+
+
+shared_cache = SharedCache()
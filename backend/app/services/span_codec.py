@@ -0,0 +1,100 @@
+import base64
+import struct
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Packed span sets: one row per (article, lexicon version) instead of one row per span.
+#   header  <BBI  format version, label-id width (1 or 2 bytes), span count
+#   body    zlib(label ids | start deltas uint32 | lengths uint32 | confidence uint16)
+# Spans are sorted by (start, end), so start deltas are small and compress well.
+# span_text is not stored; it is sliced back out of the article content.
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<BBI")
+CONFIDENCE_SCALE = 65535  # confidences are quantised to 1/65535
+
+
+def encode_spans(spans: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Encode span dicts (label/start/end/confidence) into a label dictionary and a packed payload."""
+    spans = sorted(
+        (
+            # Grouped spans (span_merge "group" policy) store each member hit with its own offsets
+            member
+            for s in spans if s.get("start") is not None and s.get("end") is not None
+            for member in (s.get("members") or [s])
+        ),
+        key=lambda s: (s["start"], s["end"]),
+    )
+    labels: List[str] = []
+    ids: Dict[str, int] = {}
+    for s in spans:
+        label = s.get("label") or s.get("type") or "?"
+        if label not in ids:
+            ids[label] = len(labels)
+            labels.append(label)
+
+    count = len(spans)
+    id_width = 1 if len(labels) <= 256 else 2
+    label_ids = np.fromiter((ids[s.get("label") or s.get("type") or "?"] for s in spans), dtype=np.uint32, count=count)
+    starts = np.fromiter((s["start"] for s in spans), dtype=np.int64, count=count)
+    ends = np.fromiter((s["end"] for s in spans), dtype=np.int64, count=count)
+    confidences = np.fromiter((s.get("confidence") or 0.0 for s in spans), dtype=np.float64, count=count)
+
+    body = b"".join((
+        label_ids.astype("<u1" if id_width == 1 else "<u2").tobytes(),
+        np.diff(starts, prepend=0).astype("<u4").tobytes(),
+        (ends - starts).astype("<u4").tobytes(),
+        np.round(np.clip(confidences, 0.0, 1.0) * CONFIDENCE_SCALE).astype("<u2").tobytes(),
+    ))
+    payload = HEADER.pack(FORMAT_VERSION, id_width, count) + zlib.compress(body, 6)
+    return {
+        "labels": labels,
+        "span_count": count,
+        "payload": base64.b64encode(payload).decode("ascii"),
+    }
+
+
+def decode_spans(labels: List[str], payload: str, text: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Inverse of encode_spans; returns dicts in the `Span` shape, ordered by start."""
+    raw = base64.b64decode(payload)
+    version, id_width, count = HEADER.unpack_from(raw)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported span payload version {version}")
+    body = zlib.decompress(raw[HEADER.size:])
+
+    offset = 0
+
+    def take(dtype: str, width: int) -> np.ndarray:
+        nonlocal offset
+        array = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+        offset += width * count
+        return array
+
+    label_ids = take("<u1" if id_width == 1 else "<u2", id_width)
+    starts = np.cumsum(take("<u4", 4), dtype=np.int64)
+    ends = starts + take("<u4", 4)
+    confidences = take("<u2", 2) / CONFIDENCE_SCALE
+
+    return [
+        {
+            "label": labels[label_id],
+            "span_text": text[start:end] if text is not None else "",
+            "start": start,
+            "end": end,
+            "confidence": round(confidence, 4),
+        }
+        for label_id, start, end, confidence in zip(
+            label_ids.tolist(), starts.tolist(), ends.tolist(), confidences.tolist()
+        )
+    ]
+
+
+def span_set_row(article_id: Any, spans: Iterable[Dict[str, Any]], lexicon_version: Optional[str]) -> Dict[str, Any]:
+    """Row for the span_sets table (migration 006)."""
+    return {
+        "article_id": str(article_id),
+        "lexicon_version": lexicon_version or "unversioned",
+        "format_version": FORMAT_VERSION,
+        **encode_spans(spans),
+    }
@@ -0,0 +1,132 @@
+import os
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional
+
+# Lexicon patterns overlap: "everyone" (Overgeneralization) sits inside
+# "everyone knows" (Bandwagon), and the same offsets can match several labels.
+#   none        every hit, as extracted
+#   longest     non-overlapping hits, preferring longer ones (then confidence)
+#   confidence  non-overlapping hits, preferring higher confidence (then length)
+#   group       one span per outermost interval, keeping that span's own
+#               label and confidence; when other hits sit inside it, `labels`
+#               lists every label (outer first) and `members` keeps each hit
+#               with its own offsets and confidence; only nesting folds,
+#               so partially overlapping hits stay separate rows
+POLICIES = ("none", "longest", "confidence", "group")
+SPAN_MERGE_POLICY = os.getenv("SPAN_MERGE_POLICY", "group")
+
+
+def resolve_policy(policy: Optional[str]) -> str:
+    policy = (policy or SPAN_MERGE_POLICY).strip().lower()
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown span merge policy {policy!r} (expected one of {', '.join(POLICIES)})")
+    return policy
+
+
+def _length(span: Dict[str, Any]) -> int:
+    return span["end"] - span["start"]
+
+
+class _Fenwick:
+    """Counts over slots 0..n-1: add one, count a prefix, find the k-th set slot."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.tree = [0] * (n + 1)
+
+    def add(self, slot: int):
+        i = slot + 1
+        while i <= self.n:
+            self.tree[i] += 1
+            i += i & -i
+
+    def count(self, stop: int) -> int:
+        total = 0
+        while stop:
+            total += self.tree[stop]
+            stop &= stop - 1
+        return total
+
+    def kth(self, k: int) -> int:
+        pos, step = 0, 1 << self.n.bit_length()
+        while step:
+            if pos + step <= self.n and self.tree[pos + step] < k:
+                pos += step
+                k -= self.tree[pos]
+            step >>= 1
+        return pos
+
+
+def _select_disjoint(spans: List[Dict[str, Any]], rank) -> List[Dict[str, Any]]:
+    """
+    Greedy selection in rank order: a span is kept unless it overlaps one
+    already kept. Kept intervals are disjoint, so only the last kept one
+    starting before this span ends can overlap it; a Fenwick tree over the
+    spans in (start, end) order finds that one in O(log n).
+    """
+    order = sorted(range(len(spans)), key=lambda i: (spans[i]["start"], spans[i]["end"]))
+    starts = [spans[i]["start"] for i in order]
+    slot = {i: pos for pos, i in enumerate(order)}
+    placed = _Fenwick(len(order))
+    kept: List[Dict[str, Any]] = []
+    for i in sorted(range(len(spans)), key=lambda i: rank(spans[i])):
+        span = spans[i]
+        before = placed.count(bisect_left(starts, span["end"]))  # kept spans starting before this one ends
+        if before and spans[order[placed.kth(before)]]["end"] > span["start"]:
+            continue
+        placed.add(slot[i])
+        kept.append(span)
+    return sorted(kept, key=lambda s: (s["start"], s["end"]))
+
+
+def _member(span: Dict[str, Any]) -> Dict[str, Any]:
+    return {"label": span["label"], "start": span["start"], "end": span["end"], "confidence": span.get("confidence") or 0.0}
+
+
+def _group_nested(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sweep by (start, -end): a span inside the last outer interval joins it.
+    Only nested spans fold; one that runs past the outer end starts its own
+    group, so partial overlaps come back as separate rows.
+    """
+    groups: List[Dict[str, Any]] = []
+    members: List[Dict[tuple, Dict[str, Any]]] = []
+    for span in sorted(spans, key=lambda s: (s["start"], -s["end"], -(s.get("confidence") or 0.0))):
+        if groups and span["end"] <= groups[-1]["end"]:
+            # Identical (label, start, end) hits collapse to the most confident one
+            key = (span["label"], span["start"], span["end"])
+            seen = members[-1].get(key)
+            if seen is None or (span.get("confidence") or 0.0) > seen["confidence"]:
+                members[-1][key] = _member(span)
+            continue
+        groups.append(dict(span))
+        members.append({(span["label"], span["start"], span["end"]): _member(span)})
+
+    for group, found in zip(groups, members):
+        if len(found) < 2:
+            continue
+        group["members"] = sorted(found.values(), key=lambda m: (m["start"], m["end"], m["label"]))
+        ranked = sorted(found.values(), key=lambda m: -m["confidence"])
+        group["labels"] = list(dict.fromkeys([group["label"]] + [m["label"] for m in ranked]))
+    return groups
+
+
+def shift_span(span: Dict[str, Any], delta: int) -> Dict[str, Any]:
+    """Move a span (and its group members) by `delta` characters."""
+    shifted = {**span, "start": span["start"] + delta, "end": span["end"] + delta}
+    if span.get("members"):
+        shifted["members"] = [{**m, "start": m["start"] + delta, "end": m["end"] + delta} for m in span["members"]]
+    return shifted
+
+
+def merge_spans(spans: Iterable[Dict[str, Any]], policy: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Resolve overlapping span dicts under `policy` (SPAN_MERGE_POLICY by default); O(n log n)."""
+    policy = resolve_policy(policy)
+    spans = list(spans)
+    if policy == "group":
+        return _group_nested(spans)
+    if policy == "none" or len(spans) < 2:
+        return spans
+    if policy == "longest":
+        return _select_disjoint(spans, lambda s: (-_length(s), -(s.get("confidence") or 0.0), s["start"]))
+    return _select_disjoint(spans, lambda s: (-(s.get("confidence") or 0.0), -_length(s), s["start"]))
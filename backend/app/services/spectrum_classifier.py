@@ -0,0 +1,252 @@
+"""
+Local political-spectrum classifier used as a fast path in front of Gemini.
+
+Hashed word uni/bi-gram features feed one linear layer with two
+regression heads (left_right_score, populist_score) and a softmax head
+over the spectrum clusters. Everything is plain NumPy.
+
+Train / evaluate offline:
+
+    python -m app.services.spectrum_classifier train --from-db --out .cache/spectrum_model.npz
+    python -m app.services.spectrum_classifier evaluate --model .cache/spectrum_model.npz --data labels.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SPECTRUM_MODEL_PATH = os.getenv("SPECTRUM_MODEL_PATH", ".cache/spectrum_model.npz")
+
+CLUSTERS = ["left", "center-left", "centrist", "center-right", "right", "populist-left", "populist-right"]
+FEATURE_DIM = 1 << 18
+N_REGRESSION = 2
+
+_WORD_RE = re.compile(r"\w+")
+
+Example = Tuple[str, float, float, str]
+
+
+def featurize(text: str, dim: int = FEATURE_DIM) -> Tuple[np.ndarray, np.ndarray]:
+    """Sparse (indices, values) vector of hashed uni/bi-grams, log-scaled and L2-normalised."""
+    words = _WORD_RE.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    hashed = np.fromiter((zlib.crc32(g.encode("utf-8")) % dim for g in grams), dtype=np.int64, count=len(grams))
+    idx, counts = np.unique(hashed, return_counts=True)
+    values = np.log1p(counts).astype(np.float32)
+    values /= np.linalg.norm(values)
+    return idx, values
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    e = np.exp(z - z.max())
+    return e / e.sum()
+
+
+class SpectrumClassifier:
+    def __init__(self, weights: Optional[np.ndarray] = None, bias: Optional[np.ndarray] = None, dim: int = FEATURE_DIM):
+        self.dim = dim
+        width = N_REGRESSION + len(CLUSTERS)
+        self.weights = weights if weights is not None else np.zeros((dim, width), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(width, dtype=np.float32)
+
+    def _forward(self, idx: np.ndarray, values: np.ndarray) -> np.ndarray:
+        return values @ self.weights[idx] + self.bias
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        out = self._forward(*featurize(text, self.dim))
+        probs = _softmax(out[N_REGRESSION:])
+        best = int(np.argmax(probs))
+        return {
+            "left_right_score": round(float(np.clip(out[0], -1.0, 1.0)), 3),
+            "populist_score": round(float(np.clip(out[1], 0.0, 1.0)), 3),
+            "cluster": CLUSTERS[best],
+            "confidence": round(float(probs[best]), 3),
+        }
+
+    def fit(self, examples: Sequence[Example], epochs: int = 8, lr: float = 0.5, l2: float = 1e-6, seed: int = 0):
+        """Plain SGD over sparse rows; only the touched weight rows are updated."""
+        rng = random.Random(seed)
+        rows = [(featurize(text, self.dim), lr_score, pop, CLUSTERS.index(cluster)) for text, lr_score, pop, cluster in examples]
+        for epoch in range(epochs):
+            rng.shuffle(rows)
+            step = lr / (1 + epoch)
+            for (idx, values), lr_score, pop, target in rows:
+                if not len(idx):
+                    continue
+                out = self._forward(idx, values)
+                grad = np.empty_like(out)
+                grad[0] = out[0] - lr_score
+                grad[1] = out[1] - pop
+                grad[N_REGRESSION:] = _softmax(out[N_REGRESSION:])
+                grad[N_REGRESSION + target] -= 1.0
+                w = self.weights[idx]
+                self.weights[idx] = w - step * (np.outer(values, grad) + l2 * w)
+                self.bias -= step * grad
+        return self
+
+    def evaluate(self, examples: Sequence[Example], threshold: float = 0.0) -> Dict[str, Any]:
+        if not examples:
+            return {"examples": 0}
+        preds = [self.predict(text) for text, _, _, _ in examples]
+        lr_err = [abs(p["left_right_score"] - e[1]) for p, e in zip(preds, examples)]
+        pop_err = [abs(p["populist_score"] - e[2]) for p, e in zip(preds, examples)]
+        correct = [p["cluster"] == e[3] for p, e in zip(preds, examples)]
+        confident = [c for p, c in zip(preds, correct) if p["confidence"] >= threshold]
+        return {
+            "examples": len(examples),
+            "left_right_mae": round(float(np.mean(lr_err)), 4),
+            "populist_mae": round(float(np.mean(pop_err)), 4),
+            "cluster_accuracy": round(float(np.mean(correct)), 4),
+            "threshold": threshold,
+            "coverage": round(len(confident) / len(examples), 4),
+            "accuracy_above_threshold": round(float(np.mean(confident)), 4) if confident else None,
+        }
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, weights=self.weights, bias=self.bias, clusters=np.asarray(CLUSTERS))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SpectrumClassifier":
+        with np.load(path) as data:
+            if list(data["clusters"]) != CLUSTERS:
+                raise ValueError(f"Model {path} was trained for different clusters")
+            weights = data["weights"]
+            return cls(weights=weights, bias=data["bias"], dim=weights.shape[0])
+
+
+_classifier: Optional[SpectrumClassifier] = None
+_classifier_loaded = False
+
+
+def get_spectrum_classifier() -> Optional[SpectrumClassifier]:
+    """Lazily load the trained model; None when no model file exists."""
+    global _classifier, _classifier_loaded
+    if not _classifier_loaded:
+        _classifier_loaded = True
+        if os.path.exists(SPECTRUM_MODEL_PATH):
+            try:
+                _classifier = SpectrumClassifier.load(SPECTRUM_MODEL_PATH)
+                print(f"🔹 Using local spectrum classifier from {SPECTRUM_MODEL_PATH}")
+            except Exception as e:
+                print(f"⚠️ Could not load spectrum classifier {SPECTRUM_MODEL_PATH}: {e}")
+    return _classifier
+
+
+# ---------- Training data ----------
+def _valid(row: Dict[str, Any]) -> bool:
+    return (
+        bool(row.get("text"))
+        and row.get("cluster") in CLUSTERS
+        and isinstance(row.get("left_right_score"), (int, float))
+        and isinstance(row.get("populist_score"), (int, float))
+    )
+
+
+def _to_examples(rows: Iterable[Dict[str, Any]]) -> List[Example]:
+    return [
+        (r["text"], float(r["left_right_score"]), float(r["populist_score"]), r["cluster"])
+        for r in rows if _valid(r)
+    ]
+
+
+def load_jsonl(path: str) -> List[Example]:
+    """One {"text", "left_right_score", "populist_score", "cluster"} object per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        return _to_examples(json.loads(line) for line in f if line.strip())
+
+
+def spectrum_source(spectrum: Dict[str, Any]) -> str:
+    """Who produced a /political-spectrum result: gemini, local, mock or fallback."""
+    if spectrum.get("source") == "local":
+        return "local"
+    if spectrum.get("mock"):
+        return "mock"
+    if "error" in spectrum or "fallback_result" in spectrum:
+        return "fallback"
+    return "gemini"
+
+
+def load_from_db(client, page_size: int = 500) -> List[Example]:
+    """
+    Gemini labels already stored in spectrum_fingerprints, joined with
+    article text. Rows labelled by this model, the mock adapter or a
+    fallback are skipped so the classifier never learns from itself.
+    """
+    rows, offset = [], 0
+    while True:
+        page = (
+            client.table("spectrum_fingerprints")
+            .select("article_id,left_right_score,populist_score,cluster")
+            .eq("source", "gemini")
+            .order("article_id")
+            .order("id")  # article_id repeats; a unique tiebreak keeps pages stable
+            .range(offset, offset + page_size - 1)
+            .execute()
+            .data or []
+        )
+        if page:
+            ids = list({str(r["article_id"]) for r in page})
+            articles = client.table("articles").select("id,content").in_("id", ids).execute().data or []
+            content = {str(a["id"]): a["content"] for a in articles}
+            rows.extend({**r, "text": content.get(str(r["article_id"]))} for r in page)
+        if len(page) < page_size:
+            return _to_examples(rows)
+        offset += page_size
+
+
+def _load_examples(args) -> List[Example]:
+    if args.data:
+        return load_jsonl(args.data)
+    from app.models.db import supabase
+    if not supabase:
+        raise SystemExit("Database connection not available; use --data instead")
+    return load_from_db(supabase)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Train / evaluate the local spectrum classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("train", "evaluate"):
+        p = sub.add_parser(name)
+        src = p.add_mutually_exclusive_group(required=True)
+        src.add_argument("--data", help="JSONL file of labelled texts")
+        src.add_argument("--from-db", action="store_true", help="Use labels stored in spectrum_fingerprints")
+        p.add_argument("--threshold", type=float, default=float(os.getenv("SPECTRUM_LOCAL_CONFIDENCE", "0.8")))
+
+    train = sub.choices["train"]
+    train.add_argument("--out", default=SPECTRUM_MODEL_PATH)
+    train.add_argument("--epochs", type=int, default=8)
+    train.add_argument("--holdout", type=float, default=0.2)
+    sub.choices["evaluate"].add_argument("--model", default=SPECTRUM_MODEL_PATH)
+
+    args = parser.parse_args(argv)
+    examples = _load_examples(args)
+    print(f"Loaded {len(examples)} labelled examples")
+
+    if args.command == "train":
+        random.Random(0).shuffle(examples)
+        n_test = int(len(examples) * args.holdout)
+        test, train_set = examples[:n_test], examples[n_test:]
+        model = SpectrumClassifier().fit(train_set, epochs=args.epochs)
+        print("Holdout:", json.dumps(model.evaluate(test, args.threshold)))
+        model.save(args.out)
+        print(f"Saved model to {args.out}")
+    else:
+        model = SpectrumClassifier.load(args.model)
+        print(json.dumps(model.evaluate(examples, args.threshold)))
+
+
+if __name__ == "__main__":
+    main()
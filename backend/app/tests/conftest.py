@@ -0,0 +1,18 @@
+import pytest
+from app.services.admission import admission
+from app.services.shared_cache import shared_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_shared_cache(tmp_path, monkeypatch):
+    """Each test gets its own cross-worker cache file."""
+    monkeypatch.setattr(shared_cache, "path", str(tmp_path / "shared_cache.sqlite3"))
+    yield shared_cache
+    shared_cache.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_admission():
+    """Rate-limit buckets and slot counts start empty for every test."""
+    admission.reset()
+    yield admission
@@ -0,0 +1,140 @@
+import asyncio
+import pytest
+import threading
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, Mock, patch
+from app.api import gemini_test
+from app.main import app
+from app.services.admission import (
+    AdmissionController,
+    LocalBuckets,
+    Rejected,
+    SharedBuckets,
+    admission,
+    take_token,
+)
+
+client = TestClient(app)
+
+
+def test_token_bucket_refills_up_to_burst():
+    state, wait = take_token(None, 100.0, rate=2.0, burst=3.0)
+    assert state == (2.0, 100.0) and wait == 0
+
+    state, wait = take_token((0.0, 100.0), 100.25, rate=2.0, burst=3.0)
+    assert wait == pytest.approx(0.25)  # 0.5 tokens refilled, the other half takes 0.25s
+
+    state, wait = take_token((0.0, 100.0), 200.0, rate=2.0, burst=3.0)
+    assert state == (2.0, 200.0) and wait == 0
+
+
+def test_rate_limit_rejects_after_burst():
+    controller = AdmissionController(rate=0.5, burst=2, max_concurrency=10, backend="local")
+
+    async def run():
+        for _ in range(2):
+            controller.release(await controller.acquire("a"))
+        with pytest.raises(Rejected) as exc:
+            await controller.acquire("a")
+        # Another client has its own bucket
+        controller.release(await controller.acquire("b"))
+        return exc.value
+
+    rejected = asyncio.run(run())
+    assert rejected.reason == "rate_limited"
+    assert rejected.retry_after == 2
+    assert controller.stats["rate_limited"] == 1
+
+
+def test_waiter_gets_released_slot_and_late_waiters_are_shed():
+    controller = AdmissionController(rate=100, burst=100, max_concurrency=1, max_wait=0.05, backend="local")
+
+    async def run():
+        first = await controller.acquire("a")
+        second = asyncio.create_task(controller.acquire("b"))
+        await asyncio.sleep(0)
+        assert controller.snapshot()["queued"] == 1
+        controller.release(first)
+        started = await second
+        assert controller.active == 1
+
+        with pytest.raises(Rejected) as exc:
+            await controller.acquire("c")  # slot still held past the wait budget
+        controller.release(started)
+        return exc.value
+
+    rejected = asyncio.run(run())
+    assert rejected.reason == "queue_timeout"
+    assert rejected.retry_after >= 1
+    assert controller.active == 0
+    assert controller.stats["shed_timeout"] == 1
+
+
+def test_full_queue_is_shed_immediately():
+    controller = AdmissionController(rate=100, burst=100, max_concurrency=1, max_queue=0, backend="local")
+
+    async def run():
+        started = await controller.acquire("a")
+        with pytest.raises(Rejected) as exc:
+            await controller.acquire("b")
+        controller.release(started)
+        return exc.value
+
+    assert asyncio.run(run()).reason == "queue_full"
+
+
+def test_shared_buckets_are_shared_between_instances():
+    worker_a, worker_b = SharedBuckets(rate=0.01, burst=2), SharedBuckets(rate=0.01, burst=2)
+    assert worker_a.take("client") == 0
+    assert worker_b.take("client") == 0
+    assert worker_a.take("client") > 0
+
+
+def test_shared_backend_spends_tokens_off_the_event_loop():
+    controller = AdmissionController(rate=0.01, burst=1, backend="shared")
+    assert controller.backend == "shared"
+
+    async def run():
+        loop_thread = threading.get_ident()
+        spent_in = []
+        take = controller.buckets.take
+        controller.buckets.take = lambda *args: spent_in.append(threading.get_ident()) or take(*args)
+        controller.release(await controller.acquire("client"))
+        with pytest.raises(Rejected):
+            await controller.acquire("client")
+        return loop_thread, spent_in
+
+    loop_thread, spent_in = asyncio.run(run())
+    assert len(spent_in) == 2 and loop_thread not in spent_in
+
+
+def test_raw_prompt_passthrough_is_gated(monkeypatch):
+    adapter = Mock(generate=AsyncMock(return_value={"raw_response": "ok"}))
+    with patch("app.api.gemini_test.get_gemini_adapter", return_value=adapter):
+        assert client.post("/api/gemini/test", json={"prompt": "hi"}).status_code == 404
+        monkeypatch.setattr(gemini_test, "GEMINI_TEST_ENABLED", True)
+        monkeypatch.setattr(gemini_test, "GEMINI_TEST_TOKEN", "secret")
+        assert client.post("/api/gemini/test", json={"prompt": "hi"}).status_code == 403
+        resp = client.post("/api/gemini/test", json={"prompt": "hi"}, headers={"X-Gemini-Test-Token": "secret"})
+    assert resp.status_code == 200
+    assert adapter.generate.await_count == 1
+
+
+def test_llm_route_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(gemini_test, "GEMINI_TEST_ENABLED", True)
+    monkeypatch.setattr(admission, "buckets", LocalBuckets(rate=0.1, burst=1))
+    adapter = Mock(generate=AsyncMock(return_value={"raw_response": "ok"}))
+    with patch("app.api.gemini_test.get_gemini_adapter", return_value=adapter):
+        ok = client.post("/api/gemini/test", json={"prompt": "hi"})
+        limited = client.post("/api/gemini/test", json={"prompt": "hi"})
+
+    assert ok.status_code == 200
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "10"
+    assert limited.json()["detail"]["error"] == "rate_limited"
+    assert adapter.generate.await_count == 1
+
+    metrics = client.get("/api/admission").json()
+    assert metrics["admitted"] == 1
+    assert metrics["rate_limited"] == 1
+    assert metrics["active"] == 0
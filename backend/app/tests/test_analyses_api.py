@@ -0,0 +1,115 @@
+import pytest
+import threading
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, Mock, patch
+from app.main import app
+from app.services.analysis_cache import AnalysisCache, etag_matches
+
+client = TestClient(app)
+
+ARTICLE_ID = "00000000-0000-0000-0000-0000000000a1"
+ANALYSIS_ID = "00000000-0000-0000-0000-0000000000b1"
+ROW = {
+    "id": ANALYSIS_ID,
+    "article_id": ARTICLE_ID,
+    "created_at": "2025-11-20T10:00:00+00:00",
+    "lexicon_version": "2025.11.1",
+    "spans": {"spans": [], "lexicon_version": "2025.11.1"},
+    "angle": '{"framing_patterns": ["crisis"]}',  # pre-JSONB rows hold strings
+    "spectrum": {"cluster": "centrist"},
+    "gemini_reflection": {"first": None},
+}
+
+
+@pytest.fixture
+def db():
+    tables = {name: MagicMock() for name in ("analyses", "angle_fingerprints", "spectrum_fingerprints", "articles")}
+    tables["analyses"].select.return_value.eq.return_value.execute.return_value = Mock(data=[ROW])
+    tables["analyses"].select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value = Mock(data=[ROW])
+    tables["angle_fingerprints"].select.return_value.eq.return_value.lte.return_value.order.return_value.limit.return_value.execute.return_value = Mock(data=[{"id": "afp"}])
+    tables["spectrum_fingerprints"].select.return_value.eq.return_value.lte.return_value.order.return_value.limit.return_value.execute.return_value = Mock(data=[])
+    with patch("app.api.analyses.supabase") as supabase, patch("app.api.analyses.analysis_cache", AnalysisCache()) as cache:
+        supabase.table.side_effect = tables.__getitem__
+        yield tables, cache
+
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_get_analysis_by_id_then_revalidate(db):
+    tables, cache = db
+    resp = client.get(f"/api/analyses/{ANALYSIS_ID}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["angle"] == {"framing_patterns": ["crisis"]}
+    assert body["angle_fingerprint"] == {"id": "afp"}
+    assert body["spectrum_fingerprint"] is None
+    # Fingerprints are the ones written with this analysis, not the article's newest
+    tables["angle_fingerprints"].select.return_value.eq.return_value.lte.assert_called_once_with("created_at", ROW["created_at"])
+    etag = resp.headers["etag"]
+    assert etag.startswith('"') and resp.headers["cache-control"] == "private, no-cache"
+
+    again = client.get(f"/api/analyses/{ANALYSIS_ID}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert again.content == b""
+    # Second request was served from the cache
+    assert tables["analyses"].select.call_count == 1
+    assert cache.stats["hits"] == 1
+
+
+def test_latest_analysis_is_invalidated_on_reanalysis(db):
+    tables, cache = db
+    first = client.get(f"/api/articles/{ARTICLE_ID}/analysis")
+    assert first.status_code == 200
+    client.get(f"/api/articles/{ARTICLE_ID}/analysis")
+    assert tables["analyses"].select.call_count == 1
+
+    newer = {**ROW, "id": "00000000-0000-0000-0000-0000000000b2", "spectrum": {"cluster": "left"}}
+    tables["analyses"].select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value = Mock(data=[newer])
+    cache.invalidate_article(ARTICLE_ID)
+
+    resp = client.get(f"/api/articles/{ARTICLE_ID}/analysis", headers={"If-None-Match": first.headers["etag"]})
+    assert resp.status_code == 200
+    assert resp.json()["spectrum"] == {"cluster": "left"}
+    assert resp.headers["etag"] != first.headers["etag"]
+
+
+def test_invalidation_is_seen_by_other_workers(db):
+    _, cache = db
+    other_worker = AnalysisCache()
+    entry = other_worker.put(ANALYSIS_ID, ARTICLE_ID, {"x": 1}, latest=True)
+    assert other_worker.get_latest(ARTICLE_ID) == entry
+
+    cache.invalidate_article(ARTICLE_ID)  # e.g. DELETE handled by this worker
+    assert other_worker.get(ANALYSIS_ID) is None
+    assert other_worker.get_latest(ARTICLE_ID) is None
+
+
+def test_concurrent_invalidations_each_bump_the_generation():
+    workers = [AnalysisCache() for _ in range(8)]
+    threads = [threading.Thread(target=w.invalidate_article, args=(ARTICLE_ID,)) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert AnalysisCache.generation(ARTICLE_ID) == len(workers)
+
+
+def test_lru_is_bounded():
+    cache = AnalysisCache(max_entries=2)
+    for i in range(3):
+        cache.put(f"an{i}", "art", {"i": i})
+    assert len(cache) == 2
+    assert cache.get("an0") is None
+
+
+def test_missing_analysis_returns_404(db):
+    tables, _ = db
+    tables["analyses"].select.return_value.eq.return_value.execute.return_value = Mock(data=[])
+    assert client.get(f"/api/analyses/{ANALYSIS_ID}").status_code == 404
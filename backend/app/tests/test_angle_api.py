@@ -1,5 +1,8 @@
+import asyncio
+import json
 import pytest
 from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
 from app.main import app  # adjust if your main application file name differs
 
 client = TestClient(app)
@@ -52,3 +55,88 @@ def test_angle_api_no_patterns():
     assert data["dominant_emotions"] == []
     assert data["evidence_spans"] == []
     assert "does not strongly match" in data["angle_summary"]
+
+
+AMBIGUOUS = {"text": "The council met on Monday to discuss the plan."}
+
+
+def _fake_adapter(response=None, delay=0.0):
+    async def generate(prompt, task=None):
+        await asyncio.sleep(delay)
+        return response
+
+    adapter = Mock()
+    adapter.generate = Mock(side_effect=generate)
+    return adapter
+
+
+def test_angle_llm_mode_skips_gemini_when_confident():
+    adapter = _fake_adapter()
+    with patch("app.api.angle.gemini", adapter):
+        resp = client.post("/api/angle", json={**AMBIGUOUS, "mode": "llm", "confidence_threshold": 0.0})
+
+    assert resp.status_code == 200
+    assert resp.json()["mode_used"] == "heuristic"
+    adapter.generate.assert_not_called()
+
+
+def test_angle_llm_mode_escalates_and_merges():
+    llm = {
+        "framing_patterns": ["crisis", "not-a-real-angle"],
+        "persuasion_techniques": ["urgency"],
+        "dominant_emotions": ["worry"],
+        "angle_summary": "Frames the meeting as an emergency.",
+        "confidence": 0.8,
+    }
+    adapter = _fake_adapter({"mock": False, "raw_response": "```json\n" + json.dumps(llm) + "\n```"})
+    with patch("app.api.angle.gemini", adapter):
+        resp = client.post("/api/angle", json={**AMBIGUOUS, "mode": "llm"})
+
+    data = resp.json()
+    assert data["mode_used"] == "llm"
+    assert data["framing_patterns"] == ["crisis"]
+    assert data["persuasion_techniques"] == ["urgency"]
+    assert data["dominant_emotions"] == ["fear", "worry"]
+    assert data["angle_summary"] == "Frames the meeting as an emergency."
+    assert data["confidence"] == 0.8
+
+    prompt = adapter.generate.call_args[0][0]
+    assert "Allowed angles:" in prompt
+    assert AMBIGUOUS["text"] in prompt
+
+
+def test_angle_llm_mode_respects_latency_budget():
+    adapter = _fake_adapter({"raw_response": "{}"}, delay=0.5)
+    with patch("app.api.angle.gemini", adapter):
+        small = client.post("/api/angle", json={**AMBIGUOUS, "mode": "llm", "latency_budget_ms": 10})
+        with patch("app.api.angle.ANGLE_LLM_MIN_BUDGET_MS", 0):
+            timed_out = client.post("/api/angle", json={**AMBIGUOUS, "mode": "llm", "latency_budget_ms": 50})
+
+    assert small.json()["mode_used"] == "heuristic-budget"
+    assert timed_out.json()["mode_used"] == "llm-timeout"
+    assert adapter.generate.call_count == 1
+
+
+def test_angle_llm_mode_falls_back_on_bad_output():
+    adapter = _fake_adapter({"error": "quota exceeded"})
+    with patch("app.api.angle.gemini", adapter):
+        resp = client.post("/api/angle", json={**AMBIGUOUS, "mode": "llm"})
+
+    assert resp.json()["mode_used"] == "llm-fallback"
+
+
+def test_angle_llm_escalation_goes_through_admission(reset_admission, monkeypatch):
+    from app.services.admission import LocalBuckets
+
+    monkeypatch.setattr(reset_admission, "buckets", LocalBuckets(rate=0.1, burst=1))
+    adapter = _fake_adapter({"raw_response": "{}"})
+    with patch("app.api.angle.gemini", adapter):
+        first = client.post("/api/angle", json={**AMBIGUOUS, "mode": "llm"})
+        second = client.post("/api/angle", json={**AMBIGUOUS, "mode": "llm"})
+        heuristic = client.post("/api/angle", json=AMBIGUOUS)
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert heuristic.status_code == 200  # heuristic-only requests never take a token
+    assert adapter.generate.call_count == 1
+    assert reset_admission.active == 0
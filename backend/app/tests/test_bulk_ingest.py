@@ -0,0 +1,103 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+from app.api.articles import iter_ndjson_lines
+from app.services.analysis_queue import AnalysisQueue
+
+client = TestClient(app)
+
+
+def _ndjson(*rows):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows) + "\n"
+
+
+def _chunks(*parts):
+    async def gen():
+        for part in parts:
+            yield part
+    return gen()
+
+
+async def _collect(aiter):
+    return [item async for item in aiter]
+
+
+@pytest.fixture
+def mock_supabase():
+    inserted = []
+
+    def insert(rows):
+        inserted.append(rows)
+        result = Mock(data=[{"id": f"id-{sum(map(len, inserted)) - len(rows) + i}", **r} for i, r in enumerate(rows)])
+        return Mock(execute=Mock(return_value=result))
+
+    with patch("app.api.articles.supabase") as supabase:
+        supabase.table.return_value.insert.side_effect = insert
+        yield inserted
+
+
+def test_line_splitter_handles_chunk_boundaries_and_overlong_lines():
+    lines = asyncio.run(_collect(iter_ndjson_lines(_chunks(b'{"a":', b'1}\n{"b"', b':2}\n', b'tail'))))
+    assert lines == [(1, b'{"a":1}'), (2, b'{"b":2}'), (3, b"tail")]
+
+    lines = asyncio.run(_collect(iter_ndjson_lines(_chunks(b"x" * 10, b"x" * 10, b"x\nok\n"), max_line_bytes=8)))
+    assert lines == [(1, None), (2, b"ok")]
+
+
+def test_bulk_ingest_batches_and_reports_per_line(mock_supabase):
+    body = _ndjson(
+        {"title": "A", "content": "one"},
+        {"title": "B", "content": "two", "author": "wire"},
+        "not json",
+        {"title": "", "content": "empty title"},
+        {"title": "C", "content": "three"},
+    ) + "\n"  # blank lines are ignored
+
+    resp = client.post("/api/articles/bulk?batch_size=2", content=body.encode())
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["created"], data["invalid"], data["failed"]) == (3, 2, 0)
+    assert [len(batch) for batch in mock_supabase] == [2, 1]
+    statuses = {r["line"]: r["status"] for r in data["results"]}
+    assert statuses == {1: "created", 2: "created", 3: "invalid", 4: "invalid", 5: "created"}
+    assert data["results"][0]["id"] == "id-0"
+    assert data["results"][3]["error"][0]["loc"] == ["title"]
+    assert "ctx" not in data["results"][3]["error"][0]
+
+
+def test_failed_batch_marks_its_lines(mock_supabase):
+    with patch("app.api.articles._insert_batch", side_effect=RuntimeError("db down")):
+        resp = client.post("/api/articles/bulk", content=_ndjson({"title": "A", "content": "x"}).encode())
+    assert resp.json()["results"] == [{"line": 1, "status": "failed", "error": "db down"}]
+
+
+def test_bulk_ingest_can_queue_analysis(mock_supabase):
+    queued = []
+    with patch("app.api.articles.analysis_queue", Mock(submit=lambda i: queued.append(i) or True)):
+        resp = client.post("/api/articles/bulk?analyze=true", content=_ndjson({"title": "A", "content": "x"}).encode())
+    assert resp.json()["queued"] == 1
+    assert resp.json()["results"][0]["queued"] is True
+    assert queued == ["id-0"]
+
+
+def test_analysis_queue_runs_and_rejects_when_full():
+    seen = []
+
+    async def handler(article_id):
+        seen.append(article_id)
+
+    async def run():
+        queue = AnalysisQueue(handler, maxsize=2, workers=1)
+        results = [queue.submit(str(i)) for i in range(3)]
+        assert await queue.join(timeout=1)
+        await queue.stop()
+        return results, queue.stats
+
+    results, stats = asyncio.run(run())
+    assert results == [True, True, False]
+    assert seen == ["0", "1"]
+    assert stats["done"] == 2 and stats["rejected"] == 1
@@ -0,0 +1,138 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+from app.api.angle import compute_intensity, match_lexicon
+from app.services.corpus_stats import CorpusMatrix, intensity_matrix, week_bucket
+from app.services.lexicon_registry import get_lexicons
+
+client = TestClient(app)
+
+
+ARTICLES = [
+    {"id": "a1", "content": "This disaster is a crisis. Everyone agrees, act now!", "author": "Daily", "created_at": "2025-11-10T08:00:00+00:00"},
+    {"id": "a2", "content": "The crisis deepens and the mayor is to blame.", "author": "Daily", "created_at": "2025-11-11T08:00:00+00:00"},
+    {"id": "a3", "content": "The sky is blue and the grass is green.", "author": "Weekly", "created_at": "2025-11-18T08:00:00+00:00"},
+]
+
+
+@pytest.fixture
+def matrix():
+    with patch("app.api.corpus.corpus_matrix", CorpusMatrix()) as m:
+        yield m
+
+
+@pytest.fixture
+def mock_supabase():
+    with patch("app.api.corpus.supabase") as mock_supabase:
+        yield mock_supabase
+
+
+def _query(mock_supabase):
+    return mock_supabase.table.return_value.select.return_value.order.return_value.order.return_value
+
+
+def test_week_bucket():
+    assert week_bucket("2025-11-10T08:00:00+00:00") == "2025-W46"
+    assert week_bucket(None) == "unknown"
+    assert week_bucket("garbage") == "unknown"
+
+
+def test_intensity_matrix_matches_scalar_version():
+    lex = get_lexicons()
+    m = CorpusMatrix()
+    m.add_documents(ARTICLES[:1], lex)
+
+    text = ARTICLES[0]["content"].lower()
+    _, counts = match_lexicon(text, lex.angle_lexicons)
+    expected = compute_intensity(counts, int(m.words[0]))
+
+    row = intensity_matrix(m.counts, m.words)[0]
+    for key, value in expected.items():
+        assert row[m.keys.index(f"angle:{key}")] == pytest.approx(value)
+
+
+def test_add_documents_skips_seen_ids():
+    m = CorpusMatrix()
+    assert m.add_documents(ARTICLES) == 3
+    assert m.add_documents(ARTICLES) == 0
+    assert m.size == 3
+    assert m.cursor == ARTICLES[2]["created_at"]
+
+
+class PagedArticles:
+    def __init__(self, rows):
+        self.rows, self.after, self.lo, self.hi = rows, None, 0, None
+
+    def select(self, *_):
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def gte(self, column, value):
+        self.after = value
+        return self
+
+    def range(self, lo, hi):
+        self.lo, self.hi = lo, hi
+        return self
+
+    def execute(self):
+        rows = [r for r in self.rows if self.after is None or r["created_at"] >= self.after]
+        return Mock(data=rows[self.lo:self.hi + 1])
+
+
+def test_refresh_pages_through_every_article():
+    rows = [
+        {"id": f"p{i}", "content": "crisis", "author": "Daily", "created_at": f"2025-11-10T08:{i // 60:02d}:{i % 60:02d}+00:00"}
+        for i in range(1200)
+    ]
+    client_ = Mock(table=Mock(side_effect=lambda name: PagedArticles(rows)))
+    m = CorpusMatrix()
+    assert m.refresh(client_, page_size=500) == 1200
+    assert m.size == 1200
+
+    rows.append({"id": "late", "content": "x", "author": "Daily", "created_at": "2025-11-11T00:00:00+00:00"})
+    assert m.refresh(client_, page_size=500) == 1
+
+
+def test_stats_grouped_by_source(matrix):
+    matrix.add_documents(ARTICLES)
+    stats = matrix.stats(group_by="source", kind="angle", top_k=3)
+
+    groups = {g["group"]: g for g in stats["groups"]}
+    assert groups["Daily"]["documents"] == 2
+    assert groups["Daily"]["dominant"][0]["key"] == "angle:crisis"
+    assert groups["Daily"]["dominant"][0]["prevalence"] == 1.0
+    assert groups["Weekly"]["dominant"] == []
+
+
+def test_endpoint_only_counts_new_articles(matrix, mock_supabase):
+    _query(mock_supabase).range.return_value.execute.return_value = Mock(data=ARTICLES[:2])
+    resp = client.get("/api/corpus/framing-stats?group_by=week")
+    assert resp.status_code == 200
+    assert resp.json()["documents"] == 2
+
+    # Second call resumes from the cursor and only sees the newer article
+    _query(mock_supabase).gte.return_value.range.return_value.execute.return_value = Mock(data=ARTICLES[1:])
+    with patch.object(matrix, "_count_row", wraps=matrix._count_row) as counter:
+        resp = client.get("/api/corpus/framing-stats?group_by=week&percentiles=50,99")
+    assert counter.call_count == 1
+    _query(mock_supabase).gte.assert_called_with("created_at", ARTICLES[1]["created_at"])
+
+    data = resp.json()
+    assert data["documents"] == 3
+    assert [g["group"] for g in data["groups"]] == ["2025-W46", "2025-W47"]
+    assert set(data["groups"][0]["dominant"][0]["percentiles"]) == {"p50", "p99"}
+    assert any({p["a"], p["b"]} == {"angle:crisis", "persuasion:bandwagon"} for p in data["co_occurrence"])
+
+
+@patch("app.api.corpus.supabase", None)
+def test_endpoint_no_database(matrix):
+    assert client.get("/api/corpus/framing-stats").status_code == 503
+
+
+def test_endpoint_rejects_bad_percentiles(matrix):
+    resp = client.get("/api/corpus/framing-stats?refresh=false&percentiles=50,abc")
+    assert resp.status_code == 422
@@ -0,0 +1,143 @@
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from app.main import app
+from app.services.deadline import Deadline, StageTracker
+from app.services.near_duplicate import NearDuplicateIndex
+
+client = TestClient(app)
+
+TEXT = "Everyone knows this disaster is catastrophic. They deliberately ignored the crisis."
+SPECTRUM = {"left_right_score": -0.1, "populist_score": 0.2, "cluster": "centrist"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_slices_remaining_budget():
+    clock = FakeClock()
+    deadline = Deadline(1000, clock=clock)
+    assert deadline.slice(0.5, reserve=0.2) == pytest.approx(0.4)
+
+    clock.now = 0.9
+    assert deadline.remaining() == pytest.approx(0.1)
+    assert deadline.slice(reserve=0.2) == 0.0
+    clock.now = 2.0
+    assert deadline.expired
+    assert Deadline(None).slice(cap=5.0) == 5.0
+
+
+def test_stage_tracker_records_outcomes():
+    stages = StageTracker(Deadline(None))
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    async def run():
+        await stages.run("slow", slow, timeout=0.01)
+        await stages.run("boom", boom, timeout=1)
+        await stages.run("tiny", slow, timeout=0.05, min_seconds=0.1)
+        return await stages.run("ok", lambda: asyncio.sleep(0, result=42), timeout=1)
+
+    assert asyncio.run(run()) == 42
+    assert {k: v["status"] for k, v in stages.stages.items()} == {
+        "slow": "timed_out", "boom": "failed", "tiny": "skipped", "ok": "completed",
+    }
+    assert stages.partial
+
+
+@pytest.fixture
+def mock_supabase():
+    tables = {}
+
+    def table(name):
+        if name not in tables:
+            tables[name] = MagicMock()
+            tables[name].insert.return_value.execute.return_value = Mock(data=[{"id": f"{name}-id", "content": TEXT}])
+        return tables[name]
+
+    with patch("app.api.analyze.supabase") as mock_supabase, \
+         patch("app.api.analyze.near_duplicate_index", NearDuplicateIndex()), \
+         patch("app.api.analyze.ANALYZE_PERSIST_RESERVE_MS", 0), \
+         patch("app.api.analyze.ANALYZE_MIN_STAGE_MS", 10):
+        mock_supabase.table.side_effect = table
+        yield tables
+
+
+def _sleeping(seconds, result):
+    async def call(*args, **kwargs):
+        await asyncio.sleep(seconds)
+        return result
+    return call
+
+
+def test_slow_spectrum_returns_partial_result(mock_supabase):
+    adapter = Mock(generate=AsyncMock(return_value={"raw_response": "reflection"}))
+    with patch("app.api.analyze.political_spectrum", _sleeping(5, SPECTRUM)), \
+         patch("app.api.analyze.get_gemini_adapter", return_value=adapter):
+        started = time.monotonic()
+        resp = client.post("/api/analyze", json={"text": TEXT}, headers={"X-Deadline-Ms": "500"})
+        elapsed = time.monotonic() - started
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert elapsed < 2
+    assert data["partial"] is True
+    assert data["deadline_ms"] == 500
+    assert data["stages"]["heuristics"]["status"] == "completed"
+    assert data["stages"]["spectrum"]["status"] == "timed_out"
+    assert data["stages"]["reflection"]["status"] == "completed"
+    assert data["spectrum"] is None
+    assert data["spectrum_fingerprint_id"] is None
+    assert data["angle"]["framing_patterns"]
+    assert "spectrum_fingerprints" not in mock_supabase
+
+
+def test_slow_reflection_is_cancelled(mock_supabase):
+    adapter = Mock(generate=_sleeping(5, {"raw_response": "late"}))
+    with patch("app.api.analyze.political_spectrum", AsyncMock(return_value=SPECTRUM)), \
+         patch("app.api.analyze.get_gemini_adapter", return_value=adapter):
+        resp = client.post("/api/analyze", json={"text": TEXT, "deadline_ms": 300})
+
+    data = resp.json()
+    assert data["stages"]["spectrum"]["status"] == "completed"
+    assert data["stages"]["reflection"]["status"] == "timed_out"
+    assert data["reflection"]["first"] is None
+    assert data["spectrum"] == SPECTRUM
+    assert data["spectrum_fingerprint_id"] == "spectrum_fingerprints-id"
+
+
+def test_complete_run_is_not_partial(mock_supabase):
+    adapter = Mock(generate=AsyncMock(return_value={"raw_response": "reflection"}))
+    with patch("app.api.analyze.political_spectrum", AsyncMock(return_value=SPECTRUM)), \
+         patch("app.api.analyze.get_gemini_adapter", return_value=adapter):
+        resp = client.post("/api/analyze", json={"text": TEXT})
+
+    data = resp.json()
+    assert data["partial"] is False
+    assert data["deadline_ms"] == 60000
+    assert set(data["stages"]) == {"heuristics", "spectrum", "reflection"}
+    # JSONB columns receive objects, not JSON-encoded strings
+    row = mock_supabase["analyses"].insert.call_args[0][0]
+    assert row["spectrum"] == SPECTRUM
+    assert isinstance(row["spans"]["spans"], list)
+    # All spans go out in a single packed upsert
+    mock_supabase["span_sets"].upsert.assert_called_once()
+    assert "spans" not in mock_supabase
+
+
+def test_invalid_deadline_is_rejected(mock_supabase):
+    resp = client.post("/api/analyze", json={"text": TEXT}, headers={"X-Deadline-Ms": "soon"})
+    assert resp.status_code == 400
+    resp = client.post("/api/analyze", json={"text": TEXT, "deadline_ms": 0})
+    assert resp.status_code == 400
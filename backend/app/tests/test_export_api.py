@@ -0,0 +1,140 @@
+import csv
+import gzip
+import io
+import json
+import re
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from app.main import app
+from app.api.export import decode_cursor, encode_cursor, export_records
+
+client = TestClient(app)
+
+ARTICLES = [
+    {"id": f"a{i:02d}", "title": f"T{i}", "author": "wire", "content": f"body {i}",
+     "created_at": f"2025-11-{10 + i // 3:02d}T00:00:00+00:00"}  # three articles share each timestamp
+    for i in range(10)
+]
+ANALYSES = [
+    {"id": "old", "article_id": "a01", "created_at": "2025-11-01", "lexicon_version": "v0", "spectrum": {"cluster": "left"}},
+    {"id": "new", "article_id": "a01", "created_at": "2025-11-02", "lexicon_version": "v1",
+     "spectrum": '{"cluster": "right", "left_right_score": 0.4}', "angle": {"framing_patterns": ["crisis", "blame"]}},
+]
+
+
+class FakeQuery:
+    """Just enough of the PostgREST builder for keyset paging."""
+
+    def __init__(self, rows, log, max_rows=None):
+        self.rows, self.log, self.filters, self.n = rows, log, [], max_rows
+
+    def select(self, *_):
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def or_(self, expr):
+        ts, aid = re.match(r'created_at\.gt\."([^"]+)",and\(created_at\.eq\."[^"]+",id\.gt\.(\w+)\)', expr).groups()
+        self.filters.append(lambda r: (r["created_at"], r["id"]) > (ts, aid))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda r: r[column] in values)
+        return self
+
+    def limit(self, n):
+        self.n = min(n, self.n or n)
+        return self
+
+    def execute(self):
+        rows = [r for r in self.rows if all(f(r) for f in self.filters)]
+        if self.rows is ARTICLES:
+            rows = sorted(rows, key=lambda r: (r["created_at"], r["id"]))
+        else:
+            rows = sorted(rows, key=lambda r: r["created_at"], reverse=True)
+        self.log.append(len(rows[: self.n]) if self.n else len(rows))
+        return type("Res", (), {"data": rows[: self.n] if self.n else rows})()
+
+
+LATEST_ANALYSES = list({a["article_id"]: a for a in sorted(ANALYSES, key=lambda a: a["created_at"])}.values())
+
+
+class FakeClient:
+    def __init__(self, max_rows=None):
+        self.log, self.max_rows = [], max_rows
+
+    def table(self, name):
+        if name == "articles":
+            return FakeQuery(ARTICLES, self.log, self.max_rows)
+        assert name == "latest_article_analyses"
+        return FakeQuery(LATEST_ANALYSES, self.log)
+
+
+def test_cursor_roundtrip_and_validation():
+    token = encode_cursor("2025-11-10T00:00:00+00:00", "a01")
+    assert decode_cursor(token) == ("2025-11-10T00:00:00+00:00", "a01")
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor!")
+
+
+def test_keyset_paging_visits_every_article_once():
+    fake = FakeClient()
+    records = list(export_records(fake, page_size=4))
+    assert [r["article"]["id"] for r in records] == [a["id"] for a in ARTICLES]
+    # 3 article pages (4 + 4 + 2), each followed by one analyses query, then an empty page
+    assert fake.log == [4, 1, 4, 0, 2, 0, 0]
+    joined = next(r for r in records if r["article"]["id"] == "a01")
+    assert joined["analysis"]["id"] == "new"
+    assert joined["analysis"]["spectrum"]["cluster"] == "right"
+
+
+def test_server_capped_pages_do_not_end_the_export():
+    fake = FakeClient(max_rows=3)  # PostgREST max-rows below the requested page size
+    records = list(export_records(fake, page_size=4))
+    assert [r["article"]["id"] for r in records] == [a["id"] for a in ARTICLES]
+
+
+def test_resume_from_cursor():
+    fake = FakeClient()
+    first = list(export_records(fake, page_size=4))
+    resumed = list(export_records(fake, after=decode_cursor(first[4]["cursor"]), page_size=4))
+    assert [r["article"]["id"] for r in resumed] == [a["id"] for a in ARTICLES[5:]]
+
+
+def test_ndjson_stream_with_gzip():
+    with patch("app.api.export.supabase", FakeClient()):
+        resp = client.get("/api/export?page_size=3", headers={"Accept-Encoding": "gzip"})
+        raw = client.get("/api/export?page_size=3", headers={"Accept-Encoding": "identity"})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(l) for l in resp.text.splitlines()]  # httpx decodes gzip transparently
+    assert len(lines) == len(ARTICLES)
+    assert "content-encoding" not in raw.headers
+    assert raw.text == resp.text
+
+
+def test_csv_stream():
+    with patch("app.api.export.supabase", FakeClient()):
+        resp = client.get("/api/export?format=csv&page_size=4")
+
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert len(rows) == len(ARTICLES)
+    a01 = next(r for r in rows if r["article_id"] == "a01")
+    assert a01["cluster"] == "right"
+    assert a01["framing_patterns"] == "crisis;blame"
+    assert json.loads(a01["spectrum"])["left_right_score"] == 0.4
+
+
+def test_gzip_stream_is_valid_gzip():
+    from app.api.export import gzip_stream
+    assert gzip.decompress(b"".join(gzip_stream(iter([b"a" * 1000, b"b"])))) == b"a" * 1000 + b"b"
+
+
+def test_bad_cursor_is_rejected():
+    with patch("app.api.export.supabase", FakeClient()):
+        assert client.get("/api/export?cursor=%25%25").status_code == 400
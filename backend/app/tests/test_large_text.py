@@ -0,0 +1,88 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import large_text
+from app.api.angle import heuristic_analyze
+from app.api.large_text import WindowedAngle, window_spans
+from app.api.spans import extract_span_dicts
+from app.services.large_text import MAX_INLINE_TEXT_CHARS, TextTooLarge, iter_windows, open_text, spool_stream
+from app.services.lexicon_registry import get_lexicons
+from app.services.span_merge import merge_spans
+
+client = TestClient(app)
+
+SENTENCES = [
+    "Everyone knows this disaster is catastrophic.",
+    "The committee met on Tuesday to review the budget.",
+    "They deliberately ignored the crisis!",
+    "It is always the ordinary people who pay.",
+    "Rainfall was close to the seasonal average.\r\n",
+]
+DOC = " ".join(SENTENCES * 200)
+
+
+async def _chunks(data: bytes, size: int = 4096):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _by_offset(spans):
+    return sorted(spans, key=lambda s: (s["start"], s["end"], s["label"]))
+
+
+def test_windows_partition_the_text():
+    windows = list(iter_windows(DOC, window_chars=1000, overlap_chars=100))
+    assert len(windows) == -(-len(DOC) // 1000)
+    assert "".join(w.text[w.own_slice] for w in windows) == DOC
+    assert max(len(w.text) for w in windows) <= 1200
+    assert [(w.own_start, w.own_end) for w in iter_windows("", 10, 2)] == [(0, 0)]
+
+
+@pytest.mark.parametrize("policy", ["none", "group", "longest"])
+def test_windowed_scan_matches_whole_text_pass(policy):
+    lex = get_lexicons()
+    spans, angle = [], WindowedAngle(lex, max_evidence=10 ** 6)
+    for window in iter_windows(DOC, window_chars=1500, overlap_chars=256):
+        spans.extend(window_spans(window, lex, policy))
+        angle.add(window)
+
+    assert _by_offset(spans) == _by_offset(merge_spans(extract_span_dicts(DOC, lex), policy))
+    assert angle.result() == heuristic_analyze(DOC, lex).model_dump()
+
+
+def test_spool_rolls_over_to_disk_and_enforces_cap():
+    data = DOC.encode("utf-8")
+    spool = asyncio.run(spool_stream(_chunks(data), max_bytes=len(data), spool_bytes=1024))
+    assert spool._rolled  # on disk past spool_bytes
+    assert open_text(spool).read() == DOC
+    spool.close()
+
+    with pytest.raises(TextTooLarge):
+        asyncio.run(spool_stream(_chunks(data), max_bytes=len(data) - 1))
+
+
+def test_large_text_endpoint_streams_spans_and_summary():
+    resp = client.post("/api/large-text/heuristics?merge=none", content=DOC.encode("utf-8"),
+                       headers={"Content-Type": "text/plain"})
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+
+    summary = lines[-1]["summary"]
+    assert [(s["start"], s["end"]) for s in lines[:-1]] == sorted((s["start"], s["end"]) for s in lines[:-1])
+    assert _by_offset(lines[:-1]) == _by_offset(extract_span_dicts(DOC))
+    assert summary["spans"] == len(lines) - 1
+    assert summary["chars"] == len(DOC)
+    assert summary["angle"]["framing_patterns"] == heuristic_analyze(DOC).framing_patterns
+
+
+def test_large_text_endpoint_rejects_oversized_body(monkeypatch):
+    monkeypatch.setattr(large_text, "LARGE_TEXT_MAX_BYTES", 10)
+    resp = client.post("/api/large-text/heuristics", content=b"x" * 11)
+    assert resp.status_code == 413
+
+
+def test_inline_endpoints_enforce_text_limit():
+    resp = client.post("/api/spans", json={"text": "a" * (MAX_INLINE_TEXT_CHARS + 1)})
+    assert resp.status_code == 422
@@ -0,0 +1,136 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.angle import heuristic_analyze
+from app.api.spans import extract_spans
+from app.services.lexicon_registry import (
+    DEFAULT_LEXICON_PATH,
+    LexiconRegistry,
+    compile_lexicons,
+    lexicon_registry,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def lexicon_file(tmp_path):
+    """Copy of the bundled lexicon file that tests can edit."""
+    data = json.loads(DEFAULT_LEXICON_PATH.read_text(encoding="utf-8"))
+    path = tmp_path / "lexicons.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path, data
+
+
+@pytest.fixture
+def restore_registry():
+    """Put the global registry back on the bundled file after a test."""
+    path = lexicon_registry.path
+    yield lexicon_registry
+    lexicon_registry.reload(path)
+
+
+def test_compile_rejects_missing_version():
+    with pytest.raises(ValueError):
+        compile_lexicons({"heuristics": []})
+
+
+def test_compile_rejects_bad_pattern():
+    with pytest.raises(ValueError):
+        compile_lexicons({"version": "x", "heuristics": [{"label": "Bad", "patterns": ["("], "confidence": 0.5}]})
+
+
+def test_reload_swaps_snapshot(lexicon_file):
+    path, data = lexicon_file
+    registry = LexiconRegistry(str(path))
+    old = registry.current
+    assert old.version == data["version"]
+
+    data["version"] = "test-2"
+    data["angle_lexicons"]["crisis"].append("meltdown")
+    path.write_text(json.dumps(data), encoding="utf-8")
+    new = registry.reload()
+
+    assert new.version == "test-2"
+    assert registry.current is new
+    # The old snapshot is untouched for requests still holding it
+    assert "meltdown" not in old.angle_lexicons["crisis"]
+    assert heuristic_analyze("A total meltdown.", new).framing_patterns == ["crisis"]
+    assert heuristic_analyze("A total meltdown.", old).framing_patterns == []
+
+
+def test_failed_reload_keeps_previous_snapshot(lexicon_file):
+    path, _ = lexicon_file
+    registry = LexiconRegistry(str(path))
+    old = registry.current
+
+    path.write_text("{not json", encoding="utf-8")
+    with pytest.raises(ValueError):
+        registry.reload()
+    assert registry.current is old
+
+
+def test_file_watch_picks_up_changes(lexicon_file):
+    path, data = lexicon_file
+    registry = LexiconRegistry(str(path), watch_seconds=0.001)
+    original = registry.current
+    assert original.version == data["version"]
+
+    data["version"] = "watched"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    registry._mtime = None  # mtime resolution can be coarse on some filesystems
+    registry._last_check = 0.0
+    assert registry.current is original  # reads never compile
+    registry.poll()
+    assert registry.current.version == "watched"
+
+
+def test_reload_is_broadcast_to_other_workers(lexicon_file):
+    path, data = lexicon_file
+    worker_a, worker_b = LexiconRegistry(str(DEFAULT_LEXICON_PATH)), LexiconRegistry(str(DEFAULT_LEXICON_PATH))
+    worker_b.poll()
+    bundled = worker_b.current.version
+
+    data["version"] = "broadcast"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    worker_a.reload(str(path), broadcast=True)
+    assert worker_b.current.version == bundled
+    worker_b.poll()
+    assert worker_b.current.version == "broadcast"
+
+    followed = worker_b.current
+    worker_b.poll()  # same generation: no recompile
+    assert worker_b.current is followed
+
+
+def test_version_stamped_in_results():
+    version = lexicon_registry.current.version
+    assert heuristic_analyze("This disaster is catastrophic.").lexicon_version == version
+
+    resp = client.post("/api/spans", json={"text": "It is always alarming."})
+    assert resp.status_code == 200
+    assert resp.json()["lexicon_version"] == version
+
+
+def test_reload_endpoint(lexicon_file, restore_registry):
+    path, data = lexicon_file
+    restore_registry.path = str(path)
+    data["version"] = "reloaded-via-api"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    resp = client.post("/api/lexicons/reload")
+    assert resp.status_code == 200
+    assert resp.json()["version"] == "reloaded-via-api"
+    assert client.get("/api/lexicons").json()["version"] == "reloaded-via-api"
+
+    path.write_text("[]", encoding="utf-8")
+    resp = client.post("/api/lexicons/reload")
+    assert resp.status_code == 400
+    assert client.get("/api/lexicons").json()["version"] == "reloaded-via-api"
+
+
+def test_bundled_lexicons_drive_spans():
+    labels = [s.label for s in extract_spans("She intentionally never does it.")]
+    assert "Intent Attribution" in labels
+    assert "Overgeneralization" in labels
@@ -0,0 +1,70 @@
+import asyncio
+import subprocess
+import sys
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from app.main import app
+from app.models.db import LazySupabase
+from app.services.lifecycle import ERROR, READY, UNCONFIGURED, Readiness, readiness, warm_up
+
+client = TestClient(app)
+
+
+def test_import_does_not_create_clients():
+    code = (
+        "import sys, app.main\n"
+        "from app.models.db import supabase\n"
+        "from app.api import angle, political_spectrum\n"
+        "assert 'google.generativeai' not in sys.modules\n"
+        "assert not supabase.initialized\n"
+        "assert political_spectrum.gemini is None\n"
+        "assert angle.gemini is None\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_lazy_supabase_creates_client_once(monkeypatch):
+    created = []
+    monkeypatch.setattr("app.models.db.get_supabase_client", lambda: created.append(1) or "client-stub")
+    proxy = LazySupabase()
+    assert not proxy.initialized
+    assert proxy
+    assert proxy.get() == "client-stub"
+    assert proxy.upper() == "CLIENT-STUB"  # attribute access reaches the client
+    assert created == [1]
+
+
+def test_lazy_supabase_unconfigured(monkeypatch):
+    monkeypatch.setattr("app.models.db.get_supabase_client", lambda: None)
+    proxy = LazySupabase()
+    assert not proxy
+    with pytest.raises(RuntimeError):
+        proxy.table("articles")
+
+
+def test_warm_up_records_component_status():
+    state = Readiness()
+
+    def broken():
+        raise ConnectionError("refused")
+
+    asyncio.run(warm_up(state, {"db": lambda: READY, "model": lambda: UNCONFIGURED}))
+    assert state.ready
+    assert state.components["model"]["status"] == UNCONFIGURED
+
+    state = Readiness()
+    asyncio.run(warm_up(state, {"db": broken}))
+    assert state.warmed and not state.ready
+    assert state.components["db"] == {"status": ERROR, "elapsed_ms": state.components["db"]["elapsed_ms"], "error": "refused"}
+
+
+def test_liveness_and_readiness_are_separate():
+    with patch.object(readiness, "warmed", False):
+        assert client.get("/api/health").status_code == 200
+        resp = client.get("/api/ready")
+        assert resp.status_code == 503
+        assert resp.json()["ready"] is False
+
+    with patch.object(readiness, "warmed", True), patch.object(readiness, "components", {"db": {"status": READY}}):
+        assert client.get("/api/ready").status_code == 200
@@ -0,0 +1,139 @@
+import random
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.main import app
+from app.api import live
+from app.api.angle import heuristic_analyze
+from app.api.spans import extract_span_dicts
+from app.services.live_document import DocumentTooLarge, LiveDocument, split_chunks
+from app.services.span_merge import merge_spans
+
+client = TestClient(app)
+
+SENTENCES = [
+    "Everyone knows this disaster is catastrophic.",
+    "The committee met on Tuesday to review the budget.",
+    "They deliberately ignored the crisis!",
+    "It is always the ordinary people who pay.",
+    "Rainfall was close to the seasonal average.",
+]
+DOC = " ".join(SENTENCES * 10)
+
+
+def _without_ids(spans):
+    return [{k: v for k, v in s.items() if k != "id"} for s in spans]
+
+
+def test_split_chunks_concatenates_back():
+    for text in ("", "One. Two!  Three? four", DOC):
+        assert "".join(split_chunks(text)) == text
+
+
+def test_random_edits_match_full_analysis():
+    rng = random.Random(11)
+    doc = LiveDocument(DOC)
+    text = DOC
+    for _ in range(60):
+        start = rng.randrange(0, len(text) + 1)
+        end = min(len(text), start + rng.randrange(0, 30))
+        insert = rng.choice(["", "never ", ". ", "alarming", "x", " shocking crisis. ", "!"])
+        doc.apply_delta(start, end, insert)
+        text = text[:start] + insert + text[end:]
+        if rng.random() < 0.3:
+            doc.analyse()
+
+    doc.analyse()
+    assert doc.text == text and doc.length == len(text)
+    assert _without_ids(doc.spans()) == merge_spans(extract_span_dicts(text))
+    assert doc.angle() == heuristic_analyze(text).model_dump()
+
+
+def test_edit_reanalyses_only_the_touched_sentence_window():
+    doc = LiveDocument(DOC)
+    _, analysed = doc.analyse()
+    assert analysed == len(doc.chunks)
+
+    position = DOC.index("Tuesday", len(DOC) // 2)
+    doc.apply_delta(position, position, "an alarming ")
+    diff, analysed = doc.analyse()
+
+    assert analysed <= 3
+    assert diff["removed"] == []
+    assert [s["label"] for s in diff["added"]] == ["Loaded Language"]
+    assert diff["added"][0]["start"] == position + len("an ")
+
+
+def test_memory_cap():
+    doc = LiveDocument("short", max_chars=20)
+    with pytest.raises(DocumentTooLarge):
+        doc.apply_delta(5, 5, "x" * 30)
+    with pytest.raises(ValueError):
+        doc.apply_delta(3, 99, "")
+
+
+def test_websocket_session_sends_span_and_angle_diffs():
+    with client.websocket_connect("/api/live") as ws:
+        assert ws.receive_json()["type"] == "ready"
+
+        ws.send_json({"type": "init", "text": "The budget passed. "})
+        ws.send_json({"type": "flush"})
+        first = ws.receive_json()
+        assert first["type"] == "diff"
+        assert first["spans"]["added"] == []
+        assert "angle_summary" in first["angle"]
+
+        ws.send_json({"type": "delta", "start": 19, "end": 19, "text": "They deliberately ignored it."})
+        ws.send_json({"type": "flush"})
+        second = ws.receive_json()
+        assert second["version"] == 2
+        assert [s["span_text"] for s in second["spans"]["added"]] == ["deliberately"]
+        assert second["sentences_analysed"] <= 2
+
+        ws.send_json({"type": "delta", "bogus": True})
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"type": "snapshot"})
+        snapshot = ws.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert [s["id"] for s in snapshot["spans"]] == [s["id"] for s in second["spans"]["added"]]
+
+
+def test_websocket_debounces_edits(monkeypatch):
+    monkeypatch.setattr(live, "LIVE_DEBOUNCE_MS", 20.0)
+    with client.websocket_connect("/api/live?merge=none") as ws:
+        ws.receive_json()
+        for i, word in enumerate("It is always alarming"):
+            ws.send_json({"type": "delta", "start": i, "end": i, "text": word})
+        diff = ws.receive_json()
+
+    assert diff["type"] == "diff"
+    assert diff["version"] == len("It is always alarming")
+    assert {s["span_text"] for s in diff["spans"]["added"]} == {"always", "alarming"}
+
+
+def test_websocket_closes_when_document_exceeds_cap(monkeypatch):
+    monkeypatch.setattr(live, "LiveDocument", lambda merge=None: LiveDocument(max_chars=10, merge=merge))
+    with client.websocket_connect("/api/live") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "init", "text": "x" * 11})
+        assert ws.receive_json()["type"] == "error"
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+    assert exc.value.code == live.CLOSE_TOO_LARGE
+
+
+def test_websocket_rejects_binary_frames():
+    with client.websocket_connect("/api/live") as ws:
+        ws.receive_json()
+        ws.send_bytes(b"\x00\x01")
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+    assert exc.value.code == live.CLOSE_UNSUPPORTED
+
+    # A fresh session still works afterwards
+    with client.websocket_connect("/api/live") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "init", "text": SENTENCES[0]})
+        ws.send_json({"type": "flush"})
+        assert ws.receive_json()["type"] == "diff"
@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.services.gemini_adapter import GeminiAdapter
+from app.services.model_router import ModelRouter, parse_routes
+from app.services.resilience import CircuitBreaker, ResilientCaller
+
+ROUTES = {
+    "default": {"models": ["big"]},
+    "spectrum": {"models": [{"model": "light", "max_chars": 100}, "big"], "slo_ms": 500},
+    "rewrite": {"models": ["big", "light"], "slo_ms": 5000},
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeModels:
+    """Scripted models: per-model latency in seconds (advancing the fake clock) or an error."""
+
+    def __init__(self, clock, latency=None, errors=()):
+        self.clock = clock
+        self.latency = dict(latency or {})
+        self.errors = set(errors)
+        self.calls = []
+
+    async def attempt(self, model):
+        self.calls.append(model)
+        self.clock.now += self.latency.get(model, 0.1)
+        if model in self.errors:
+            return {"mock": False, "error": f"{model} unavailable"}
+        return {"mock": False, "raw_response": model}
+
+
+def _router(clock, **kwargs):
+    return ModelRouter(parse_routes(ROUTES), default_model="big", clock=clock, min_samples=3, demote_seconds=60, **kwargs)
+
+
+def test_routes_by_task_and_prompt_size():
+    router = _router(FakeClock())
+    assert router.candidates("spectrum", 80) == ["light", "big"]
+    assert router.candidates("spectrum", 5000) == ["big"]
+    assert router.candidates("rewrite", 80) == ["big", "light"]
+    assert router.candidates("unknown-task", 80) == ["big"]
+    assert router.candidates(None, 80) == ["big"]
+
+    with pytest.raises(ValueError):
+        parse_routes({"spectrum": {"models": []}})
+
+
+def test_slow_model_is_demoted_then_retried():
+    clock = FakeClock()
+    router = _router(clock)
+    models = FakeModels(clock, latency={"light": 0.9, "big": 0.2})
+
+    for _ in range(3):
+        result, model = asyncio.run(router.call("spectrum", "short", models.attempt))
+        assert model == "light"
+    # p95 of 900ms breaks the 500ms SLO: the big model now goes first for spectrum only
+    assert router.candidates("spectrum", 5) == ["big", "light"]
+    assert router.candidates("rewrite", 5) == ["big", "light"]
+    result, model = asyncio.run(router.call("spectrum", "short", models.attempt))
+    assert (result["raw_response"], model) == ("big", "big")
+
+    clock.now += 61
+    assert router.candidates("spectrum", 5) == ["light", "big"]
+    snapshot = router.snapshot()["spectrum"]["models"][0]
+    assert snapshot["demotions"] == 1 and snapshot["p95_latency_ms"] is None  # judged afresh
+
+
+def test_failed_model_falls_back_within_the_request():
+    clock = FakeClock()
+    router = _router(clock)
+    models = FakeModels(clock, errors={"big"})
+
+    result, model = asyncio.run(router.call("rewrite", "text", models.attempt))
+    assert (model, models.calls) == ("light", ["big", "light"])
+
+    models.errors.add("light")
+    result, model = asyncio.run(router.call("rewrite", "text", models.attempt))
+    assert "error" in result
+
+
+def test_open_breaker_demotes_model_for_every_task():
+    clock = FakeClock()
+    router = _router(clock, caller_factory=lambda model: ResilientCaller(breaker=CircuitBreaker(failure_threshold=1)))
+    router.caller("light").breaker.record_failure()
+    assert router.candidates("spectrum", 5) == ["big", "light"]
+
+
+def test_adapter_uses_routed_model(monkeypatch):
+    from app.services import gemini_adapter
+
+    monkeypatch.setattr(gemini_adapter, "model_router", _router(FakeClock()))
+    adapter = GeminiAdapter.__new__(GeminiAdapter)
+    adapter._generate_once = AsyncMock(side_effect=lambda prompt, model: {"mock": False, "raw_response": model})
+
+    assert asyncio.run(adapter.generate("classify this", task="spectrum"))["raw_response"] == "light"
+    assert asyncio.run(adapter.generate("x" * 500, task="spectrum"))["raw_response"] == "big"
+    assert asyncio.run(adapter.generate("classify this", task="spectrum"))["cached"] is True
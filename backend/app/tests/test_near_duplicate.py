@@ -0,0 +1,152 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from app.main import app
+from app.services.near_duplicate import NearDuplicateIndex, minhash_signature
+
+client = TestClient(app)
+
+WIRE_STORY = (
+    "The city council voted on Tuesday to approve a new budget that increases funding for public "
+    "transport, road repairs and school maintenance, while cutting administrative costs across several "
+    "departments. Officials said the plan would take effect next spring after a final review by the mayor."
+)
+REPUBLISHED = WIRE_STORY.replace("on Tuesday", "late on Tuesday") + " Reporting by staff."
+UNRELATED = "Scientists observed a rare comet passing close to the sun, and amateur astronomers shared photos online."
+
+SPECTRUM = {"left_right_score": -0.1, "populist_score": 0.2, "cluster": "centrist"}
+
+
+def test_signature_is_deterministic():
+    assert (minhash_signature(WIRE_STORY) == minhash_signature(WIRE_STORY)).all()
+
+
+def test_query_finds_edited_copy_only():
+    index = NearDuplicateIndex(threshold=0.6)
+    index.add("a1", WIRE_STORY, {"analysis_id": "x1"})
+
+    match = index.query(REPUBLISHED)
+    assert match is not None
+    assert match.key == "a1"
+    assert match.payload == {"analysis_id": "x1"}
+    assert index.query(UNRELATED) is None
+
+
+def test_index_is_bounded():
+    index = NearDuplicateIndex(threshold=0.6, max_entries=2)
+    index.add("a1", WIRE_STORY, {})
+    index.add("a2", UNRELATED, {})
+    index.add("a3", "Completely different text about football transfers and league tables this season.", {})
+
+    assert len(index) == 2
+    assert index.query(WIRE_STORY) is None
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "index.npz")
+    index = NearDuplicateIndex(threshold=0.6, path=path)
+    index.add("a1", WIRE_STORY, {"analysis_id": "x1"})
+    index.save()
+
+    restored = NearDuplicateIndex(threshold=0.6, path=path)
+    assert restored.load() == 1
+    assert restored.query(REPUBLISHED).payload == {"analysis_id": "x1"}
+
+
+def test_workers_saving_the_same_file_merge(tmp_path):
+    path = str(tmp_path / "index.npz")
+    worker_a = NearDuplicateIndex(threshold=0.6, path=path)
+    worker_b = NearDuplicateIndex(threshold=0.6, path=path)
+    worker_a.add("a1", WIRE_STORY, {"analysis_id": "x1"})
+    worker_a.add("a2", "Completely different text about football transfers and league tables this season.", {})
+    worker_a.save()
+    worker_b.add("b1", "Rainfall was close to the seasonal average across the region this month.", {})
+    worker_b.save()
+
+    restored = NearDuplicateIndex(threshold=0.6, path=path)
+    assert restored.load() == 3
+
+    # A key discarded by one worker is not resurrected from disk
+    worker_a.discard("a2")
+    worker_a.save()
+    restored = NearDuplicateIndex(threshold=0.6, path=path)
+    assert restored.load() == 2
+    assert restored.query(REPUBLISHED).payload == {"analysis_id": "x1"}
+
+
+def test_index_loads_lazily_and_never_saves_an_unloaded_view(tmp_path):
+    path = tmp_path / "index.npz"
+    index = NearDuplicateIndex(threshold=0.6, path=str(path))
+    index.add("a1", WIRE_STORY, {"analysis_id": "x1"})
+    index.save()
+
+    restored = NearDuplicateIndex(threshold=0.6, path=str(path))  # no warm-up load
+    restored.add("b1", UNRELATED, {"analysis_id": "y1"})
+    assert restored.query(REPUBLISHED).payload == {"analysis_id": "x1"}
+    assert len(restored) == 2
+
+    path.write_bytes(b"not an npz")
+    broken = NearDuplicateIndex(threshold=0.6, path=str(path))
+    broken.add("c1", WIRE_STORY, {})
+    broken.flush()
+    assert path.read_bytes() == b"not an npz"
+
+
+@pytest.fixture
+def mock_supabase():
+    tables = {}
+
+    def table(name):
+        if name not in tables:
+            tables[name] = MagicMock()
+            tables[name].insert.return_value.execute.return_value = Mock(data=[{"id": f"{name}-id", "content": REPUBLISHED}])
+        return tables[name]
+
+    tables["analyses"] = MagicMock()
+    tables["analyses"].insert.return_value.execute.return_value = Mock(data=[{"id": "analysis-2"}])
+    tables["analyses"].select.return_value.eq.return_value.execute.return_value = Mock(data=[{
+        "spectrum": json.dumps(SPECTRUM),
+        "gemini_reflection": json.dumps({"first": {"raw_response": "earlier reflection"}}),
+    }])
+    with patch("app.api.analyze.supabase") as mock_supabase:
+        mock_supabase.table.side_effect = table
+        yield tables
+
+
+def test_analyze_reuses_near_duplicate(mock_supabase):
+    index = NearDuplicateIndex(threshold=0.6)
+    index.add("article-1", WIRE_STORY, {"article_id": "article-1", "analysis_id": "analysis-1"})
+
+    with patch("app.api.analyze.near_duplicate_index", index), \
+         patch("app.api.analyze._run_pipeline", new_callable=AsyncMock) as pipeline, \
+         patch("app.api.analyze.get_gemini_adapter") as get_adapter:
+        resp = client.post("/api/analyze", json={"text": REPUBLISHED, "source": "Wire"})
+
+    assert resp.status_code == 200
+    data = resp.json()
+    pipeline.assert_not_called()
+    get_adapter.assert_not_called()
+    assert data["near_duplicate_of"]["analysis_id"] == "analysis-1"
+    assert data["spectrum"] == SPECTRUM
+    assert data["reflection"]["first"] == {"raw_response": "earlier reflection"}
+    assert data["angle"]["lexicon_version"]
+    # The republished copy is indexed too
+    assert index.query(REPUBLISHED).key == "articles-id"
+
+
+def test_analyze_can_opt_out_of_reuse(mock_supabase):
+    index = NearDuplicateIndex(threshold=0.6)
+    index.add("article-1", WIRE_STORY, {"article_id": "article-1", "analysis_id": "analysis-1"})
+    adapter = Mock(generate=AsyncMock(return_value={"raw_response": "fresh"}))
+
+    with patch("app.api.analyze.near_duplicate_index", index), \
+         patch("app.api.analyze._run_pipeline", new_callable=AsyncMock) as pipeline, \
+         patch("app.api.analyze.get_gemini_adapter", return_value=adapter):
+        pipeline.return_value = ({"spans": []}, {"framing_patterns": []}, SPECTRUM)
+        resp = client.post("/api/analyze", json={"text": REPUBLISHED, "reuse_near_duplicates": False})
+
+    assert resp.status_code == 200
+    pipeline.assert_awaited_once()
+    assert resp.json()["near_duplicate_of"] is None
+    assert resp.json()["reflection"]["first"] == {"raw_response": "fresh"}
@@ -0,0 +1,82 @@
+import json
+import pstats
+import threading
+from fastapi.testclient import TestClient
+from app.api import profiles
+from app.main import app
+from app.services import profiling
+from app.services.profiling import RequestProfiler
+
+BODY = {"text": "Everyone knows this disaster is catastrophic. " * 50}
+HEADERS = {"X-Profile-Token": "secret"}
+
+
+def _client(tmp_path, **kwargs):
+    profiler = RequestProfiler(directory=str(tmp_path), token="secret", **kwargs)
+    return profiler, TestClient(profiler.middleware(app))
+
+
+def test_header_opts_a_request_into_profiling(tmp_path):
+    profiler, client = _client(tmp_path)
+    raw = json.dumps(BODY).encode()
+
+    assert client.post("/api/spans", content=raw, headers={"Content-Type": "application/json"}).status_code == 200
+    assert client.post("/api/spans", json=BODY, headers={"X-Profile-Token": "wrong"}).status_code == 200
+    assert client.get("/api/health", headers=HEADERS).status_code == 200  # not a profiled route
+    assert profiler.recent() == []
+
+    resp = client.post("/api/spans", content=raw, headers={**HEADERS, "Content-Type": "application/json"})
+    assert resp.status_code == 200
+    [meta] = profiler.recent()
+    assert (meta["route"], meta["method"], meta["status"], meta["reason"]) == ("/api/spans", "POST", 200, "header")
+    assert meta["input_bytes"] == len(raw)
+    assert meta["top_functions"] and meta["duration_ms"] > 0
+    stats = pstats.Stats(profiler.path_of(meta["name"]))
+    assert any(func == "extract_span_dicts" for _, _, func in stats.stats)
+
+
+def test_sampled_requests_and_pruning(tmp_path):
+    profiler, client = _client(tmp_path, sample_rate=1.0, max_files=2)
+    for _ in range(3):
+        client.post("/api/angle", json=BODY)
+
+    recent = profiler.recent()
+    assert len(recent) == 2 and all(p["reason"] == "sampled" for p in recent)
+    assert len(list(tmp_path.iterdir())) == 4  # .prof + .json each
+    assert profiler.path_of("../etc/passwd") is None
+
+
+def test_debug_endpoint_lists_profiles(tmp_path, monkeypatch):
+    profiler, client = _client(tmp_path)
+    monkeypatch.setattr(profiles, "profiler", profiler)
+
+    assert client.get("/api/debug/profiles", headers=HEADERS).status_code == 404  # profiling disabled
+
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    client.post("/api/angle", json=BODY, headers=HEADERS)
+    assert client.get("/api/debug/profiles").status_code == 403
+
+    listing = client.get("/api/debug/profiles", headers=HEADERS).json()
+    [meta] = listing["profiles"]
+    assert meta["route"] == "/api/angle"
+    download = client.get(f"/api/debug/profiles/{meta['name']}", headers=HEADERS)
+    assert download.status_code == 200 and download.content
+
+    monkeypatch.setattr(profiler, "token", "")
+    assert client.get("/api/debug/profiles").status_code == 404  # enabled but no token: never open
+
+
+def test_profiles_are_saved_off_the_event_loop(tmp_path, monkeypatch):
+    profiler = RequestProfiler(directory=str(tmp_path), token="secret")
+    loop_threads, save_threads = [], []
+
+    async def recording_app(scope, receive, send):
+        loop_threads.append(threading.current_thread())
+        await app(scope, receive, send)
+
+    save = profiler._save
+    monkeypatch.setattr(profiler, "_save", lambda *args: save_threads.append(threading.current_thread()) or save(*args))
+    TestClient(profiler.middleware(recording_app)).post("/api/angle", json=BODY, headers=HEADERS)
+
+    assert len(save_threads) == 1 and save_threads[0] is not loop_threads[-1]
+    assert len(profiler.recent()) == 1
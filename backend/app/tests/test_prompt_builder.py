@@ -0,0 +1,81 @@
+import json
+from app.api.angle import heuristic_analyze
+from app.api.spans import extract_spans
+from app.services.prompt_builder import build_reflection_prompt, compact_spans, truncate_middle
+
+ARTICLE = (
+    "Everyone knows this disaster is catastrophic. Experts say we must act now, before it's too late. "
+    "They deliberately ignored the crisis, and it is always the ordinary people who pay. "
+) * 20
+SPECTRUM = {"left_right_score": -0.2, "populist_score": 0.6, "cluster": "populist-left", "mock": False}
+
+
+def _payloads(text):
+    spans_json = {"spans": [s.model_dump() for s in extract_spans(text)], "lexicon_version": "v"}
+    return spans_json, heuristic_analyze(text).model_dump()
+
+
+def test_compact_spans_uses_label_dictionary():
+    spans_json = {"spans": [
+        {"label": "B", "start": 10, "end": 12, "confidence": 0.5},
+        {"label": "A", "start": 0, "end": 4, "confidence": 0.9},
+        {"label": "B", "start": 20, "end": 25, "confidence": 0.7},
+    ]}
+    compact, kept = compact_spans(spans_json)
+    assert kept == 3
+    assert compact == {"labels": ["A", "B"], "spans": [[0, 0, 4], [1, 10, 12], [1, 20, 25]]}
+
+    capped, kept = compact_spans(spans_json, limit=2)
+    assert kept == 2
+    assert capped["spans"] == [[0, 0, 4], [1, 20, 25]]
+
+
+def test_truncate_middle_keeps_head_and_tail():
+    text = "a" * 700 + "b" * 1000 + "c" * 300
+    out = truncate_middle(text, 1000)
+    assert len(out) <= 1000
+    assert out.startswith("a" * 600)
+    assert out.endswith("c" * 250)
+    assert "omitted" in out
+    assert truncate_middle("short", 100) == "short"
+
+
+def test_prompt_is_smaller_than_legacy_layout():
+    spans_json, angle_json = _payloads(ARTICLE)
+    prompt, stats = build_reflection_prompt(ARTICLE, spans_json, angle_json, SPECTRUM, token_budget=100_000, legacy_stats=True)
+
+    assert stats["compact_chars"] < stats["original_chars"]
+    # The cheap estimate stays close to the exact legacy size
+    assert abs(stats["original_chars_est"] - stats["original_chars"]) < 0.25 * stats["original_chars"]
+    assert not stats["text_truncated"]
+    assert stats["spans_kept"] == stats["spans_total"] == len(spans_json["spans"])
+    # Evidence sentences and per-span text are not repeated
+    assert angle_json["evidence_spans"][0] not in prompt.split("TEXT:")[1].split("LABELS:")[1]
+    assert "mock" not in prompt
+
+
+def test_prompt_respects_token_budget():
+    spans_json, angle_json = _payloads(ARTICLE * 5)
+    prompt, stats = build_reflection_prompt(ARTICLE * 5, spans_json, angle_json, SPECTRUM, token_budget=1000)
+
+    assert stats["compact_tokens_est"] <= 1000
+    assert stats["text_truncated"]
+    assert stats["spans_kept"] < stats["spans_total"]
+    assert '"cluster":"populist-left"' in prompt
+    assert "original_chars" not in stats  # legacy layout only rebuilt when asked
+    assert stats["original_chars_est"] > stats["compact_chars"]
+
+
+def test_span_offsets_point_into_truncated_text():
+    text = ARTICLE * 5
+    spans_json, angle_json = _payloads(text)
+    prompt, stats = build_reflection_prompt(text, spans_json, angle_json, SPECTRUM, token_budget=1000)
+    assert stats["text_truncated"]
+
+    body = prompt.split("TEXT:\n", 1)[1].split("\n\nLABELS:", 1)[0]
+    labels = json.loads(prompt.split("LABELS:", 1)[1].split("\n", 1)[0])
+    rows = json.loads(prompt.split("SPANS:", 1)[1].split("\n", 1)[0])
+    originals = {(s["label"], text[s["start"]:s["end"]]) for s in spans_json["spans"]}
+    assert rows and any(start > len(body) // 2 for _, start, _ in rows)  # tail spans kept too
+    for label_id, start, end in rows:
+        assert (labels[label_id], body[start:end]) in originals
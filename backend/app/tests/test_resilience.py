@@ -0,0 +1,196 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientAdapter,
+    ResilientCaller,
+    is_transient,
+)
+
+client = TestClient(app)
+
+
+class FaultyAdapter:
+    """Fake adapter that injects a scripted sequence of faults."""
+
+    def __init__(self, script):
+        # Each entry: "ok", an error string, or ("slow", seconds)
+        self.script = list(script)
+        self.calls = 0
+
+    async def generate(self, prompt):
+        step = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        if isinstance(step, tuple):
+            await asyncio.sleep(step[1])
+            return {"raw_response": f"slow:{prompt}"}
+        if step == "ok":
+            return {"raw_response": f"ok:{prompt}"}
+        return {"error": step}
+
+
+async def _no_sleep(_):
+    return None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _adapter(script, **kwargs):
+    kwargs.setdefault("sleep", _no_sleep)
+    return ResilientAdapter(FaultyAdapter(script), ResilientCaller(**kwargs))
+
+
+def test_is_transient():
+    assert is_transient(Exception("503 Service Unavailable"))
+    assert is_transient(asyncio.TimeoutError())
+    assert not is_transient(Exception("400 Invalid argument"))
+
+
+def test_retries_transient_errors_then_succeeds():
+    adapter = _adapter(["503 unavailable", "429 resource exhausted", "ok"], max_attempts=3)
+    result = asyncio.run(adapter.generate("p"))
+    assert result == {"raw_response": "ok:p"}
+    assert adapter.inner.calls == 3
+    assert adapter.caller.stats["retries"] == 2
+
+
+def test_does_not_retry_permanent_errors():
+    adapter = _adapter(["400 invalid argument", "ok"], max_attempts=3)
+    result = asyncio.run(adapter.generate("p"))
+    assert "400" in result["error"]
+    assert adapter.inner.calls == 1
+
+
+def test_backoff_is_capped_and_exponential():
+    delays = []
+
+    async def record(seconds):
+        delays.append(seconds)
+
+    adapter = _adapter(["503"] * 5, max_attempts=5, base_delay=1.0, max_delay=3.0, sleep=record,
+                       breaker=CircuitBreaker(failure_threshold=100))
+    asyncio.run(adapter.generate("p"))
+    assert len(delays) == 4
+    assert 0.5 <= delays[0] <= 1.0
+    assert 1.0 <= delays[1] <= 2.0
+    assert all(d <= 3.0 for d in delays)
+
+
+def test_breaker_opens_and_fails_fast_then_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=clock)
+    adapter = _adapter(["503", "503", "ok"], max_attempts=1, breaker=breaker)
+
+    asyncio.run(adapter.generate("a"))
+    asyncio.run(adapter.generate("b"))
+    assert breaker.state == "open"
+
+    result = asyncio.run(adapter.generate("c"))
+    assert result["circuit_open"] is True
+    assert adapter.inner.calls == 2  # no backend call while open
+
+    clock.now = 11
+    assert breaker.state == "half-open"
+    assert asyncio.run(adapter.generate("d")) == {"raw_response": "ok:d"}
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+    caller = ResilientCaller(max_attempts=1, breaker=breaker, sleep=_no_sleep)
+    adapter = ResilientAdapter(FaultyAdapter(["503"]), caller)
+
+    asyncio.run(adapter.generate("a"))
+    clock.now = 11
+    asyncio.run(adapter.generate("probe"))
+    assert breaker.state == "open"
+
+
+def test_cancelled_probe_does_not_wedge_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+    caller = ResilientCaller(max_attempts=1, breaker=breaker, sleep=_no_sleep)
+    breaker.record_failure()
+    clock.now = 11  # half-open: the next call is the probe
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def cancel_probe():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(caller.call(hang), timeout=0.01)
+
+    asyncio.run(cancel_probe())
+    assert breaker.state == "open"  # the abandoned probe counts as a failure
+
+    clock.now = 22
+    assert breaker.state == "half-open"
+    assert breaker.allow()  # a new probe is let through
+
+
+def test_hedged_request_beats_slow_primary():
+    caller = ResilientCaller(hedge=True, hedge_min_samples=1, hedge_min_delay=0.01, attempt_timeout=None, sleep=_no_sleep)
+    caller.latency.record(0.01)
+    adapter = ResilientAdapter(FaultyAdapter([("slow", 1.0), "ok"]), caller)
+
+    async def run():
+        started = asyncio.get_running_loop().time()
+        result = await adapter.generate("p")
+        return result, asyncio.get_running_loop().time() - started
+
+    result, elapsed = asyncio.run(run())
+    assert result == {"raw_response": "ok:p"}
+    assert elapsed < 0.5
+    assert caller.stats["hedges"] == 1
+
+
+def test_cancelled_caller_cancels_primary_during_hedge_wait():
+    caller = ResilientCaller(hedge=True, hedge_min_samples=1, hedge_min_delay=0.5, attempt_timeout=None, sleep=_no_sleep)
+    caller.latency.record(0.5)
+    started = []
+
+    async def hang():
+        started.append(asyncio.current_task())
+        await asyncio.sleep(10)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(caller.call(hang), timeout=0.01)
+        await asyncio.sleep(0)
+        return started[0].cancelled()
+
+    assert asyncio.run(run())  # checked before asyncio.run reaps leftover tasks
+    assert caller.stats["hedges"] == 0
+
+
+def test_attempt_timeout_counts_as_transient():
+    adapter = _adapter([("slow", 1.0), "ok"], max_attempts=2, attempt_timeout=0.05)
+    assert asyncio.run(adapter.generate("p")) == {"raw_response": "ok:p"}
+
+
+def test_circuit_open_error_raised_by_caller():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    caller = ResilientCaller(breaker=breaker)
+
+    async def never_called():
+        raise AssertionError("backend should not be called")
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(caller.call(never_called))
+
+
+def test_gemini_health_endpoint():
+    resp = client.get("/api/gemini/health")
+    assert resp.status_code == 200
+    assert resp.json()["breaker"]["state"] in ("closed", "open", "half-open")
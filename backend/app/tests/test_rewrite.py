@@ -0,0 +1,113 @@
+import asyncio
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from app.main import app
+from app.services.paragraph_memo import normalize_paragraph, rewrite_paragraphs, split_paragraphs
+
+client = TestClient(app)
+
+DRAFT = "Everyone knows this disaster is catastrophic.\n\nThe committee met on Tuesday.\r\n\r\n  They ignored the crisis!\n"
+
+
+class RecordingAdapter:
+    def __init__(self, fail_on=(), model=None):
+        self.prompts = []
+        self.fail_on = fail_on
+        self.model = model
+
+    async def generate(self, prompt, task=None):
+        self.prompts.append(prompt)
+        paragraph = prompt.rsplit("\n\n", 1)[-1]
+        if any(marker in paragraph for marker in self.fail_on):
+            return {"mock": False, "error": "quota"}
+        return {"mock": False, "raw_response": f" NEUTRAL[{paragraph.strip()}]\n", "model": self.model}
+
+
+def test_split_paragraphs_round_trips():
+    parts = split_paragraphs(DRAFT)
+    assert [p for _, p, _ in parts] == [
+        "Everyone knows this disaster is catastrophic.",
+        "The committee met on Tuesday.",
+        "They ignored the crisis!",
+    ]
+    assert "".join("".join(part) for part in parts) == DRAFT
+    assert split_paragraphs("  ") == [("  ", "", "")]
+    assert normalize_paragraph("  a \n b\t") == "a b"
+
+
+def test_only_new_or_changed_paragraphs_are_rewritten():
+    calls = []
+
+    async def rewrite(paragraph):
+        calls.append(paragraph)
+        return paragraph.upper(), "big"
+
+    first = asyncio.run(rewrite_paragraphs("one\n\ntwo\n\none", rewrite, "v1", ["big"]))
+    assert first.text == "ONE\n\nTWO\n\nONE"
+    assert (first.paragraphs, first.cached_paragraphs, first.rewritten_paragraphs) == (3, 0, 2)
+
+    calls.clear()
+    edited = asyncio.run(rewrite_paragraphs("one\n\n  two  \n\nthree", rewrite, "v1", ["big"]))
+    assert calls == ["three"]
+    assert edited.text == "ONE\n\n  TWO  \n\nTHREE"  # layout of the new draft is kept
+    assert edited.cached_paragraphs == 2
+
+    calls.clear()
+    asyncio.run(rewrite_paragraphs("one", rewrite, "v2", ["big"]))  # new prompt version
+    assert calls == ["one"]
+
+
+def test_rewrites_are_cached_under_the_model_that_wrote_them():
+    async def fallback(paragraph):
+        return paragraph.lower(), "light"
+
+    async def primary(paragraph):
+        return paragraph.upper(), "big"
+
+    asyncio.run(rewrite_paragraphs("One", fallback, "v1", ["big", "light"]))
+    # A fallback rewrite is reused while it is all there is, but the primary model's wins once cached
+    assert asyncio.run(rewrite_paragraphs("One", primary, "v1", ["big", "light"])).text == "one"
+    asyncio.run(rewrite_paragraphs("One", primary, "v1", ["big"]))
+    assert asyncio.run(rewrite_paragraphs("One", fallback, "v1", ["big", "light"])).text == "ONE"
+
+
+def test_failed_rewrites_keep_the_original_and_are_not_memoized():
+    attempts = []
+
+    async def rewrite(paragraph):
+        attempts.append(paragraph)
+        return None, None
+
+    memo = asyncio.run(rewrite_paragraphs("one\n\none", rewrite, "v1", ["big"]))
+    assert (memo.text, memo.failed_paragraphs, memo.rewritten_paragraphs) == ("one\n\none", 2, 0)
+    asyncio.run(rewrite_paragraphs("one", rewrite, "v1", ["big"]))
+    assert attempts == ["one", "one"]
+
+
+def test_unbias_endpoint_reports_cached_paragraphs():
+    adapter = RecordingAdapter()
+    with patch("app.api.rewrite.get_gemini_adapter", return_value=adapter):
+        first = client.post("/api/unbias", json={"text": DRAFT}).json()
+        second = client.post("/api/unbias", json={"text": DRAFT.replace("Tuesday", "Monday")}).json()
+
+    assert first["unbiased_text"] == (
+        "NEUTRAL[Everyone knows this disaster is catastrophic.]\n\n"
+        "NEUTRAL[The committee met on Tuesday.]\r\n\r\n  NEUTRAL[They ignored the crisis!]\n"
+    )
+    assert (first["paragraphs"], first["cached_paragraphs"]) == (3, 0)
+    assert (second["paragraphs"], second["cached_paragraphs"]) == (3, 2)
+    assert "NEUTRAL[The committee met on Monday.]" in second["unbiased_text"]
+    assert len(adapter.prompts) == 4
+    assert first["failed_paragraphs"] == 0
+
+
+def test_unbias_endpoint_reports_failed_paragraphs():
+    adapter = RecordingAdapter(fail_on=("committee",))
+    with patch("app.api.rewrite.get_gemini_adapter", return_value=adapter):
+        resp = client.post("/api/unbias", json={"text": DRAFT})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["failed_paragraphs"] == 1
+    assert "The committee met on Tuesday.\r\n" in body["unbiased_text"]
+    assert "error" not in body["unbiased_text"]
@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from uuid import uuid4
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def mock_supabase():
+    with patch("app.api.search.supabase") as mock_supabase:
+        yield mock_supabase
+
+
+def test_search_passes_filters_and_pagination(mock_supabase):
+    row = {
+        "id": str(uuid4()),
+        "title": "Crisis in the city",
+        "author": "Daily",
+        "created_at": "2025-11-10T08:00:00+00:00",
+        "rank": 0.42,
+        "snippet": "the <b>crisis</b> deepens",
+        "total_count": 37,
+    }
+    mock_supabase.rpc.return_value.execute.return_value = Mock(data=[row])
+
+    resp = client.get("/api/search?q=crisis&label=Loaded%20Language&pattern=crisis&pattern=blame&page=3&page_size=10")
+    assert resp.status_code == 200
+
+    mock_supabase.rpc.assert_called_once_with("search_articles", {
+        "search_query": "crisis",
+        "span_labels": ["Loaded Language"],
+        "angle_patterns": ["crisis", "blame"],
+        "page_size": 10,
+        "page_offset": 20,
+    })
+    data = resp.json()
+    assert data["total"] == 37
+    assert data["results"][0]["title"] == "Crisis in the city"
+    assert "total_count" not in data["results"][0]
+
+
+def test_search_empty_result(mock_supabase):
+    mock_supabase.rpc.return_value.execute.return_value = Mock(data=[])
+    resp = client.get("/api/search?label=Stereotyping")
+    assert resp.status_code == 200
+    assert resp.json()["total"] == 0
+    assert resp.json()["results"] == []
+
+
+def test_search_requires_some_criteria(mock_supabase):
+    assert client.get("/api/search").status_code == 400
+    assert client.get("/api/search?q=%20").status_code == 400
+
+
+@patch("app.api.search.supabase", None)
+def test_search_no_database():
+    assert client.get("/api/search?q=crisis").status_code == 503
@@ -0,0 +1,48 @@
+import json
+from uuid import UUID
+import numpy as np
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from app.main import app
+from app.api.spans import Span, extract_span_dicts, extract_spans
+from app.services.serialization import FastJSONResponse, dumps, json_column
+from app.services.span_merge import merge_spans
+
+client = TestClient(app)
+
+TEXT = "Everyone knows this disaster is catastrophic. They deliberately ignored the crisis."
+
+
+def test_dumps_handles_models_uuids_and_numpy():
+    span = Span(label="A", span_text="x", start=0, end=1, confidence=0.5)
+    payload = {"id": UUID(int=1), "score": np.float32(0.5), "ids": np.arange(3), "span": span, 1: "int key"}
+    assert json.loads(dumps(payload)) == {
+        "id": "00000000-0000-0000-0000-000000000001",
+        "score": 0.5,
+        "ids": [0, 1, 2],
+        "span": span.model_dump(),
+        "1": "int key",
+    }
+
+
+def test_json_column_decodes_legacy_string_rows():
+    assert json_column('{"left_right_score": 0.2}') == {"left_right_score": 0.2}
+    assert json_column({"left_right_score": 0.2}) == {"left_right_score": 0.2}
+    assert json_column(None) is None
+
+
+def test_span_dicts_match_span_model():
+    dicts = extract_span_dicts(TEXT)
+    assert dicts
+    assert [Span(**d).model_dump(exclude_none=True) for d in dicts] == dicts
+    assert [s.model_dump(exclude_none=True) for s in extract_spans(TEXT)] == dicts
+
+
+def test_spans_endpoint_skips_response_model_validation():
+    with patch.object(FastJSONResponse, "render", wraps=lambda content: dumps(content)) as render:
+        resp = client.post("/api/spans", json={"text": TEXT})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json()["spans"] == merge_spans(extract_span_dicts(TEXT))
+    render.assert_called_once()
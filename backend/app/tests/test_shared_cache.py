@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from app.main import app
+from app.services.gemini_adapter import GeminiAdapter
+from app.services.lifecycle import InFlightTracker
+from app.services.model_router import GEMINI_MODEL
+from app.services.near_duplicate import NearDuplicateIndex
+from app.services.shared_cache import SharedCache, cache_key
+
+client = TestClient(app)
+
+TEXT = "Everyone knows this disaster is catastrophic. They deliberately ignored the crisis."
+SPECTRUM = {"left_right_score": -0.1, "populist_score": 0.2, "cluster": "centrist"}
+
+
+def _write_from_child(path):
+    SharedCache(path).set("llm", "k", {"raw_response": f"from {os.getpid()}"})
+
+
+def test_roundtrip_ttl_and_wal(tmp_path):
+    cache = SharedCache(str(tmp_path / "c.sqlite3"))
+    cache.set("ns", "a", {"x": [1, 2]})
+    cache.set("ns", "old", 1, ttl=-1)
+    assert cache.get("ns", "a") == {"x": [1, 2]}
+    assert cache.get("ns", "old") is None
+    assert cache.get("other", "a") is None
+    assert cache._connect().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    cache.delete("ns", "a")
+    assert cache.get("ns", "a") is None
+
+
+def test_async_calls_run_off_the_event_loop(tmp_path):
+    cache = SharedCache(str(tmp_path / "c.sqlite3"))
+    threads = []
+    connect = cache._connect
+    cache._connect = lambda: threads.append(threading.get_ident()) or connect()
+
+    async def run():
+        await cache.aset("ns", "a", 1)
+        assert await cache.aupdate("ns", "a", lambda n: (n + 1, n + 1)) == 2
+        value = await cache.aget("ns", "a")
+        await cache.adelete("ns", "a")
+        return threading.get_ident(), value
+
+    loop_thread, value = asyncio.run(run())
+    assert value == 2 and threads and loop_thread not in threads
+    assert cache.get("ns", "a") is None
+
+
+def test_visible_across_processes(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    proc = multiprocessing.get_context("spawn").Process(target=_write_from_child, args=(path,))
+    proc.start()
+    proc.join(30)
+    assert SharedCache(path).get("llm", "k")["raw_response"].startswith("from ")
+
+
+def test_purge_bounds_size(tmp_path):
+    cache = SharedCache(str(tmp_path / "c.sqlite3"), max_entries=3)
+    for i in range(5):
+        cache.set("ns", str(i), i)
+    assert cache.purge() == 2
+    assert cache.get("ns", "0") is None
+    assert cache.get("ns", "4") == 4
+
+
+def test_disabled_cache_is_a_no_op():
+    cache = SharedCache(None)
+    cache.set("ns", "a", 1)
+    assert cache.get("ns", "a") is None
+
+
+def test_gemini_results_are_shared():
+    adapter = GeminiAdapter.__new__(GeminiAdapter)
+    adapter._generate_once = AsyncMock(return_value={"mock": False, "raw_response": "answer"})
+
+    first = asyncio.run(adapter.generate("same prompt"))
+    second = asyncio.run(adapter.generate("same prompt"))
+    assert first == {"mock": False, "raw_response": "answer", "model": GEMINI_MODEL}
+    assert second["cached"] is True
+    adapter._generate_once.assert_awaited_once()
+
+
+def test_exact_repeat_reuses_analysis_from_shared_cache(isolated_shared_cache):
+    isolated_shared_cache.set("analysis", cache_key(TEXT), {"article_id": "a1", "analysis_id": "x1"})
+    tables = {}
+
+    def table(name):
+        if name not in tables:
+            tables[name] = MagicMock()
+            tables[name].insert.return_value.execute.return_value = Mock(data=[{"id": f"{name}-id", "content": TEXT}])
+        return tables[name]
+
+    with patch("app.api.analyze.supabase") as supabase, \
+         patch("app.api.analyze.near_duplicate_index", NearDuplicateIndex()), \
+         patch("app.api.analyze._run_pipeline", new_callable=AsyncMock) as pipeline:
+        supabase.table.side_effect = table
+        table("analyses").select.return_value.eq.return_value.execute.return_value = Mock(
+            data=[{"spectrum": SPECTRUM, "gemini_reflection": {"first": {"raw_response": "r"}}}]
+        )
+        resp = client.post("/api/analyze", json={"text": TEXT})
+
+    pipeline.assert_not_called()
+    assert resp.json()["near_duplicate_of"] == {"article_id": "a1", "analysis_id": "x1", "similarity": 1.0}
+
+
+def test_in_flight_tracker_counts_requests():
+    tracker = InFlightTracker()
+
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.05)
+
+    async def run():
+        request = asyncio.ensure_future(tracker.middleware(slow_app)({"type": "http"}, None, None))
+        await asyncio.sleep(0.01)
+        assert tracker.active == 1
+        await request
+
+    asyncio.run(run())
+    assert tracker.active == 0
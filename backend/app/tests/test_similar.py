@@ -0,0 +1,130 @@
+import numpy as np
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+from app.services.fingerprint_index import FingerprintIndex
+from app.services.lexicon_registry import get_lexicons
+
+client = TestClient(app)
+
+LEX = get_lexicons()
+ANGLES = [f"angle:{k}" for k in LEX.angle_lexicons]
+TECHNIQUES = [f"persuasion:{k}" for k in LEX.persuasion_lexicons]
+
+
+def _analysis(article_id, intensities, left_right=0.0, populist=0.0, created_at="2025-11-01T00:00:00+00:00"):
+    return {
+        "article_id": article_id,
+        "created_at": created_at,
+        "angle": {"intensity_scores": intensities},
+        "spectrum": {"left_right_score": left_right, "populist_score": populist},
+    }
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows, self.after, self.lo, self.hi = rows, None, 0, None
+
+    def select(self, *_):
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def gte(self, column, value):
+        self.after = value
+        return self
+
+    def range(self, lo, hi):
+        self.lo, self.hi = lo, hi
+        return self
+
+    def execute(self):
+        rows = sorted((r for r in self.rows if self.after is None or r["created_at"] >= self.after), key=lambda r: r["created_at"])
+        return Mock(data=rows[self.lo:self.hi + 1])
+
+
+def test_vector_layout_is_unit_length():
+    index = FingerprintIndex(spectrum_weight=2.0)
+    index.add("x", {}, {})  # sets the layout for the current lexicon
+    vec = index.vector({"intensity_scores": {ANGLES[0]: 0.3, "angle:retired-key": 0.9}}, {"left_right_score": -0.2})
+
+    assert index.dim == len(ANGLES) + len(TECHNIQUES) + 2
+    assert np.isclose(np.linalg.norm(vec), 1.0)
+    expected = np.zeros(index.dim)
+    expected[0], expected[-2] = 0.3, -0.4
+    assert np.allclose(vec, expected / np.linalg.norm(expected))
+    assert index.vector({}, {}) is None
+
+
+def test_neighbours_match_brute_force_after_updates():
+    rng = np.random.default_rng(3)
+    index = FingerprintIndex()
+    rows = []
+    for i in range(2000):
+        keys = rng.choice(ANGLES + TECHNIQUES, size=3, replace=False)
+        rows.append(_analysis(f"a{i}", {k: float(rng.random()) for k in keys}, float(rng.uniform(-1, 1)), float(rng.random())))
+    index.add_rows(rows, LEX)
+
+    # Re-analysis replaces the row; deletes swap the last row into the hole
+    index.add("a5", {"intensity_scores": {ANGLES[1]: 1.0}}, {}, created_at="2025-12-01", lex=LEX)
+    index.add("a5", {"intensity_scores": {ANGLES[2]: 1.0}}, {}, created_at="2025-01-01", lex=LEX)  # older: ignored
+    for removed in ("a0", "a1999", "a700"):
+        index.remove(removed)
+    assert index.size == 1997
+
+    vectors = {r["article_id"]: index.vector(r["angle"], r["spectrum"]) for r in rows}
+    vectors["a5"] = index.vector({"intensity_scores": {ANGLES[1]: 1.0}}, {})
+    for removed in ("a0", "a1999", "a700"):
+        del vectors[removed]
+
+    for probe in ("a5", "a42", "a1500"):
+        scores = {aid: float(vectors[probe] @ v) for aid, v in vectors.items() if aid != probe}
+        expected = sorted(scores, key=lambda aid: -scores[aid])[:10]
+        found = index.neighbours(probe, k=10)
+        assert [n["article_id"] for n in found] == expected
+        assert all(np.isclose(n["similarity"], scores[n["article_id"]], atol=1e-4) for n in found)
+
+    assert index.neighbours("a0") is None
+    assert all(n["similarity"] >= 0.9 for n in index.neighbours("a42", k=50, min_score=0.9))
+
+
+def test_refresh_pages_through_new_analyses():
+    rows = [_analysis(f"a{i}", {ANGLES[i % 3]: 0.5}, created_at=f"2025-11-{i + 1:02d}") for i in range(25)]
+    supabase = Mock(table=Mock(side_effect=lambda name: FakeQuery(rows)))
+    index = FingerprintIndex()
+
+    index.refresh(supabase, page_size=10)
+    assert index.size == 25 and index.cursor == "2025-11-25"
+    assert not index.stale()
+
+    rows.append(_analysis("a99", {ANGLES[0]: 0.5}, created_at="2025-11-30"))
+    index.refresh(supabase, page_size=10)
+    assert index.size == 26
+
+
+def test_similar_endpoint_returns_neighbours_with_titles():
+    index = FingerprintIndex()
+    index.add_rows([
+        _analysis("00000000-0000-0000-0000-000000000001", {ANGLES[0]: 0.8}, 0.5),
+        _analysis("a2", {ANGLES[0]: 0.7}, 0.4),
+        _analysis("a3", {ANGLES[1]: 0.9}, -0.5),
+        _analysis("deleted", {ANGLES[0]: 0.8}, 0.5),
+    ], LEX)
+    index.refreshed_at = float("inf")  # skip the refresh
+
+    with patch("app.api.similar.fingerprint_index", index), patch("app.api.similar.supabase") as supabase:
+        supabase.table.return_value.select.return_value.in_.return_value.execute.return_value = Mock(data=[
+            {"id": "a2", "title": "Close", "author": "wire", "created_at": "2025-11-02"},
+            {"id": "a3", "title": "Far", "author": "wire", "created_at": "2025-11-03"},
+        ])
+        resp = client.get("/api/articles/00000000-0000-0000-0000-000000000001/similar?k=1")
+        missing = client.get("/api/articles/00000000-0000-0000-0000-000000000009/similar")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [n["article_id"] for n in body["neighbours"]] == ["a2"]
+    assert body["neighbours"][0]["title"] == "Close"
+    assert body["indexed"] == 3  # "deleted" has no article row any more and left the index
+    assert index.neighbours("deleted") is None
+    assert missing.status_code == 404
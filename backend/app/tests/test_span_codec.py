@@ -0,0 +1,70 @@
+import json
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, Mock, patch
+from app.main import app
+from app.api.spans import extract_span_dicts
+from app.services.span_codec import decode_spans, encode_spans, span_set_row
+
+client = TestClient(app)
+
+ARTICLE = (
+    "Everyone knows this disaster is catastrophic. Experts say we must act now, before it's too late. "
+    "They deliberately ignored the crisis, and it is always the ordinary people who pay. "
+) * 40
+
+
+def _sorted(spans):
+    return sorted(spans, key=lambda s: (s["start"], s["end"]))
+
+
+def test_roundtrip_restores_span_shape():
+    spans = extract_span_dicts(ARTICLE)
+    encoded = encode_spans(spans)
+    assert encoded["span_count"] == len(spans)
+    assert _sorted(decode_spans(encoded["labels"], encoded["payload"], ARTICLE)) == _sorted(spans)
+
+
+def test_many_labels_and_empty_sets():
+    spans = [{"label": f"L{i}", "start": i, "end": i + 2, "confidence": 0.5} for i in range(300)]
+    encoded = encode_spans(spans)
+    assert len(encoded["labels"]) == 300
+    decoded = decode_spans(encoded["labels"], encoded["payload"])
+    assert [s["label"] for s in decoded] == [s["label"] for s in spans]
+    assert decoded[0]["span_text"] == ""
+
+    empty = encode_spans([])
+    assert decode_spans(empty["labels"], empty["payload"]) == []
+
+
+def test_packed_row_is_an_order_of_magnitude_smaller():
+    spans = extract_span_dicts(ARTICLE)
+    per_span_rows = sum(
+        len(json.dumps({"article_id": "0" * 36, "span_type": s["label"], "text": s["span_text"],
+                        "start_index": s["start"], "end_index": s["end"]}))
+        for s in spans
+    )
+    packed = len(json.dumps(span_set_row("0" * 36, spans, "2025.11.1")))
+    assert packed * 10 <= per_span_rows
+
+
+def test_read_api_decodes_latest_span_set():
+    spans = extract_span_dicts(ARTICLE)
+    row = span_set_row("a1", spans, "v1")
+    with patch("app.api.spans.supabase") as supabase:
+        span_sets, articles = MagicMock(), MagicMock()
+        supabase.table.side_effect = lambda name: span_sets if name == "span_sets" else articles
+        span_sets.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value = Mock(data=[row])
+        articles.select.return_value.eq.return_value.execute.return_value = Mock(data=[{"content": ARTICLE}])
+        resp = client.get("/api/articles/00000000-0000-0000-0000-000000000001/spans?merge=none")
+
+    assert resp.status_code == 200
+    assert resp.json()["lexicon_version"] == "v1"
+    assert _sorted(resp.json()["spans"]) == _sorted(spans)
+
+
+def test_read_api_404_when_missing():
+    with patch("app.api.spans.supabase") as supabase:
+        supabase.table.return_value.select.return_value.eq.return_value.eq.return_value \
+            .order.return_value.limit.return_value.execute.return_value = Mock(data=[])
+        resp = client.get("/api/articles/00000000-0000-0000-0000-000000000001/spans?lexicon_version=v0")
+    assert resp.status_code == 404
@@ -0,0 +1,115 @@
+import random
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.spans import extract_span_dicts
+from app.services.span_codec import decode_spans, encode_spans
+from app.services.span_merge import merge_spans
+
+client = TestClient(app)
+
+TEXT = "Everyone knows they always lie. It is common knowledge."
+
+
+def _span(label, start, end, confidence=0.5):
+    return {"label": label, "span_text": "", "start": start, "end": end, "confidence": confidence}
+
+
+def _overlaps(a, b):
+    return a["start"] < b["end"] and b["start"] < a["end"]
+
+
+def test_none_keeps_every_hit():
+    spans = [_span("A", 0, 5), _span("B", 0, 5)]
+    assert merge_spans(spans, "none") == spans
+
+
+def test_group_folds_nested_and_identical_hits():
+    spans = [
+        _span("Overgeneralization", 0, 8, 0.7),
+        _span("Bandwagon", 0, 14, 0.58),
+        _span("Loaded", 20, 25, 0.6),
+        _span("Other", 20, 25, 0.4),
+        _span("Loaded", 20, 25, 0.5),
+    ]
+    merged = merge_spans(spans, "group")
+
+    assert [(s["start"], s["end"]) for s in merged] == [(0, 14), (20, 25)]
+    # The group keeps the outer span's own label and confidence
+    assert (merged[0]["label"], merged[0]["confidence"]) == ("Bandwagon", 0.58)
+    assert merged[0]["labels"] == ["Bandwagon", "Overgeneralization"]
+    assert merged[0]["members"] == [
+        {"label": "Overgeneralization", "start": 0, "end": 8, "confidence": 0.7},
+        {"label": "Bandwagon", "start": 0, "end": 14, "confidence": 0.58},
+    ]
+    assert merged[1]["labels"] == ["Loaded", "Other"]
+    assert merged[1]["confidence"] == 0.6
+    assert len(merged[1]["members"]) == 2  # duplicate Loaded hit collapsed
+
+
+def test_group_keeps_partial_overlaps_apart():
+    merged = merge_spans([_span("A", 0, 10), _span("B", 5, 15)], "group")
+    assert [(s["start"], s["end"], s["label"]) for s in merged] == [(0, 10, "A"), (5, 15, "B")]
+    assert all("labels" not in s for s in merged)
+
+
+def test_longest_and_confidence_policies():
+    spans = [_span("Short", 0, 8, 0.9), _span("Long", 0, 14, 0.5), _span("Tail", 12, 20, 0.6)]
+
+    assert [s["label"] for s in merge_spans(spans, "longest")] == ["Long"]
+    assert [s["label"] for s in merge_spans(spans, "confidence")] == ["Short", "Tail"]
+
+
+def test_disjoint_policies_never_return_overlaps():
+    rng = random.Random(7)
+    spans = []
+    for i in range(500):
+        start = rng.randrange(0, 2000)
+        spans.append(_span(f"L{i % 9}", start, start + rng.randrange(1, 40), rng.random()))
+
+    for policy in ("longest", "confidence"):
+        kept = merge_spans(spans, policy)
+        assert kept and len(kept) < len(spans)
+        assert all(not _overlaps(a, b) for a, b in zip(kept, kept[1:]))
+        # Every dropped span overlaps something that was kept
+        for span in spans:
+            assert any(_overlaps(span, k) for k in kept)
+
+    # Same picks as the plain quadratic greedy
+    rank = lambda s: (-(s.get("confidence") or 0.0), -(s["end"] - s["start"]), s["start"])
+    expected = []
+    for span in sorted(spans, key=rank):
+        if not any(_overlaps(span, k) for k in expected):
+            expected.append(span)
+    assert merge_spans(spans, "confidence") == sorted(expected, key=lambda s: (s["start"], s["end"]))
+
+
+def test_spans_endpoint_merge_option():
+    grouped = client.post("/api/spans", json={"text": TEXT, "merge": "group"}).json()["spans"]
+    raw = client.post("/api/spans", json={"text": TEXT, "merge": "none"}).json()["spans"]
+
+    assert len(grouped) < len(raw)
+    assert {l for s in grouped for l in s.get("labels", [s["label"]])} == {s["label"] for s in raw}
+    for span in grouped:
+        assert TEXT[span["start"]:span["end"]] == span["span_text"]
+
+
+def test_spans_endpoint_rejects_unknown_policy():
+    resp = client.post("/api/spans", json={"text": TEXT, "merge": "fuzzy"})
+    assert resp.status_code == 400
+
+
+def test_grouped_spans_roundtrip_through_codec():
+    raw = extract_span_dicts(TEXT)
+    grouped = merge_spans(raw, "group")
+    encoded = encode_spans(grouped)
+
+    assert encoded["span_count"] == len(raw)
+    decoded = decode_spans(encoded["labels"], encoded["payload"], TEXT)
+    # Lossless: every hit comes back with its own offsets and confidence
+    key = lambda s: (s["start"], s["end"], s["label"])
+    assert sorted(decoded, key=key) == sorted(
+        ({**s, "confidence": round(s["confidence"], 4)} for s in raw), key=key
+    )
+    assert merge_spans(decoded, "group") == merge_spans(
+        [{**s, "confidence": round(s["confidence"], 4)} for s in raw], "group"
+    )
@@ -0,0 +1,142 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+from app.main import app
+from app.services.spectrum_classifier import SpectrumClassifier, featurize, load_from_db, load_jsonl, main, spectrum_source
+
+client = TestClient(app)
+
+LEFT = [
+    "The government should regulate corporations to protect workers and expand public healthcare.",
+    "Raise the minimum wage and strengthen unions so workers share in the profits.",
+    "Public investment in healthcare and housing protects working families from exploitation.",
+]
+POPULIST = [
+    "The corrupt elites ignored ordinary people; we must take back control from the establishment.",
+    "Ordinary people are betrayed by the elites, it is time to restore power to the people.",
+    "The establishment elites despise ordinary people and we will take our country back.",
+]
+EXAMPLES = [(t, -0.5, 0.1, "left") for t in LEFT] + [(t, 0.1, 0.9, "populist-right") for t in POPULIST]
+
+
+@pytest.fixture(scope="module")
+def model():
+    return SpectrumClassifier(dim=1 << 14).fit(EXAMPLES, epochs=30)
+
+
+def test_featurize_is_normalised():
+    idx, values = featurize("people people elites", dim=1 << 10)
+    assert len(idx) == len(values) == 4  # 2 unigrams + 2 bigrams
+    assert values.dot(values) == pytest.approx(1.0)
+    assert len(featurize("")[0]) == 0
+
+
+def test_model_learns_clusters(model):
+    left = model.predict("Regulate corporations and protect workers with public healthcare.")
+    populist = model.predict("The elites betrayed ordinary people, take back control.")
+
+    assert left["cluster"] == "left"
+    assert left["left_right_score"] < 0
+    assert populist["cluster"] == "populist-right"
+    assert populist["populist_score"] > 0.5
+    assert 0.0 <= populist["confidence"] <= 1.0
+
+
+def test_evaluate_reports_coverage(model):
+    report = model.evaluate(EXAMPLES, threshold=0.0)
+    assert report["cluster_accuracy"] == 1.0
+    assert report["coverage"] == 1.0
+
+
+def test_save_load_roundtrip(model, tmp_path):
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+    restored = SpectrumClassifier.load(path)
+    assert restored.predict(LEFT[0]) == model.predict(LEFT[0])
+
+
+def test_cli_train_and_evaluate(tmp_path, capsys):
+    data = tmp_path / "labels.jsonl"
+    data.write_text("\n".join(
+        json.dumps({"text": t, "left_right_score": lr, "populist_score": p, "cluster": c}) for t, lr, p, c in EXAMPLES
+    ) + "\n" + json.dumps({"text": "", "cluster": "left"}), encoding="utf-8")
+    assert len(load_jsonl(str(data))) == len(EXAMPLES)
+
+    out = str(tmp_path / "model.npz")
+    main(["train", "--data", str(data), "--out", out, "--holdout", "0"])
+    main(["evaluate", "--data", str(data), "--model", out])
+    assert '"cluster_accuracy"' in capsys.readouterr().out
+
+
+class FingerprintTable:
+    """spectrum_fingerprints / articles rows behind the PostgREST calls load_from_db makes."""
+
+    def __init__(self, rows):
+        self.rows, self.filters, self.orders = rows, [], []
+
+    def select(self, *_):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda r: r[column] in values)
+        return self
+
+    def order(self, column, **_):
+        self.orders.append(column)
+        return self
+
+    def range(self, *_):
+        return self  # a single page
+
+    def execute(self):
+        return type("Res", (), {"data": [r for r in self.rows if all(f(r) for f in self.filters)]})()
+
+
+def test_training_data_is_gemini_labelled_only():
+    fingerprints = [
+        {"article_id": "g1", "left_right_score": -0.5, "populist_score": 0.1, "cluster": "left", "source": "gemini"},
+        {"article_id": "l1", "left_right_score": 0.1, "populist_score": 0.9, "cluster": "populist-right", "source": "local"},
+        {"article_id": "m1", "left_right_score": 0.0, "populist_score": 0.0, "cluster": "centrist", "source": "mock"},
+    ]
+    articles = [{"id": a, "content": LEFT[0]} for a in ("g1", "l1", "m1")]
+    tables = {"spectrum_fingerprints": FingerprintTable(fingerprints), "articles": FingerprintTable(articles)}
+    db = type("Db", (), {"table": lambda self, name: tables[name]})()
+
+    examples = load_from_db(db)
+    assert [e[3] for e in examples] == ["left"]
+    assert tables["spectrum_fingerprints"].orders == ["article_id", "id"]  # unique order for stable pages
+
+    assert spectrum_source({"left_right_score": 0.1, "source": "local"}) == "local"
+    assert spectrum_source({"mock": True, "response": "..."}) == "mock"
+    assert spectrum_source({"error": "quota", "fallback_result": {}}) == "fallback"
+    assert spectrum_source({"left_right_score": 0.2, "cluster": "center-right"}) == "gemini"
+
+
+def test_endpoint_uses_local_model_when_confident(model):
+    with patch("app.api.political_spectrum.get_spectrum_classifier", return_value=model), \
+         patch("app.api.political_spectrum.SPECTRUM_LOCAL_CONFIDENCE", 0.0), \
+         patch("app.api.political_spectrum.gemini") as gemini:
+        resp = client.post("/api/political-spectrum", json={"text": POPULIST[0]})
+
+    assert resp.status_code == 200
+    assert resp.json()["source"] == "local"
+    assert resp.json()["cluster"] == "populist-right"
+    gemini.generate.assert_not_called()
+
+
+def test_endpoint_escalates_to_gemini_below_threshold(model):
+    raw = json.dumps({"left_right_score": 0.2, "populist_score": 0.1, "cluster": "center-right"})
+    with patch("app.api.political_spectrum.get_spectrum_classifier", return_value=model), \
+         patch("app.api.political_spectrum.SPECTRUM_LOCAL_CONFIDENCE", 1.01), \
+         patch("app.api.political_spectrum.gemini") as gemini:
+        gemini.generate = AsyncMock(return_value={"mock": False, "raw_response": raw})
+        resp = client.post("/api/political-spectrum", json={"text": "Lower taxes for small businesses."})
+
+    assert resp.status_code == 200
+    assert resp.json()["cluster"] == "center-right"
+    gemini.generate.assert_awaited_once()
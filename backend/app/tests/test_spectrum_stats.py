@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, Mock, patch
+from app.main import app
+from app.api.spectrum_stats import summarize_aggregate
+
+client = TestClient(app)
+
+
+AGGREGATE_ROW = {
+    "author_key": "Daily",
+    "bucket": "week",
+    "bucket_start": "2025-11-10",
+    "article_count": 4,
+    "left_right_sum": -1.0,
+    "populist_sum": 1.2,
+    "cluster_counts": {"left": 3, "centrist": 1, "right": 0},
+}
+
+
+@pytest.fixture
+def mock_query():
+    """Chainable query mock: every filter returns the same query object."""
+    query = MagicMock()
+    for name in ("select", "eq", "gte", "lte", "order", "limit"):
+        getattr(query, name).return_value = query
+    query.execute.return_value = Mock(data=[AGGREGATE_ROW])
+    with patch("app.api.spectrum_stats.supabase") as mock_supabase:
+        mock_supabase.table.return_value = query
+        yield query
+
+
+def test_summarize_aggregate():
+    summary = summarize_aggregate(AGGREGATE_ROW)
+    assert summary["avg_left_right_score"] == -0.25
+    assert summary["avg_populist_score"] == 0.3
+    assert summary["cluster_counts"] == {"left": 3, "centrist": 1}
+    assert summary["cluster_distribution"] == {"left": 0.75, "centrist": 0.25}
+
+
+def test_summarize_empty_bucket():
+    summary = summarize_aggregate({"article_count": 0, "cluster_counts": {}})
+    assert summary["avg_left_right_score"] is None
+    assert summary["cluster_distribution"] == {}
+
+
+def test_aggregates_endpoint(mock_query):
+    resp = client.get("/api/spectrum/aggregates?author=Daily&bucket=week&start=2025-11-01")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["buckets"][0]["avg_left_right_score"] == -0.25
+
+    mock_query.eq.assert_any_call("author_key", "Daily")
+    mock_query.eq.assert_any_call("bucket", "week")
+    mock_query.gte.assert_called_once_with("bucket_start", "2025-11-01")
+    mock_query.lte.assert_not_called()
+
+
+def test_aggregates_rejects_unknown_bucket(mock_query):
+    assert client.get("/api/spectrum/aggregates?bucket=year").status_code == 422
+
+
+@patch("app.api.spectrum_stats.supabase", None)
+def test_aggregates_no_database():
+    assert client.get("/api/spectrum/aggregates").status_code == 503
@@ -0,0 +1,88 @@
+"""
+Per-request serialization cost of /api/spans and /api/analyze, before and after
+the orjson / pre-validated response path.
+
+    cd backend && python -m benchmarks.bench_serialization [--repeat 200] [--size 20]
+
+"Before" reproduces the old handlers: pydantic Span objects, response_model
+re-validation, jsonable_encoder + json.dumps for the response, and json.dumps
+strings for each analyses column. "After" is what the handlers do now.
+"""
+import argparse
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.angle import heuristic_analyze
+from app.api.spans import Span, SpanResponse, extract_span_dicts
+from app.services.lexicon_registry import get_lexicons
+from app.services.serialization import dumps
+
+PARAGRAPH = (
+    "Everyone knows this disaster is catastrophic. Experts say we must act now, before it's too late. "
+    "They deliberately ignored the crisis, and it is always the ordinary people who pay. "
+)
+SPECTRUM = {"left_right_score": -0.2, "populist_score": 0.6, "cluster": "populist-left", "source": "local"}
+
+
+def old_spans(spans, lex):
+    model = SpanResponse(spans=[Span(**span) for span in spans], lexicon_version=lex.version)
+    validated = SpanResponse.model_validate(model.model_dump())  # response_model pass
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def new_spans(spans, lex):
+    return dumps({"spans": spans, "lexicon_version": lex.version})
+
+
+def old_analyze(payloads, lex):
+    spans, angle_json, reflection = payloads
+    spans_json = {"spans": [Span(**span).model_dump() for span in spans], "lexicon_version": lex.version}
+    row = {
+        "spans": json.dumps(spans_json),
+        "angle": json.dumps(angle_json),
+        "spectrum": json.dumps(SPECTRUM),
+        "gemini_reflection": json.dumps(reflection),
+    }
+    json.dumps(row)  # request body sent to Supabase
+    body = {"spans": spans_json, "angle": angle_json, "spectrum": SPECTRUM, "reflection": reflection}
+    return json.dumps(jsonable_encoder(body)).encode()
+
+
+def new_analyze(payloads, lex):
+    spans, angle_json, reflection = payloads
+    spans_json = {"spans": spans, "lexicon_version": lex.version}
+    row = {"spans": spans_json, "angle": angle_json, "spectrum": SPECTRUM, "gemini_reflection": reflection}
+    json.dumps(row)  # request body sent to Supabase
+    body = {"spans": spans_json, "angle": angle_json, "spectrum": SPECTRUM, "reflection": reflection}
+    return dumps(body)
+
+
+def _per_call_us(fn, data, lex, repeat):
+    return min(timeit.repeat(lambda: fn(data, lex), number=repeat, repeat=3)) / repeat * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--size", type=int, default=20, help="paragraphs per article")
+    args = parser.parse_args(argv)
+
+    lex = get_lexicons()
+    text = PARAGRAPH * args.size
+    # Extraction is identical in both paths; only the serialization work is timed
+    spans = extract_span_dicts(text, lex)
+    payloads = (spans, heuristic_analyze(text, lex).model_dump(), {"first": {"raw_response": "reflection " * 50}})
+    assert json.loads(old_spans(spans, lex)) == json.loads(new_spans(spans, lex))
+    print(f"{len(text)} chars, {len(spans)} spans")
+
+    cases = (("spans", old_spans, new_spans, spans), ("analyze", old_analyze, new_analyze, payloads))
+    for name, old, new, data in cases:
+        before = _per_call_us(old, data, lex, args.repeat)
+        after = _per_call_us(new, data, lex, args.repeat)
+        print(f"{name:>8}: before {before:8.1f} us  after {after:8.1f} us  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
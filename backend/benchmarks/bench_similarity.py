@@ -0,0 +1,59 @@
+"""
+Latency of GET /articles/{id}/similar's search step: exact cosine top-k over
+the in-memory fingerprint matrix.
+
+    cd backend && python -m benchmarks.bench_similarity [--rows 300000] [--k 10] [--queries 200]
+
+Rows are synthetic analyses with a few non-zero lexicon intensities each,
+like real articles. Build time is the cold refresh; search time is per query.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.fingerprint_index import FingerprintIndex
+from app.services.lexicon_registry import get_lexicons
+
+
+def synthetic_rows(lex, count, seed=7):
+    rng = np.random.default_rng(seed)
+    keys = [f"angle:{k}" for k in lex.angle_lexicons] + [f"persuasion:{k}" for k in lex.persuasion_lexicons]
+    for i in range(count):
+        picked = rng.choice(keys, size=min(4, len(keys)), replace=False)
+        yield {
+            "article_id": f"a{i}",
+            "created_at": f"2025-11-01T00:00:{i:09d}",
+            "angle": {"intensity_scores": {k: float(rng.random()) for k in picked}},
+            "spectrum": {"left_right_score": float(rng.uniform(-1, 1)), "populist_score": float(rng.random())},
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    lex = get_lexicons()
+    index = FingerprintIndex()
+    started = time.perf_counter()
+    index.add_rows(synthetic_rows(lex, args.rows), lex)
+    build_s = time.perf_counter() - started
+    print(f"{index.size} fingerprints x {index.dim} dims, built in {build_s:.2f}s "
+          f"({index.matrix.nbytes / 2 ** 20:.1f} MiB)")
+
+    probes = np.random.default_rng(1).integers(0, index.size, size=args.queries)
+    timings = []
+    for row in probes:
+        started = time.perf_counter()
+        index.neighbours(f"a{row}", k=args.k)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    timings.sort()
+    print(f"top-{args.k} search: p50 {timings[len(timings) // 2]:.2f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms over {args.queries} queries")
+
+
+if __name__ == "__main__":
+    main()
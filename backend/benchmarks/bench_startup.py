@@ -0,0 +1,62 @@
+"""
+Worker start-up cost: cold `import app.main` and time to first request.
+
+    cd backend && python -m benchmarks.bench_startup [--runs 5]
+
+Each run is a fresh interpreter, so module caches are cold (bytecode caches are
+warm, as they are for a restarted worker). "first request" includes running the
+lifespan and answering GET /api/health; "ready" polls GET /api/ready until the
+background warm-up reports ready (skipped when the endpoint does not exist).
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/api/health")
+    t2 = time.perf_counter()
+    ready = None
+    deadline = t2 + 30
+    while time.perf_counter() < deadline:
+        resp = client.get("/api/ready")
+        if resp.status_code == 404:
+            break
+        if resp.status_code == 200:
+            ready = time.perf_counter()
+            break
+        time.sleep(0.01)
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_request_ms": (t2 - t0) * 1000,
+    "ready_ms": (ready - t0) * 1000 if ready else None,
+}))
+"""
+
+
+def run_once() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = [run_once() for _ in range(args.runs)]
+    for key in ("import_ms", "first_request_ms", "ready_ms"):
+        values = [r[key] for r in results if r[key] is not None]
+        if values:
+            print(f"{key:>17}: median {statistics.median(values):8.1f} ms  min {min(values):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
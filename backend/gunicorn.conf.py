@@ -0,0 +1,54 @@
+"""
+Production serving: gunicorn managing uvicorn workers.
+
+    cd backend && gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master (preload) and the lexicon matchers are
+compiled there in when_ready, so they are shared copy-on-write by every worker.
+Clients and sockets are created per worker in the FastAPI lifespan, after the
+fork. Cross-worker state (LLM results, analysis dedup) lives in the SQLite
+shared cache (SHARED_CACHE_PATH); each worker's near-duplicate index is merged
+into NEAR_DUP_INDEX_PATH under a file lock when it saves.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# SIGTERM: stop accepting, let in-flight requests finish, then run lifespan shutdown
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Recycle workers now and then to bound slow memory growth; jitter avoids restarting together
+max_requests = int(os.getenv("MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "500"))
+
+accesslog = os.getenv("ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def when_ready(server):
+    # Importing the app does not compile the lexicons (that happens on first
+    # use); compile them here so workers inherit them instead of each
+    # compiling its own copy
+    from app.services.lexicon_registry import get_lexicons
+    lex = get_lexicons()
+
+    # Move everything imported so far into the permanent generation so the GC
+    # never touches (and therefore never copies) those pages in the workers
+    gc.freeze()
+    server.log.info(f"🚀 Preloaded app with lexicon {lex.version}; {gc.get_freeze_count()} objects frozen, starting {workers} workers")
+
+
+def post_fork(server, worker):
+    # Connections must never be inherited across fork; drop any the master opened
+    from app.models.db import supabase
+    from app.services.shared_cache import shared_cache
+
+    supabase.reset()
+    shared_cache.close()
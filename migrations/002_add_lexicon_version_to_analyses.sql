@@ -0,0 +1,5 @@
+-- Record which lexicon version produced each analysis
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS lexicon_version VARCHAR(64);
+
+-- Lets us find analyses that were produced by an outdated lexicon
+CREATE INDEX IF NOT EXISTS idx_analyses_lexicon_version ON analyses(lexicon_version);
@@ -0,0 +1,138 @@
+-- Running political-spectrum aggregates per author and time bucket.
+-- Maintained by a trigger on spectrum_fingerprints so dashboards read a
+-- handful of pre-aggregated rows instead of scanning every fingerprint.
+-- One transaction: fingerprints written while the trigger is being created
+-- would otherwise be counted twice (trigger + backfill) or not at all.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS spectrum_aggregates (
+    author_key VARCHAR(255) NOT NULL,          -- article author, '*' = all authors
+    bucket VARCHAR(8) NOT NULL,                -- 'day' | 'week' | 'month'
+    bucket_start DATE NOT NULL,
+    article_count BIGINT NOT NULL DEFAULT 0,
+    left_right_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    populist_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    cluster_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (author_key, bucket, bucket_start)
+);
+
+-- Blocks fingerprint inserts and deletes (not reads) until COMMIT
+LOCK TABLE spectrum_fingerprints IN SHARE ROW EXCLUSIVE MODE;
+
+-- Bucket keys are stored on the fingerprint itself, so a delete (including
+-- one cascaded from its article, which is already gone) reverses exactly
+-- the buckets its insert touched.
+ALTER TABLE spectrum_fingerprints ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE spectrum_fingerprints ADD COLUMN IF NOT EXISTS author_key VARCHAR(255);
+
+-- Existing rows keep the article's author and created_at as their bucket keys
+UPDATE spectrum_fingerprints sf
+SET author_key = COALESCE(ar.author, 'unknown'),
+    created_at = COALESCE(ar.created_at, sf.created_at, NOW())
+FROM articles ar
+WHERE sf.author_key IS NULL AND ar.id = sf.article_id;
+UPDATE spectrum_fingerprints SET author_key = 'unknown', created_at = COALESCE(created_at, NOW())
+WHERE author_key IS NULL;
+
+CREATE OR REPLACE FUNCTION set_spectrum_fingerprint_keys() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.author_key IS NULL THEN
+        SELECT COALESCE(author, 'unknown') INTO NEW.author_key FROM articles WHERE id = NEW.article_id;
+        NEW.author_key := COALESCE(NEW.author_key, 'unknown');
+    END IF;
+    NEW.created_at := COALESCE(NEW.created_at, NOW());
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_spectrum_fingerprint_keys ON spectrum_fingerprints;
+CREATE TRIGGER trg_spectrum_fingerprint_keys
+    BEFORE INSERT ON spectrum_fingerprints
+    FOR EACH ROW EXECUTE FUNCTION set_spectrum_fingerprint_keys();
+
+-- Buckets are keyed on the fingerprint's author_key and created_at; one
+-- fingerprint updates 3 buckets for its author and 3 for the '*' roll-up.
+CREATE OR REPLACE FUNCTION apply_spectrum_aggregate() RETURNS TRIGGER AS $$
+DECLARE
+    rec spectrum_fingerprints%ROWTYPE;
+    delta INTEGER;
+    cluster_key TEXT;
+    author_value TEXT;
+    bucket_value TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+        delta := -1;
+    ELSE
+        rec := NEW;
+        delta := 1;
+    END IF;
+    cluster_key := COALESCE(rec.cluster, 'unknown');
+
+    FOREACH author_value IN ARRAY ARRAY[COALESCE(rec.author_key, 'unknown'), '*'] LOOP
+        FOREACH bucket_value IN ARRAY ARRAY['day', 'week', 'month'] LOOP
+            INSERT INTO spectrum_aggregates AS agg
+                (author_key, bucket, bucket_start, article_count, left_right_sum, populist_sum, cluster_counts)
+            VALUES (
+                author_value,
+                bucket_value,
+                date_trunc(bucket_value, rec.created_at)::date,
+                delta,
+                delta * COALESCE(rec.left_right_score, 0),
+                delta * COALESCE(rec.populist_score, 0),
+                jsonb_build_object(cluster_key, delta)
+            )
+            ON CONFLICT (author_key, bucket, bucket_start) DO UPDATE SET
+                article_count = agg.article_count + EXCLUDED.article_count,
+                left_right_sum = agg.left_right_sum + EXCLUDED.left_right_sum,
+                populist_sum = agg.populist_sum + EXCLUDED.populist_sum,
+                cluster_counts = agg.cluster_counts || jsonb_build_object(
+                    cluster_key,
+                    COALESCE((agg.cluster_counts ->> cluster_key)::BIGINT, 0) + delta
+                ),
+                updated_at = NOW();
+        END LOOP;
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_spectrum_aggregates ON spectrum_fingerprints;
+CREATE TRIGGER trg_spectrum_aggregates
+    AFTER INSERT OR DELETE ON spectrum_fingerprints
+    FOR EACH ROW EXECUTE FUNCTION apply_spectrum_aggregate();
+
+-- One-time backfill from fingerprints stored before this migration; the lock
+-- above means no fingerprint is seen by both the trigger and the backfill
+WITH fingerprint_rows AS (
+    SELECT a.author_key, b.bucket,
+           date_trunc(b.bucket, sf.created_at)::date AS bucket_start,
+           COALESCE(sf.left_right_score, 0) AS lr,
+           COALESCE(sf.populist_score, 0) AS pop,
+           COALESCE(sf.cluster, 'unknown') AS cluster_key
+    FROM spectrum_fingerprints sf
+    CROSS JOIN LATERAL (VALUES (sf.author_key), ('*')) AS a(author_key)
+    CROSS JOIN (VALUES ('day'), ('week'), ('month')) AS b(bucket)
+), per_cluster AS (
+    SELECT author_key, bucket, bucket_start, cluster_key,
+           COUNT(*) AS n, SUM(lr) AS lr, SUM(pop) AS pop
+    FROM fingerprint_rows
+    GROUP BY author_key, bucket, bucket_start, cluster_key
+)
+INSERT INTO spectrum_aggregates
+    (author_key, bucket, bucket_start, article_count, left_right_sum, populist_sum, cluster_counts)
+SELECT author_key, bucket, bucket_start, SUM(n), SUM(lr), SUM(pop), jsonb_object_agg(cluster_key, n)
+FROM per_cluster
+GROUP BY author_key, bucket, bucket_start
+ON CONFLICT (author_key, bucket, bucket_start) DO NOTHING;
+
+ALTER TABLE spectrum_aggregates ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow all operations on spectrum_aggregates" ON spectrum_aggregates
+    FOR ALL
+    USING (true)
+    WITH CHECK (true);
+
+COMMIT;
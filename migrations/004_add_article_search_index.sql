@@ -0,0 +1,89 @@
+-- Full-text search over articles, filterable by detected span labels and angle patterns
+
+-- Weighted document vector: title matches rank above body matches
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(content, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_articles_search_vector ON articles USING GIN (search_vector);
+
+-- Analyze wrote span.get("type") into spans.span_type, but detected spans carry
+-- their label under "label", so every row holds NULL. Copy the label from the
+-- stored analysis JSON (same article and offsets) so the label filter can match.
+UPDATE spans s
+SET span_type = src.label
+FROM (
+    SELECT DISTINCT ON (an.article_id, (sp->>'start')::INTEGER, (sp->>'end')::INTEGER)
+           an.article_id,
+           (sp->>'start')::INTEGER AS start_index,
+           (sp->>'end')::INTEGER AS end_index,
+           sp->>'label' AS label
+    FROM analyses an
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(an.spans::jsonb -> 'spans') = 'array' THEN an.spans::jsonb -> 'spans' ELSE '[]'::jsonb END
+    ) AS sp
+    WHERE sp->>'label' IS NOT NULL
+    ORDER BY an.article_id, (sp->>'start')::INTEGER, (sp->>'end')::INTEGER
+) src
+WHERE s.span_type IS NULL
+  AND s.article_id = src.article_id
+  AND s.start_index = src.start_index
+  AND s.end_index = src.end_index;
+
+-- Label / pattern lookups used by the search filters
+CREATE INDEX IF NOT EXISTS idx_spans_span_type_article ON spans(span_type, article_id);
+CREATE INDEX IF NOT EXISTS idx_angle_fingerprints_patterns ON angle_fingerprints USING GIN (patterns);
+CREATE INDEX IF NOT EXISTS idx_angle_fingerprints_article_id ON angle_fingerprints(article_id);
+
+-- Ranked, paginated search called through supabase.rpc("search_articles", ...)
+CREATE OR REPLACE FUNCTION search_articles(
+    search_query TEXT DEFAULT NULL,
+    span_labels TEXT[] DEFAULT NULL,
+    angle_patterns TEXT[] DEFAULT NULL,
+    page_size INTEGER DEFAULT 20,
+    page_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    title VARCHAR,
+    author VARCHAR,
+    created_at TIMESTAMP WITH TIME ZONE,
+    rank REAL,
+    snippet TEXT,
+    total_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH q AS (
+        SELECT CASE
+            WHEN search_query IS NULL OR btrim(search_query) = '' THEN NULL
+            ELSE websearch_to_tsquery('english', search_query)
+        END AS tsq
+    ),
+    matched AS (
+        SELECT a.id, a.title, a.author, a.created_at, a.content,
+               CASE WHEN q.tsq IS NULL THEN 0 ELSE ts_rank_cd(a.search_vector, q.tsq) END AS rank,
+               q.tsq,
+               COUNT(*) OVER () AS total_count
+        FROM articles a, q
+        WHERE (q.tsq IS NULL OR a.search_vector @@ q.tsq)
+          AND (span_labels IS NULL OR EXISTS (
+                SELECT 1 FROM spans s
+                WHERE s.article_id = a.id AND s.span_type = ANY(span_labels)))
+          AND (angle_patterns IS NULL OR EXISTS (
+                SELECT 1 FROM angle_fingerprints af
+                WHERE af.article_id = a.id AND af.patterns ?| angle_patterns))
+        ORDER BY rank DESC, a.created_at DESC
+        LIMIT page_size OFFSET page_offset
+    )
+    -- Snippets are only built for the requested page
+    SELECT m.id, m.title, m.author, m.created_at, m.rank::REAL,
+           CASE WHEN m.tsq IS NULL THEN left(m.content, 200)
+                ELSE ts_headline('english', m.content, m.tsq, 'MaxFragments=2, MaxWords=25, MinWords=8')
+           END AS snippet,
+           m.total_count
+    FROM matched m
+    ORDER BY m.rank DESC, m.created_at DESC;
+$$;
@@ -0,0 +1,28 @@
+-- Store analysis payloads as native JSONB instead of JSON-encoded strings.
+-- Text columns are cast; JSONB columns that were written with json.dumps hold
+-- string scalars, which are unwrapped into the objects they encode.
+DO $$
+DECLARE
+    col TEXT;
+    col_type TEXT;
+BEGIN
+    FOREACH col IN ARRAY ARRAY['spans', 'angle', 'spectrum', 'gemini_reflection'] LOOP
+        SELECT data_type INTO col_type
+        FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'analyses' AND column_name = col;
+
+        IF col_type IS NULL THEN
+            EXECUTE format('ALTER TABLE analyses ADD COLUMN %I JSONB', col);
+        ELSIF col_type IN ('text', 'character varying', 'json') THEN
+            EXECUTE format('ALTER TABLE analyses ALTER COLUMN %I TYPE JSONB USING NULLIF(%I::text, '''')::jsonb', col, col);
+        END IF;
+
+        EXECUTE format(
+            'UPDATE analyses SET %I = (%I #>> ''{}'')::jsonb WHERE jsonb_typeof(%I) = ''string''',
+            col, col, col
+        );
+    END LOOP;
+END $$;
+
+-- Containment queries such as spectrum @> '{"cluster": "populist-left"}'
+CREATE INDEX IF NOT EXISTS idx_analyses_spectrum ON analyses USING GIN (spectrum jsonb_path_ops);
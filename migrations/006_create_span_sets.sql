@@ -0,0 +1,81 @@
+-- Packed span storage: one row per article and lexicon version instead of one
+-- row per span. `payload` is produced by app/services/span_codec.py (base64 of
+-- a small header + zlib-compressed label ids, start deltas, lengths and
+-- quantised confidences); `labels` is the label dictionary the ids index into.
+CREATE TABLE IF NOT EXISTS span_sets (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    article_id UUID NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    lexicon_version VARCHAR(64) NOT NULL,
+    format_version SMALLINT NOT NULL DEFAULT 1,
+    span_count INTEGER NOT NULL,
+    labels TEXT[] NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (article_id, lexicon_version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_span_sets_article_created ON span_sets(article_id, created_at DESC);
+-- Label filters in search_articles
+CREATE INDEX IF NOT EXISTS idx_span_sets_labels ON span_sets USING GIN (labels);
+
+ALTER TABLE span_sets ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow all operations on span_sets" ON span_sets
+    FOR ALL
+    USING (true)
+    WITH CHECK (true);
+
+-- Label filters read span_sets; per-span rows written before this migration still match
+CREATE OR REPLACE FUNCTION search_articles(
+    search_query TEXT DEFAULT NULL,
+    span_labels TEXT[] DEFAULT NULL,
+    angle_patterns TEXT[] DEFAULT NULL,
+    page_size INTEGER DEFAULT 20,
+    page_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    title VARCHAR,
+    author VARCHAR,
+    created_at TIMESTAMP WITH TIME ZONE,
+    rank REAL,
+    snippet TEXT,
+    total_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH q AS (
+        SELECT CASE
+            WHEN search_query IS NULL OR btrim(search_query) = '' THEN NULL
+            ELSE websearch_to_tsquery('english', search_query)
+        END AS tsq
+    ),
+    matched AS (
+        SELECT a.id, a.title, a.author, a.created_at, a.content,
+               CASE WHEN q.tsq IS NULL THEN 0 ELSE ts_rank_cd(a.search_vector, q.tsq) END AS rank,
+               q.tsq,
+               COUNT(*) OVER () AS total_count
+        FROM articles a, q
+        WHERE (q.tsq IS NULL OR a.search_vector @@ q.tsq)
+          AND (span_labels IS NULL
+               OR EXISTS (
+                    SELECT 1 FROM span_sets ss
+                    WHERE ss.article_id = a.id AND ss.labels && span_labels)
+               OR EXISTS (
+                    SELECT 1 FROM spans s
+                    WHERE s.article_id = a.id AND s.span_type = ANY(span_labels)))
+          AND (angle_patterns IS NULL OR EXISTS (
+                SELECT 1 FROM angle_fingerprints af
+                WHERE af.article_id = a.id AND af.patterns ?| angle_patterns))
+        ORDER BY rank DESC, a.created_at DESC
+        LIMIT page_size OFFSET page_offset
+    )
+    -- Snippets are only built for the requested page
+    SELECT m.id, m.title, m.author, m.created_at, m.rank::REAL,
+           CASE WHEN m.tsq IS NULL THEN left(m.content, 200)
+                ELSE ts_headline('english', m.content, m.tsq, 'MaxFragments=2, MaxWords=25, MinWords=8')
+           END AS snippet,
+           m.total_count
+    FROM matched m
+    ORDER BY m.rank DESC, m.created_at DESC;
+$$;
@@ -0,0 +1,8 @@
+-- GET /api/articles/{id}/analysis reads the newest analysis and fingerprints of an article
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE angle_fingerprints ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE spectrum_fingerprints ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_analyses_article_created ON analyses(article_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_angle_fingerprints_article_created ON angle_fingerprints(article_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_spectrum_fingerprints_article_created ON spectrum_fingerprints(article_id, created_at DESC);
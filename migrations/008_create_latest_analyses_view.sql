@@ -0,0 +1,9 @@
+-- Newest analysis per article, for readers that only want the latest version
+-- (GET /api/export). DISTINCT ON walks idx_analyses_article_created from 007,
+-- so a page of article ids costs one index probe each instead of returning
+-- every historical analysis row.
+CREATE OR REPLACE VIEW latest_article_analyses
+WITH (security_invoker = true) AS
+SELECT DISTINCT ON (article_id) *
+FROM analyses
+ORDER BY article_id, created_at DESC, id DESC;
@@ -0,0 +1,17 @@
+-- Who labelled each spectrum fingerprint: gemini, local (the in-process
+-- classifier), mock or fallback. Classifier training reads only gemini rows.
+ALTER TABLE spectrum_fingerprints ADD COLUMN IF NOT EXISTS source VARCHAR(16);
+
+-- Existing rows: infer the source from the article's latest stored spectrum
+-- (view from 008), the best record available for rows written before this column
+UPDATE spectrum_fingerprints sf
+SET source = CASE
+    WHEN la.spectrum->>'source' = 'local' THEN 'local'
+    WHEN la.spectrum->>'mock' = 'true' THEN 'mock'
+    WHEN la.spectrum ? 'error' OR la.spectrum ? 'fallback_result' THEN 'fallback'
+    ELSE 'gemini'
+END
+FROM latest_article_analyses la
+WHERE sf.source IS NULL AND la.article_id = sf.article_id;
+
+CREATE INDEX IF NOT EXISTS idx_spectrum_fingerprints_source ON spectrum_fingerprints(source);
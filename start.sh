@@ -1,5 +1,13 @@
 #!/bin/bash
 
-# Start FastAPI application with uvicorn
+# Start FastAPI application
+#   ./start.sh          development: single uvicorn process with --reload
+#   APP_MODE=production ./start.sh
+#                       gunicorn + uvicorn workers with preload (see backend/gunicorn.conf.py)
 cd backend
-python -m uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+
+if [ "${APP_MODE:-development}" = "production" ]; then
+    exec gunicorn -c gunicorn.conf.py app.main:app
+else
+    python -m uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+fi